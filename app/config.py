@@ -20,6 +20,107 @@ class Settings:
     openai_api_key: str = os.getenv("OPENAI_API_KEY", "")
     gemini_endpoint: str = os.getenv("GEMINI_ENDPOINT", "")
     gemini_model: str = os.getenv("GEMINI_MODEL", "gemini-pro-latest")
+    # Audio up to this size is sent inline with the request; larger files go through the Files API
+    gemini_inline_max_bytes: int = int(os.getenv("GEMINI_INLINE_MAX_BYTES", "14680064"))
+    # Notes screenshots up to this size go inline too, while their total stays within GEMINI_INLINE_MAX_BYTES
+    gemini_inline_image_max_bytes: int = int(os.getenv("GEMINI_INLINE_IMAGE_MAX_BYTES", "4194304"))
+    # Concurrent Files API uploads per notes request, and deletions sent per background batch
+    gemini_upload_concurrency: int = int(os.getenv("GEMINI_UPLOAD_CONCURRENCY", "4"))
+    gemini_delete_batch_size: int = int(os.getenv("GEMINI_DELETE_BATCH_SIZE", "16"))
+    # Reuse uploaded screenshot files across notes requests for the same bytes (0 = off; never in privacy mode).
+    # Gemini deletes uploads after 48 hours, so the TTL has to stay below that.
+    gemini_file_cache_entries: int = int(os.getenv("GEMINI_FILE_CACHE_ENTRIES", "256"))
+    gemini_file_cache_ttl: int = int(os.getenv("GEMINI_FILE_CACHE_TTL", "3600"))
+
+    # Notes screenshots: downscale, re-encode without metadata and drop duplicates before sending to the LLM
+    screenshot_preprocess: bool = os.getenv("SCREENSHOT_PREPROCESS", "true").lower() in ("1", "true", "yes")
+    screenshot_max_edge: int = int(os.getenv("SCREENSHOT_MAX_EDGE", "1600"))
+    screenshot_format: str = os.getenv("SCREENSHOT_FORMAT", "webp")
+    screenshot_quality: int = int(os.getenv("SCREENSHOT_QUALITY", "80"))
+    # Perceptual-hash bits two screenshots may differ in and still count as duplicates (-1 = exact only).
+    # Opt-in: small but meaningful differences such as an error banner can hash within a few bits.
+    screenshot_dedupe_distance: int = int(os.getenv("SCREENSHOT_DEDUPE_DISTANCE", "-1"))
+    screenshot_workers: int = int(os.getenv("SCREENSHOT_WORKERS", "2"))
+
+    # Faster-Whisper models
+    whisper_model: str = os.getenv("WHISPER_MODEL", "small")
+    whisper_models: str = os.getenv("WHISPER_MODELS", "tiny,base,small")
+    # Model used by each quality tier when the request doesn't name one (empty = WHISPER_MODEL)
+    whisper_fast_model: str = os.getenv("WHISPER_FAST_MODEL", "base")
+    whisper_balanced_model: str = os.getenv("WHISPER_BALANCED_MODEL", "")
+    whisper_accurate_model: str = os.getenv("WHISPER_ACCURATE_MODEL", "")
+    whisper_device: str = os.getenv("WHISPER_DEVICE", "cpu")
+    whisper_compute_type: str = os.getenv("WHISPER_COMPUTE_TYPE", "int8")
+    whisper_cpu_threads: int = int(os.getenv("WHISPER_CPU_THREADS", "0"))
+    whisper_num_workers: int = int(os.getenv("WHISPER_NUM_WORKERS", "0"))
+    whisper_autotune: bool = os.getenv("WHISPER_AUTOTUNE", "false").lower() in ("1", "true", "yes")
+    # Unix socket of a dedicated inference process that owns the models (gunicorn.conf.py sets
+    # these); empty = load the models in this process
+    inference_server_socket: str = os.getenv("INFERENCE_SERVER_SOCKET", "")
+    inference_server_authkey: str = os.getenv("INFERENCE_SERVER_AUTHKEY", "")
+    inference_server_connect_timeout: float = float(os.getenv("INFERENCE_SERVER_CONNECT_TIMEOUT", "30"))
+    # Run one synthetic transcription per preloaded model before /readyz reports ready
+    warmup_inference: bool = os.getenv("WARMUP_INFERENCE", "true").lower() in ("1", "true", "yes")
+
+    # Voice-activity detection: strip silence before inference
+    vad_enabled: bool = os.getenv("VAD_ENABLED", "true").lower() in ("1", "true", "yes")
+    vad_threshold: float = float(os.getenv("VAD_THRESHOLD", "0.5"))
+    vad_min_silence_ms: int = int(os.getenv("VAD_MIN_SILENCE_MS", "500"))
+    vad_speech_pad_ms: int = int(os.getenv("VAD_SPEECH_PAD_MS", "300"))
+
+    # Local transcription worker pool
+    transcription_workers: int = int(os.getenv("TRANSCRIPTION_WORKERS", "1"))
+    transcription_queue_size: int = int(os.getenv("TRANSCRIPTION_QUEUE_SIZE", "8"))
+    transcription_retry_after: int = int(os.getenv("TRANSCRIPTION_RETRY_AFTER", "5"))
+    # Shortest-job-first aging: audio seconds of priority a queued job gains per second it waits
+    transcription_queue_aging: float = float(os.getenv("TRANSCRIPTION_QUEUE_AGING", "1.0"))
+
+    # Micro-batching of short concurrent transcriptions (tiers without temperature fallback only)
+    transcription_batching: bool = os.getenv("TRANSCRIPTION_BATCHING", "true").lower() in ("1", "true", "yes")
+    transcription_batch_window_ms: int = int(os.getenv("TRANSCRIPTION_BATCH_WINDOW_MS", "25"))
+    transcription_max_batch_size: int = int(os.getenv("TRANSCRIPTION_MAX_BATCH_SIZE", "8"))
+    transcription_batch_max_seconds: int = int(os.getenv("TRANSCRIPTION_BATCH_MAX_SECONDS", "30"))
+
+    # Long recordings: split at silence and transcribe chunks in parallel processes
+    long_audio_enabled: bool = os.getenv("LONG_AUDIO_ENABLED", "true").lower() in ("1", "true", "yes")
+    long_audio_min_seconds: int = int(os.getenv("LONG_AUDIO_MIN_SECONDS", "120"))
+    long_audio_chunk_seconds: int = int(os.getenv("LONG_AUDIO_CHUNK_SECONDS", "60"))
+    long_audio_overlap_seconds: float = float(os.getenv("LONG_AUDIO_OVERLAP_SECONDS", "1.0"))
+    long_audio_processes: int = int(os.getenv("LONG_AUDIO_PROCESSES", "0"))
+
+    # Adaptive provider routing for /transcribe/auto (policies: local, remote, local_first, fastest)
+    transcription_routing_policy: str = os.getenv("TRANSCRIPTION_ROUTING_POLICY", "local_first")
+    routing_max_queue_wait_seconds: float = float(os.getenv("ROUTING_MAX_QUEUE_WAIT_SECONDS", "10"))
+    routing_local_max_audio_seconds: float = float(os.getenv("ROUTING_LOCAL_MAX_AUDIO_SECONDS", "0"))
+    routing_max_error_rate: float = float(os.getenv("ROUTING_MAX_ERROR_RATE", "0.2"))
+    routing_window: int = int(os.getenv("ROUTING_WINDOW", "200"))
+    routing_window_seconds: float = float(os.getenv("ROUTING_WINDOW_SECONDS", "300"))
+    routing_min_samples: int = int(os.getenv("ROUTING_MIN_SAMPLES", "5"))
+    routing_probe_interval_seconds: float = float(os.getenv("ROUTING_PROBE_INTERVAL_SECONDS", "30"))
+
+    # Shadow evaluation: re-transcribe a sample of /transcribe requests with a candidate model
+    shadow_enabled: bool = os.getenv("SHADOW_ENABLED", "false").lower() in ("1", "true", "yes")
+    shadow_model: str = os.getenv("SHADOW_MODEL", "base")
+    shadow_sample_rate: float = float(os.getenv("SHADOW_SAMPLE_RATE", "0.05"))
+    shadow_max_queue_depth: int = int(os.getenv("SHADOW_MAX_QUEUE_DEPTH", "0"))
+    shadow_window: int = int(os.getenv("SHADOW_WINDOW", "500"))
+
+    # Live microphone transcription over WebSocket
+    live_step_seconds: float = float(os.getenv("LIVE_STEP_SECONDS", "1.0"))
+    live_window_seconds: float = float(os.getenv("LIVE_WINDOW_SECONDS", "15"))
+    live_max_seconds: int = int(os.getenv("LIVE_MAX_SECONDS", "600"))
+    live_quality: str = os.getenv("LIVE_QUALITY", "fast")
+
+    # Upload ingestion: hard size cap, read chunk size, and how much is held in memory before spooling to disk
+    max_upload_bytes: int = int(os.getenv("MAX_UPLOAD_BYTES", "26214400"))
+    upload_chunk_bytes: int = int(os.getenv("UPLOAD_CHUNK_BYTES", "1048576"))
+    upload_spool_max_memory: int = int(os.getenv("UPLOAD_SPOOL_MAX_MEMORY", "5242880"))
+
+    # Transcription result cache (the disk tier is disabled in privacy mode)
+    transcription_cache_entries: int = int(os.getenv("TRANSCRIPTION_CACHE_ENTRIES", "256"))
+    transcription_cache_ttl: int = int(os.getenv("TRANSCRIPTION_CACHE_TTL", "86400"))
+    transcription_cache_dir: str = os.getenv("TRANSCRIPTION_CACHE_DIR", "")
+    transcription_cache_disk_max_bytes: int = int(os.getenv("TRANSCRIPTION_CACHE_DISK_MAX_BYTES", "104857600"))
 
     # Third-party integration keys (optional)
     notion_api_key: str = os.getenv("NOTION_API_KEY", "")
@@ -27,6 +128,15 @@ class Settings:
     linear_api_url: str = os.getenv("LINEAR_API_URL", "")
     linear_attachment_url: str = os.getenv("LINEAR_ATTACHMENT_URL", "")
 
+    # Shared outbound connection pools (per process): Gemini, OpenAI and the integrations each get one
+    http_max_connections: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    http_max_keepalive_connections: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    http_connect_timeout: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "10"))
+    # Integrations (Linear, GitHub, Jira) vs. LLM calls, which can take minutes on long audio
+    http_timeout: float = float(os.getenv("HTTP_TIMEOUT", "30"))
+    llm_timeout: float = float(os.getenv("LLM_TIMEOUT", "300"))
+
     # Privacy: if True, do not persist any user content to disk/database
     privacy_mode: bool = os.getenv("PRIVACY_MODE", "true").lower() in ("1", "true", "yes")
     supabase_url: str = os.getenv("SUPABASE_URL", "")
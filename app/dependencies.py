@@ -1,15 +1,251 @@
 from app.services.usage_service import UsageService
+from app.services.transcription_executor import TranscriptionExecutor
+from app.services.transcription_batcher import TranscriptionBatcher
+from app.services.transcription_cache import TranscriptionCache
+from app.services.whisper_registry import WhisperModelRegistry
+from app.services.inference_server import InferenceClient, RemoteWhisperModel
+from app.services.long_audio import LongAudioTranscriber
+from app.services.provider_router import ProviderRouter
+from app.services.shadow_eval import ShadowEvaluator, SHADOW_PROVIDER
+from app.services.llm_client import LLMClient
+from app.services.gemini_files import GeminiFileCache, GeminiFileDeleter
+from app.services.screenshot_preprocess import ScreenshotPreprocessor
+from app.services.warmup import Warmup, synthetic_inference
+from app.services.http_clients import create_clients, get_gemini_client, get_http_client, get_openai_client
+from app.config import settings
 from faster_whisper import WhisperModel
+from typing import List, Optional, Union
+import functools
 
 def get_usage_service() -> UsageService:
     """Dependency to provide the UsageService instance."""
     return UsageService()
 
-_whisper_model = None
+_gemini_file_deleter = None
 
-def get_whisper_model():
-    """Lazy-load the Faster-Whisper model once and reuse it."""
-    global _whisper_model
-    if _whisper_model is None:
-        _whisper_model = WhisperModel("small", device="cpu") 
-    return _whisper_model
\ No newline at end of file
+def get_gemini_file_deleter() -> GeminiFileDeleter:
+    """Create the shared background deleter for Gemini Files API uploads on first use."""
+    global _gemini_file_deleter
+    if _gemini_file_deleter is None:
+        _gemini_file_deleter = GeminiFileDeleter(batch_size=settings.gemini_delete_batch_size)
+    return _gemini_file_deleter
+
+_gemini_file_cache = None
+
+def get_gemini_file_cache() -> Optional[GeminiFileCache]:
+    """Create the cache of reusable Gemini file uploads on first use. None when disabled or in privacy mode."""
+    global _gemini_file_cache
+    if _gemini_file_cache is None and settings.gemini_file_cache_entries > 0 and not settings.privacy_mode:
+        _gemini_file_cache = GeminiFileCache(
+            max_entries=settings.gemini_file_cache_entries,
+            ttl_seconds=settings.gemini_file_cache_ttl,
+            deleter=get_gemini_file_deleter(),
+        )
+    return _gemini_file_cache
+
+_screenshot_preprocessor = None
+
+def get_screenshot_preprocessor() -> Optional[ScreenshotPreprocessor]:
+    """Create the screenshot preprocessing stage on first use. None unless SCREENSHOT_PREPROCESS is set."""
+    global _screenshot_preprocessor
+    if _screenshot_preprocessor is None and settings.screenshot_preprocess:
+        _screenshot_preprocessor = ScreenshotPreprocessor(
+            max_edge=settings.screenshot_max_edge,
+            output_format=settings.screenshot_format,
+            quality=settings.screenshot_quality,
+            dedupe_distance=settings.screenshot_dedupe_distance,
+            workers=settings.screenshot_workers,
+        )
+    return _screenshot_preprocessor
+
+_llm_client = None
+
+def get_llm_client() -> LLMClient:
+    """Create the shared Gemini/OpenAI notes client on first use."""
+    global _llm_client
+    if _llm_client is None:
+        _llm_client = LLMClient(
+            gemini_client=get_gemini_client(),
+            openai_client=get_openai_client(),
+            file_deleter=get_gemini_file_deleter(),
+            preprocessor=get_screenshot_preprocessor(),
+            file_cache=get_gemini_file_cache(),
+        )
+    return _llm_client
+
+_model_registry = None
+
+def get_model_registry() -> WhisperModelRegistry:
+    """Build the Whisper model registry from settings on first use."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = WhisperModelRegistry(
+            default_model=settings.whisper_model,
+            allowed_models=[name.strip() for name in settings.whisper_models.split(",") if name.strip()],
+            device=settings.whisper_device,
+            compute_type=settings.whisper_compute_type,
+            cpu_threads=settings.whisper_cpu_threads,
+            num_workers=settings.whisper_num_workers or settings.transcription_workers,
+            tier_models={
+                "fast": settings.whisper_fast_model,
+                "balanced": settings.whisper_balanced_model,
+                "accurate": settings.whisper_accurate_model,
+            },
+        )
+    return _model_registry
+
+_inference_client = None
+
+def get_inference_client() -> Optional[InferenceClient]:
+    """Client of the dedicated inference process. None when models are loaded in this process."""
+    global _inference_client
+    if _inference_client is None and settings.inference_server_socket:
+        _inference_client = InferenceClient(
+            address=settings.inference_server_socket,
+            authkey=bytes.fromhex(settings.inference_server_authkey),
+            connect_timeout=settings.inference_server_connect_timeout,
+        )
+    return _inference_client
+
+def get_whisper_model(name: Optional[str] = None) -> Union[WhisperModel, RemoteWhisperModel]:
+    """
+    Lazy-load a Faster-Whisper model once and reuse it. Defaults to `settings.whisper_model`.
+    With an inference process, a proxy to its copy of the model is returned instead.
+    """
+    client = get_inference_client()
+    if client is not None:
+        return RemoteWhisperModel(get_model_registry().resolve(name), client)
+    return get_model_registry().get(name)
+
+def preload_whisper_models() -> List[str]:
+    """
+    Load the default model and every quality-tier model up front. Runs in the
+    startup warm-up of each process; never call it before a fork (see
+    gunicorn.conf.py). With an inference process, waits for it to load them.
+    """
+    registry = get_model_registry()
+    names = sorted({registry.resolve(None)} | set(registry.tier_models.values()))
+    client = get_inference_client()
+    if client is not None:
+        client.load(names)
+        return names
+    for name in names:
+        registry.get(name)
+    return names
+
+_transcription_executor = None
+
+def get_transcription_executor() -> TranscriptionExecutor:
+    """Create the shared transcription worker pool on first use."""
+    global _transcription_executor
+    if _transcription_executor is None:
+        _transcription_executor = TranscriptionExecutor(
+            max_workers=settings.transcription_workers,
+            max_queue_size=settings.transcription_queue_size,
+            retry_after=settings.transcription_retry_after,
+            aging=settings.transcription_queue_aging,
+        )
+    return _transcription_executor
+
+_transcription_batcher = None
+
+def get_transcription_batcher() -> TranscriptionBatcher:
+    """Create the shared micro-batching scheduler on first use."""
+    global _transcription_batcher
+    if _transcription_batcher is None:
+        _transcription_batcher = TranscriptionBatcher(
+            executor=get_transcription_executor(),
+            get_model=get_whisper_model,
+            window_ms=settings.transcription_batch_window_ms,
+            max_batch_size=settings.transcription_max_batch_size,
+        )
+    return _transcription_batcher
+
+_transcription_cache = None
+
+def get_transcription_cache() -> TranscriptionCache:
+    """Create the shared transcription result cache. The disk tier is never used in privacy mode."""
+    global _transcription_cache
+    if _transcription_cache is None:
+        _transcription_cache = TranscriptionCache(
+            max_entries=settings.transcription_cache_entries,
+            ttl_seconds=settings.transcription_cache_ttl,
+            disk_dir=None if settings.privacy_mode else settings.transcription_cache_dir,
+            disk_max_bytes=settings.transcription_cache_disk_max_bytes,
+        )
+    return _transcription_cache
+
+_long_audio_transcriber = None
+
+def get_long_audio_transcriber() -> LongAudioTranscriber:
+    """Create the process-pool transcriber for long recordings on first use."""
+    global _long_audio_transcriber
+    if _long_audio_transcriber is None:
+        _long_audio_transcriber = LongAudioTranscriber(
+            processes=settings.long_audio_processes,
+            chunk_seconds=settings.long_audio_chunk_seconds,
+            overlap_seconds=settings.long_audio_overlap_seconds,
+            inference_client=get_inference_client(),
+        )
+    return _long_audio_transcriber
+
+_provider_router = None
+
+def get_provider_router() -> ProviderRouter:
+    """Create the adaptive faster-whisper/Gemini router on first use."""
+    global _provider_router
+    if _provider_router is None:
+        _provider_router = ProviderRouter(
+            policy=settings.transcription_routing_policy,
+            max_queue_wait=settings.routing_max_queue_wait_seconds,
+            max_local_seconds=settings.routing_local_max_audio_seconds,
+            max_error_rate=settings.routing_max_error_rate,
+            window=settings.routing_window,
+            window_seconds=settings.routing_window_seconds,
+            min_samples=settings.routing_min_samples,
+            probe_interval=settings.routing_probe_interval_seconds,
+        )
+    return _provider_router
+
+_shadow_evaluator = None
+
+def get_shadow_evaluator() -> Optional[ShadowEvaluator]:
+    """Create the shadow evaluator on first use. None unless SHADOW_ENABLED is set."""
+    global _shadow_evaluator
+    if _shadow_evaluator is None and settings.shadow_enabled:
+        # Imported here: transcribe_audio depends on this module for its models
+        from app.utils.transcribe_audio import transcribe_audio
+        _shadow_evaluator = ShadowEvaluator(
+            executor=get_transcription_executor(),
+            transcribe=functools.partial(transcribe_audio, provider=SHADOW_PROVIDER),
+            candidate_model=get_model_registry().resolve(settings.shadow_model),
+            sample_rate=settings.shadow_sample_rate,
+            max_queue_depth=settings.shadow_max_queue_depth,
+            window=settings.shadow_window,
+        )
+    return _shadow_evaluator
+
+_warmup = None
+
+def get_warmup() -> Warmup:
+    """Build the background warm-up: shared API clients, model loading and a synthetic inference."""
+    global _warmup
+    if _warmup is None:
+        def create_all_clients():
+            create_clients()
+            from app.services.supabase_client import get_supabase_client
+            get_supabase_client()
+
+        def warm_models():
+            for name in preload_whisper_models():
+                synthetic_inference(get_whisper_model(name))
+
+        steps = [("clients", create_all_clients)]
+        # The inference process tunes its own models
+        if settings.whisper_autotune and not settings.inference_server_socket:
+            steps.append(("autotune", lambda: get_model_registry().autotune()))
+        steps.append(("models", preload_whisper_models))
+        if settings.warmup_inference:
+            steps.append(("inference", warm_models))
+        _warmup = Warmup(steps)
+    return _warmup
@@ -1,12 +1,20 @@
+import time
+_import_started = time.perf_counter()
+
 from fastapi import FastAPI,Depends
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from .routers import auth, notes, audio, linear, user, attachments, enquiry, waitlist
 from .middleware.auth import get_current_user
 from dotenv import load_dotenv
-from .dependencies import get_whisper_model 
+from .dependencies import get_warmup, get_transcription_executor, get_long_audio_transcriber, get_gemini_file_deleter, get_gemini_file_cache, get_screenshot_preprocessor, get_shadow_evaluator
+from .config import settings
 import logging
 from app.middleware.prometheus import PrometheusMiddleware, metrics_endpoint
+from app.middleware.upload_limit import UploadLimitMiddleware
 from app.services.clean_up_queue import cleanup_worker
+from app.services.warmup import APP_IMPORT_SECONDS
+from app.services.http_clients import close_clients
 import asyncio
 
 load_dotenv()
@@ -15,11 +23,7 @@ logging.basicConfig(level=logging.INFO)
 
 app = FastAPI()
 
-try:
-    get_whisper_model()
-    logging.info("Faster-Whisper model loading complete. System ready for transcription requests.")
-except Exception as e:
-    logging.error(f"CRITICAL ERROR: Failed to load Faster-Whisper model at startup: {e}")
+app.add_middleware(UploadLimitMiddleware, max_bytes=settings.max_upload_bytes)
 
 app.add_middleware(PrometheusMiddleware)
 
@@ -37,12 +41,34 @@ app.add_route("/metrics", metrics_endpoint)
 async def startup_event():
     asyncio.create_task(cleanup_worker())
     logging.info("Background cleanup worker task scheduled.")
+    # Models load after the server starts listening; /readyz reports when they are warm
+    app.state.warmup = asyncio.get_running_loop().run_in_executor(None, get_warmup().run)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    file_cache = get_gemini_file_cache()
+    if file_cache:
+        file_cache.clear()
+    try:
+        await asyncio.wait_for(get_gemini_file_deleter().drain(), timeout=10)
+    except asyncio.TimeoutError:
+        logging.warning("Gave up waiting for background Gemini file deletions at shutdown.")
+    get_transcription_executor().shutdown()
+    get_long_audio_transcriber().shutdown()
+    preprocessor = get_screenshot_preprocessor()
+    if preprocessor:
+        preprocessor.shutdown()
+    shadow = get_shadow_evaluator()
+    if shadow:
+        shadow.shutdown()
+    await close_clients()
 
 app.include_router(auth.router)
 # Protect other routes with authentication
 app.include_router(notes.router, prefix="/v1/notes", tags=["notes"], dependencies=[Depends(get_current_user)])
 # app.include_router(ocr.router, prefix="/v1/ocr", tags=["ocr"], dependencies=[Depends(get_current_user)])
 app.include_router(audio.router, prefix="/v1/audio", tags=["audio"], dependencies=[Depends(get_current_user)])
+app.include_router(audio.live_router, prefix="/v1/audio", tags=["audio"])
 app.include_router(linear.router, prefix="/v1/linear", tags=["linear"], dependencies=[Depends(get_current_user)])
 app.include_router(user.router, prefix="/v1/user", tags=["user"], dependencies=[Depends(get_current_user)])
 app.include_router(attachments.router, prefix="/v1/attachments", tags=["attachments"])
@@ -53,6 +79,19 @@ app.include_router(waitlist.router, prefix="/v1/waitlist", tags=["waitlist"])
 async def root():   
     return {"message": "Welcome to the Whispa AI QA Agent!"}
 
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: background warm-up has loaded and exercised the Whisper models."""
+    status = get_warmup().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
+
+APP_IMPORT_SECONDS.set(time.perf_counter() - _import_started)
+
 
 # @app.post("/", tags=["OCR"])
 # async def root_post(request: Request):
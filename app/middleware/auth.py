@@ -5,7 +5,10 @@ from app.services.supabase_client import supabase
 security = HTTPBearer()
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Security(security)):
-    token = credentials.credentials
+    return await authenticate_token(credentials.credentials)
+
+async def authenticate_token(token: str):
+    """Resolve a Supabase access token to the current user. Also used for WebSockets, which can't send headers from browsers."""
     try:
         resp = supabase.auth.get_user(token)
     except Exception:
@@ -2,7 +2,8 @@
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import Response
-from prometheus_client import Histogram, Counter, generate_latest
+from prometheus_client import CollectorRegistry, Histogram, Counter, generate_latest, multiprocess
+import os
 import time
 
 REQUEST_COUNT = Counter(
@@ -40,4 +41,9 @@ class PrometheusMiddleware(BaseHTTPMiddleware):
         return response
 
 async def metrics_endpoint(request: Request):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        # Several worker processes (gunicorn.conf.py): aggregate every worker's samples
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return Response(generate_latest(registry), media_type="text/plain")
     return Response(generate_latest(), media_type="text/plain")
\ No newline at end of file
@@ -0,0 +1,64 @@
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Allowance for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+class UploadLimitMiddleware:
+    """
+    Bound request bodies of uploads before they are parsed. A declared
+    Content-Length over the limit is rejected without reading the body; for
+    anything else (chunked transfer encoding, or a client that lies) the body
+    bytes are counted as they arrive on the ASGI receive channel and the
+    request fails with a 413 as soon as the limit is passed, before the
+    multipart parser has spooled the rest.
+
+    A pure ASGI middleware rather than BaseHTTPMiddleware, which can't see the
+    body stream the endpoint consumes.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, path_prefix: str = "/v1/audio"):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefix = path_prefix
+
+    def _too_large(self) -> JSONResponse:
+        return JSONResponse(status_code=413, content={"detail": f"Upload exceeds the {self.max_bytes} byte limit."})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] != "POST" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        limit = self.max_bytes + MULTIPART_OVERHEAD
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await self._too_large()(scope, receive, send)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised into whatever is reading the body; FastAPI passes HTTPExceptions through form parsing
+                    raise HTTPException(status_code=413, detail=f"Upload exceeds the {self.max_bytes} byte limit.")
+            return message
+
+        async def tracked_send(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as e:
+            if e.status_code != 413 or response_started:
+                raise
+            await self._too_large()(scope, receive, send)
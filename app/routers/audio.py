@@ -1,10 +1,23 @@
-from fastapi import APIRouter, HTTPException, UploadFile, File
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
 from app.services.audio_service import AudioService 
+from app.services.live_transcription import LiveAudioBuffer, LIVE_DECODER_DRAIN_SECONDS, LIVE_SESSIONS_TOTAL, LIVE_FINAL_LATENCY_SECONDS
+from app.dependencies import get_shadow_evaluator, get_transcription_executor
+from app.middleware.auth import authenticate_token
+from app.utils.audio_decode import SAMPLE_RATE
+from app.config import settings
 from prometheus_client import Counter, Histogram
+from typing import Optional
+import asyncio
+import json
 import time
 
 router = APIRouter()
 
+# WebSocket routes authenticate with a `token` query parameter, since browsers
+# can't send an Authorization header on a WebSocket handshake.
+live_router = APIRouter()
+
 TRANSCRIPTION_ENDPOINT_COUNT = Counter(
     'transcription_endpoint_total', 'Total transcription attempts processed',
     ['status', 'provider']
@@ -15,6 +28,16 @@ TRANSCRIPTION_LATENCY_SECONDS = Histogram(
     ['provider']
 )
 
+TRANSCRIPTION_QUALITY_LATENCY_SECONDS = Histogram(
+    'transcription_quality_latency_seconds', 'Transcription endpoint latency by quality tier (seconds)',
+    ['provider', 'quality']
+)
+
+TRANSCRIPTION_FIRST_SEGMENT_SECONDS = Histogram(
+    'transcription_first_segment_seconds', 'Time from request to the first streamed segment (seconds)',
+    ['provider']
+)
+
 @router.post("/transcribe/old", summary="Upload and transcribe audio file using Gemini")
 async def process_audio(audio_file: UploadFile = File(...)):
     PROVIDER_LABEL = 'gemini' 
@@ -46,13 +69,19 @@ async def process_audio(audio_file: UploadFile = File(...)):
 
 
 @router.post("/transcribe", summary="Upload and transcribe audio file using Faster-Whisper")
-async def process_audio_faster_whisper(audio_file: UploadFile = File(...)):
+async def process_audio_faster_whisper(
+    audio_file: UploadFile = File(...),
+    model: Optional[str] = Form(None, description="Whisper model tier, e.g. tiny, base or small"),
+    quality: Optional[str] = Form(None, description="Quality tier: fast, balanced or accurate (default)"),
+):
     PROVIDER_LABEL = 'faster_whisper' 
     start_time = time.time()
+    tier = None
     
     try:
         service = AudioService()
-        text = await service.transcribe_audio_with_faster_whisper(audio_file) 
+        tier = service.resolve_quality(quality)
+        text = await service.transcribe_audio_with_faster_whisper(audio_file, model=model, quality=tier) 
         
         if not text or text.lower().startswith("error transcribing audio"):
             TRANSCRIPTION_ENDPOINT_COUNT.labels(status='fail', provider=PROVIDER_LABEL).inc()
@@ -70,4 +99,185 @@ async def process_audio_faster_whisper(audio_file: UploadFile = File(...)):
     finally:
         end_time = time.time()
         process_time = end_time - start_time
-        TRANSCRIPTION_LATENCY_SECONDS.labels(provider=PROVIDER_LABEL).observe(process_time)
\ No newline at end of file
+        TRANSCRIPTION_LATENCY_SECONDS.labels(provider=PROVIDER_LABEL).observe(process_time)
+        if tier:
+            TRANSCRIPTION_QUALITY_LATENCY_SECONDS.labels(provider=PROVIDER_LABEL, quality=tier).observe(process_time)
+
+
+@router.post("/transcribe/auto", summary="Upload audio and transcribe with the provider picked by the adaptive router")
+async def process_audio_auto(
+    audio_file: UploadFile = File(...),
+    model: Optional[str] = Form(None, description="Whisper model tier used if the request is routed locally"),
+):
+    # Recorded as auto_faster_whisper / auto_gemini once the router has decided
+    provider_label = 'auto'
+    start_time = time.time()
+
+    try:
+        service = AudioService()
+        text, provider = await service.transcribe_audio_auto(audio_file, model=model)
+        provider_label = f'auto_{provider}'
+
+        if not text or text.lower().startswith("error transcribing audio"):
+            TRANSCRIPTION_ENDPOINT_COUNT.labels(status='fail', provider=provider_label).inc()
+            raise HTTPException(status_code=400, detail=f"Transcription failed or was empty: {text}")
+
+        TRANSCRIPTION_ENDPOINT_COUNT.labels(status='success', provider=provider_label).inc()
+        return {"success": True, "audio_text": text, "provider": provider}
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        TRANSCRIPTION_ENDPOINT_COUNT.labels(status='error', provider=provider_label).inc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during transcription: {str(e)}")
+
+    finally:
+        TRANSCRIPTION_LATENCY_SECONDS.labels(provider=provider_label).observe(time.time() - start_time)
+
+
+@router.post("/transcribe/stream", summary="Upload audio and stream Faster-Whisper segments as NDJSON")
+async def stream_audio_faster_whisper(
+    audio_file: UploadFile = File(...),
+    model: Optional[str] = Form(None, description="Whisper model tier, e.g. tiny, base or small"),
+    quality: Optional[str] = Form(None, description="Quality tier: fast, balanced or accurate (default)"),
+):
+    PROVIDER_LABEL = 'faster_whisper_stream'
+    start_time = time.time()
+
+    try:
+        service = AudioService()
+        tier = service.resolve_quality(quality)
+        model_name = service.resolve_whisper_model(model, tier)
+        upload = await service.read_audio_upload(audio_file)
+        events = service.stream_transcription_with_faster_whisper(upload, model_name, tier)
+    except HTTPException:
+        TRANSCRIPTION_ENDPOINT_COUNT.labels(status='fail', provider=PROVIDER_LABEL).inc()
+        raise
+    except Exception as e:
+        TRANSCRIPTION_ENDPOINT_COUNT.labels(status='error', provider=PROVIDER_LABEL).inc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during transcription: {str(e)}")
+
+    async def ndjson_stream():
+        status = 'success'
+        first_segment = True
+        try:
+            async for event in events:
+                if event["type"] == "segment" and first_segment:
+                    first_segment = False
+                    TRANSCRIPTION_FIRST_SEGMENT_SECONDS.labels(provider=PROVIDER_LABEL).observe(time.time() - start_time)
+                elif event["type"] == "error":
+                    status = 'error'
+                yield json.dumps(event) + "\n"
+        finally:
+            TRANSCRIPTION_ENDPOINT_COUNT.labels(status=status, provider=PROVIDER_LABEL).inc()
+            TRANSCRIPTION_LATENCY_SECONDS.labels(provider=PROVIDER_LABEL).observe(time.time() - start_time)
+            TRANSCRIPTION_QUALITY_LATENCY_SECONDS.labels(provider=PROVIDER_LABEL, quality=tier).observe(time.time() - start_time)
+
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+
+@router.get("/shadow/summary", summary="Rolling comparison of the shadow candidate model against the primary model")
+async def shadow_summary(recent: int = 10):
+    shadow = get_shadow_evaluator()
+    if shadow is None:
+        return {"enabled": False}
+    return {"enabled": True, **shadow.summary(recent=max(0, min(recent, 100)))}
+
+
+@live_router.websocket("/transcribe/live")
+async def live_transcription(
+    websocket: WebSocket,
+    token: str = Query(..., description="Supabase access token"),
+    format: str = Query("webm", description="Frame format: webm (MediaRecorder Opus/WebM chunks) or pcm (s16le, 16 kHz mono)"),
+    model: Optional[str] = Query(None, description="Whisper model tier, e.g. tiny, base or small"),
+    quality: Optional[str] = Query(None, description="Quality tier: fast (default), balanced or accurate"),
+):
+    """
+    Stream microphone audio as binary frames while the user speaks. About every
+    LIVE_STEP_SECONDS the server sends a `partial` event with committed and
+    tentative text. Send `{"type": "stop"}` when the user stops: the remaining
+    few seconds are transcribed and a `final` event follows.
+    """
+    try:
+        await authenticate_token(token)
+        service = AudioService()
+        buffer = LiveAudioBuffer(format)
+        transcriber = service.create_live_transcriber(model, quality or settings.live_quality)
+    except (HTTPException, ValueError) as e:
+        LIVE_SESSIONS_TOTAL.labels(outcome='rejected').inc()
+        await websocket.close(code=1008, reason=str(getattr(e, "detail", e))[:120])
+        return
+
+    await websocket.accept()
+    executor = get_transcription_executor()
+    stopped = asyncio.Event()
+    disconnected = False
+
+    async def receive_frames():
+        nonlocal disconnected
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    disconnected = True
+                    break
+                if message.get("bytes"):
+                    buffer.feed(message["bytes"])
+                elif message.get("text"):
+                    try:
+                        control = json.loads(message["text"])
+                    except ValueError:
+                        continue
+                    if isinstance(control, dict) and control.get("type") == "stop":
+                        break
+        finally:
+            stopped.set()
+
+    async def run_pass():
+        transcriber.append(await asyncio.to_thread(buffer.take_new_samples))
+        audio, offset, prompt = transcriber.snapshot()
+        return await executor.run(transcriber.transcribe_window, audio, offset, prompt, job_seconds=audio.size / SAMPLE_RATE)
+
+    receiver = asyncio.create_task(receive_frames())
+    outcome = 'completed'
+    try:
+        while not stopped.is_set() and transcriber.duration < settings.live_max_seconds:
+            try:
+                await asyncio.wait_for(stopped.wait(), timeout=settings.live_step_seconds)
+                break
+            except asyncio.TimeoutError:
+                pass
+            try:
+                words = await run_pass()
+            except HTTPException as e:
+                if e.status_code == 503:
+                    # Queue is busy; skip this pass; the next one covers the same audio
+                    continue
+                raise
+            await websocket.send_json(transcriber.partial_event(transcriber.update(words)))
+
+        if disconnected:
+            outcome = 'disconnected'
+            return
+
+        stop_time = time.time()
+        await asyncio.to_thread(buffer.close, LIVE_DECODER_DRAIN_SECONDS)
+        transcriber.finish(await run_pass())
+        await websocket.send_json(transcriber.final_event())
+        LIVE_FINAL_LATENCY_SECONDS.observe(time.time() - stop_time)
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        outcome = 'disconnected'
+    except Exception as e:
+        outcome = 'error'
+        detail = e.detail if isinstance(e, HTTPException) else f"Error transcribing audio: {str(e)}"
+        try:
+            await websocket.send_json({"type": "error", "detail": detail})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        receiver.cancel()
+        buffer.close(timeout=0)
+        LIVE_SESSIONS_TOTAL.labels(outcome=outcome).inc()
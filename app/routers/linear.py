@@ -1,10 +1,12 @@
-from fastapi import APIRouter, HTTPException, Request
+import httpx
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.services.linear_service import LinearService
+from app.dependencies import get_http_client
 
 router = APIRouter()
 
 @router.post('/create-issue', summary="Creates issue on Linear")
-async def create_issue(request: Request):
+async def create_issue(request: Request, http: httpx.AsyncClient = Depends(get_http_client)):
     try:
         request_data = await request.json()
         # Validate required fields
@@ -13,7 +15,7 @@ async def create_issue(request: Request):
             if field not in request_data:
                 raise HTTPException(status_code=400, detail=f"Missing required field: {field}")
 
-        linear_service = LinearService()
+        linear_service = LinearService(http)
         response = await linear_service.create_issue(title=request_data["title"], description=request_data["description"] or "", team_id=request_data["team_id"], priority=request_data["priority"] or 1, label_ids=request_data["label_ids"] or [], api_key=request_data['api_key'], image_base64_list=request_data["images"] or [])
 
         return {"success": True, "issue": response.to_dict()}
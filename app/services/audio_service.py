@@ -1,20 +1,40 @@
 import asyncio
 from fastapi import UploadFile, HTTPException
-from google.genai import Client
-from google.genai.errors import APIError 
-from typing import Optional
+from typing import Awaitable, Optional, AsyncGenerator, Tuple
 from app.config import settings
-from app.utils.transcribe_audio import transcribe_file_path
-import aiofiles
-import os
-import tempfile
+from app.utils.transcribe_audio import transcribe_file_path, transcribe_audio, decode_via_temp_file, transcribe_bytes_segments, transcribe_base64_audio
+from app.services.whisper_registry import resolve_quality, whisper_options, with_timestamps
+from app.services.transcription_batcher import supports_batching
+from app.utils.audio_decode import decode_audio_bytes, probe_duration, SAMPLE_RATE
+from app.services.transcription_metrics import stage_timer, observe_audio_duration, observe_inference
+from app.utils.upload_ingest import ingest_upload, IngestedUpload
+from app.dependencies import get_whisper_model, get_transcription_executor, get_transcription_batcher, get_transcription_cache, get_model_registry, get_long_audio_transcriber, get_provider_router, get_shadow_evaluator, get_gemini_file_deleter, get_gemini_client
+from app.services.provider_router import LOCAL, REMOTE, TRANSCRIPTION_ROUTING_DECISIONS
+from app.services.live_transcription import LiveTranscriber
+from prometheus_client import Counter
+import threading
+import time
+
+GEMINI_TRANSCRIPTION_STRATEGY = Counter(
+    'gemini_transcription_strategy_total', 'Gemini transcriptions by how the audio was sent',
+    ['strategy']
+)
+
+def _timed(fn, *args):
+    """Run `fn` and return (result, seconds) measured where it runs, so queue wait is excluded."""
+    start_time = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start_time
 
 class AudioService:
     def __init__(self):
-        self.client = Client(api_key=settings.gemini_api_key) 
-        self.aclient = self.client.aio
+        # Shared pooled client; None without GEMINI_API_KEY
+        self.client = get_gemini_client()
+        self.aclient = self.client.aio if self.client else None
         self.model_name = "gemini-2.5-flash"
         self.transcribe_file_path = transcribe_file_path
+        self.transcribe_audio = transcribe_audio
+        self.transcribe_base64_audio = transcribe_base64_audio
         self.gemini_key = settings.gemini_api_key
 
     def process_audio(self, audio_base64: str, file_suffix: str) -> str:
@@ -26,45 +46,67 @@ class AudioService:
 
     async def transcribe_audio_with_gemini(self, audio_file: UploadFile) -> str:
         
-        audio_bytes = await audio_file.read()
-        mime_type = audio_file.content_type
-    
-        if not audio_bytes or not mime_type.startswith('audio/'):
-            raise HTTPException(status_code=400, detail="Invalid or empty audio file provided.")
-
-        audio_file_upload = None
-        temp_file_path = None
+        with stage_timer('upload_read', 'gemini', self.model_name):
+            upload = await self.read_audio_upload(audio_file)
+        mime_type = upload.content_type
 
         try:
-            suffix = "." + mime_type.split("/")[-1] if "/" in mime_type else ".tmp"
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                temp_file_path = tmp.name
+            return await self._observe_provider(REMOTE, self._transcribe_upload_with_gemini(upload, mime_type))
+        finally:
+            upload.close()
 
-            async with aiofiles.open(temp_file_path, 'wb') as f:
-                await f.write(audio_bytes)
+    async def _transcribe_upload_with_gemini(self, upload: IngestedUpload, mime_type: str) -> str:
+        from google.genai import types
+        from google.genai.errors import APIError
 
-            config = {
-                'mime_type': mime_type
-            }
-                
-            audio_file_upload = await self.aclient.files.upload(
-                file=temp_file_path, 
-                config=config  
-            )
+        if not self.aclient:
+            raise HTTPException(status_code=500, detail="Gemini client not initialized. Check GEMINI_API_KEY in settings.")
+
+        cache = get_transcription_cache()
+        cache_key = cache.make_key(upload.sha256, provider='gemini', model=self.model_name)
+        cached_text = await cache.get(cache_key, provider='gemini')
+        if cached_text is not None:
+            return cached_text
+
+        audio_file_upload = None
+
+        audio_seconds = probe_duration(upload.file)
+        if audio_seconds:
+            observe_audio_duration('gemini', self.model_name, audio_seconds)
+
+        try:
+            if upload.size <= settings.gemini_inline_max_bytes:
+                GEMINI_TRANSCRIPTION_STRATEGY.labels(strategy='inline').inc()
+                audio_part = types.Part.from_bytes(data=upload.read(), mime_type=mime_type)
+            else:
+                GEMINI_TRANSCRIPTION_STRATEGY.labels(strategy='files_api').inc()
+                with stage_timer('upload', 'gemini', self.model_name):
+                    upload.file.seek(0)
+                    audio_file_upload = await self.aclient.files.upload(
+                        file=upload.file,
+                        config={'mime_type': mime_type}
+                    )
+                audio_part = audio_file_upload
         
             prompt = [
                 "Transcribe this audio file accurately. Include all punctuation and capitalization.",
-                audio_file_upload 
+                audio_part
             ]
         
+            start_time = time.perf_counter()
             response = await self.aclient.models.generate_content(
                 model=self.model_name, 
                 contents=prompt
             )
-            transcribed_text = response.text.replace('\n', ' ')
-        
-            return ' '.join(transcribed_text.split()).strip()
+            observe_inference('gemini', self.model_name, time.perf_counter() - start_time, audio_seconds or 0)
+
+            with stage_timer('postprocess', 'gemini', self.model_name):
+                transcribed_text = response.text.replace('\n', ' ')
+                transcribed_text = ' '.join(transcribed_text.split()).strip()
+
+                if transcribed_text:
+                    await cache.set(cache_key, transcribed_text)
+            return transcribed_text
 
         except HTTPException:
             raise
@@ -75,41 +117,236 @@ class AudioService:
 
         finally:
             if audio_file_upload:
-                await self.aclient.files.delete(
-                    name=audio_file_upload.name 
-                )
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
+                self._schedule_gemini_file_delete(audio_file_upload.name)
+
+    def _schedule_gemini_file_delete(self, name: str):
+        """Delete an uploaded Gemini file in the background so the response doesn't wait on it."""
+        get_gemini_file_deleter().schedule(self.aclient, name)
     
-    async def transcribe_audio_with_faster_whisper(self, audio_file: UploadFile) -> str:
-        
-        await audio_file.seek(0)
-        audio_bytes = await audio_file.read()
+    async def read_audio_upload(self, audio_file: UploadFile) -> IngestedUpload:
+        """
+        Validate an uploaded audio file and ingest it in bounded chunks. The caller
+        owns the returned spool and must close it.
+        """
         mime_type = audio_file.content_type
-    
-        if not audio_bytes or not mime_type.startswith('audio/'):
+        if not mime_type or not mime_type.startswith('audio/'):
             raise HTTPException(status_code=400, detail="Invalid or empty audio file provided.")
 
-        temp_file_path = None
+        upload = await ingest_upload(
+            audio_file,
+            max_bytes=settings.max_upload_bytes,
+            chunk_size=settings.upload_chunk_bytes,
+            spool_max_memory=settings.upload_spool_max_memory,
+        )
+        if not upload.size:
+            upload.close()
+            raise HTTPException(status_code=400, detail="Invalid or empty audio file provided.")
+        return upload
 
+    def resolve_whisper_model(self, model: Optional[str] = None, quality: Optional[str] = None) -> str:
+        """Validate a requested model tier against the configured registry."""
         try:
-            suffix = "." + mime_type.split("/")[-1] if "/" in mime_type else ".tmp"
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-                temp_file_path = tmp.name
+            return get_model_registry().resolve(model, quality)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-            async with aiofiles.open(temp_file_path, 'wb') as f:
-                await f.write(audio_bytes)
+    def resolve_quality(self, quality: Optional[str] = None) -> str:
+        """Validate a requested quality tier (fast, balanced, accurate)."""
+        try:
+            return resolve_quality(quality)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-            transcribed_text = self.transcribe_file_path(temp_file_path)
+    async def transcribe_audio_with_faster_whisper(self, audio_file: UploadFile, model: Optional[str] = None, quality: Optional[str] = None) -> str:
         
-            return ' '.join(transcribed_text.split()).strip()
+        quality = self.resolve_quality(quality)
+        model_name = self.resolve_whisper_model(model, quality)
+        with stage_timer('upload_read', 'faster_whisper', model_name):
+            upload = await self.read_audio_upload(audio_file)
+
+        try:
+            return await self._observe_provider(LOCAL, self._transcribe_upload_with_faster_whisper(upload, model_name, quality))
+        finally:
+            upload.close()
+
+    async def _transcribe_upload_with_faster_whisper(self, upload: IngestedUpload, model_name: str, quality: Optional[str] = None) -> str:
+        options = whisper_options(quality)
+        cache = get_transcription_cache()
+        cache_key = cache.make_key(
+            upload.sha256,
+            provider='faster_whisper',
+            model=model_name,
+            compute_type=settings.whisper_compute_type,
+            **options,
+        )
+        cached_text = await cache.get(cache_key, provider='faster_whisper')
+        if cached_text is not None:
+            return cached_text
+
+        try:
+            with stage_timer('decode', 'faster_whisper', model_name):
+                audio = await self._decode_upload(upload)
+
+            executor = get_transcription_executor()
+            # Inference time of an unbatched primary run, for the shadow latency ratio
+            primary_seconds = None
+            if settings.long_audio_enabled and audio.size >= settings.long_audio_min_seconds * SAMPLE_RATE:
+                transcribed_text = await executor.run(get_long_audio_transcriber().transcribe, audio, model_name, options, job_seconds=audio.size / SAMPLE_RATE)
+            elif settings.transcription_batching and audio.size <= settings.transcription_batch_max_seconds * SAMPLE_RATE and supports_batching(options):
+                transcribed_text = await get_transcription_batcher().submit(audio, model_name, quality)
+            else:
+                transcribed_text, primary_seconds = await executor.run(_timed, self.transcribe_audio, audio, model_name, options, job_seconds=audio.size / SAMPLE_RATE)
+
+            with stage_timer('postprocess', 'faster_whisper', model_name):
+                transcribed_text = ' '.join(transcribed_text.split()).strip()
+                succeeded = transcribed_text and not transcribed_text.lower().startswith("error transcribing audio")
+                if succeeded:
+                    await cache.set(cache_key, transcribed_text)
+
+            shadow = get_shadow_evaluator()
+            if shadow and succeeded and audio.size < settings.long_audio_min_seconds * SAMPLE_RATE:
+                shadow.maybe_schedule(audio, transcribed_text, primary_seconds, model_name, options)
+            return transcribed_text
 
         except HTTPException:
             raise
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Internal Server Error during transcription: {str(e)}")
 
+    async def _decode_upload(self, upload: IngestedUpload):
+        """Decode an upload in memory, falling back to a temp file. Undecodable audio is the client's error (400)."""
+        try:
+            return await asyncio.to_thread(decode_audio_bytes, upload.file)
+        except Exception:
+            pass
+        try:
+            return await asyncio.to_thread(decode_via_temp_file, upload.file, upload.suffix)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Could not decode the uploaded audio: {e}")
+
+    async def transcribe_audio_auto(self, audio_file: UploadFile, model: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Transcribe with whichever provider the adaptive router picks from queue
+        depth, audio duration and recent latency/error rates. If the local queue
+        turns out to be full the request spills to Gemini instead of failing.
+        Returns the text and the provider that produced it.
+        """
+        model_name = self.resolve_whisper_model(model)
+        upload = await self.read_audio_upload(audio_file)
+
+        try:
+            executor = get_transcription_executor()
+            provider = get_provider_router().choose(probe_duration(upload.file), executor.queue_depth, executor.max_workers)
+
+            if provider == LOCAL:
+                try:
+                    text = await self._observe_provider(LOCAL, self._transcribe_upload_with_faster_whisper(upload, model_name))
+                    return text, LOCAL
+                except HTTPException as e:
+                    if e.status_code != 503:
+                        raise
+                    TRANSCRIPTION_ROUTING_DECISIONS.labels(provider=REMOTE, reason='queue_full').inc()
+
+            text = await self._observe_provider(REMOTE, self._transcribe_upload_with_gemini(upload, upload.content_type))
+            return text, REMOTE
+        finally:
+            upload.close()
+
+    async def _observe_provider(self, provider: str, transcription: Awaitable[str]) -> str:
+        """
+        Await a provider call and feed its latency and outcome to the router. A
+        full queue or a bad upload (4xx) says nothing about the provider's health.
+        """
+        start_time = time.perf_counter()
+        ok = False
+        try:
+            text = await transcription
+            ok = bool(text) and not text.lower().startswith("error transcribing audio")
+            return text
+        except HTTPException as e:
+            if e.status_code == 503 or 400 <= e.status_code < 500:
+                ok = None
+            raise
+        finally:
+            if ok is not None:
+                get_provider_router().record(provider, time.perf_counter() - start_time, ok)
+
+    def create_live_transcriber(self, model: Optional[str] = None, quality: Optional[str] = None) -> LiveTranscriber:
+        """Rolling-window transcriber for one live microphone session."""
+        quality = self.resolve_quality(quality)
+        model_name = self.resolve_whisper_model(model, quality)
+        return LiveTranscriber(
+            get_model=lambda: get_whisper_model(model_name),
+            model_name=model_name,
+            options=whisper_options(quality),
+            window_seconds=settings.live_window_seconds,
+        )
+
+    def stream_transcription_with_faster_whisper(self, upload: IngestedUpload, model_name: Optional[str] = None, quality: Optional[str] = None) -> AsyncGenerator[dict, None]:
+        """
+        Queue a streaming transcription and return a generator of events: one per
+        decoded segment, then a summary (or error) event. The job is submitted
+        before the response starts so a full queue still surfaces as a 503.
+        The upload spool is closed once the job finishes.
+        """
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+
+        def on_segment(seg):
+            loop.call_soon_threadsafe(events.put_nowait, {
+                "type": "segment",
+                "id": seg.id,
+                "start": round(seg.start, 2),
+                "end": round(seg.end, 2),
+                "text": seg.text.strip(),
+            })
+
+        executor = get_transcription_executor()
+        try:
+            job = executor.submit(
+                transcribe_bytes_segments, upload.file, upload.suffix, on_segment, stop, model_name, with_timestamps(whisper_options(quality)),
+                job_seconds=probe_duration(upload.file),
+            )
+        except BaseException:
+            upload.close()
+            raise
+
+        def on_done(_):
+            upload.close()
+            events.put_nowait(None)
+
+        job.add_done_callback(on_done)
+
+        return self._relay_segment_events(job, events, stop)
+
+    async def _relay_segment_events(self, job: asyncio.Future, events: asyncio.Queue, stop: threading.Event) -> AsyncGenerator[dict, None]:
+        texts = []
+        try:
+            while True:
+                event = await events.get()
+                if event is None:
+                    break
+                texts.append(event["text"])
+                yield event
+
+            try:
+                info = job.result()
+            except HTTPException as e:
+                yield {"type": "error", "status_code": e.status_code, "detail": e.detail}
+                return
+            except Exception as e:
+                yield {"type": "error", "status_code": 500, "detail": f"Error transcribing audio: {str(e)}"}
+                return
+
+            text = ' '.join(' '.join(texts).split()).strip()
+            yield {
+                "type": "summary",
+                "text": text or "No speech detected",
+                "segments": len(texts),
+                "duration": round(info.duration, 2),
+                "language": info.language,
+            }
+
         finally:
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
\ No newline at end of file
+            stop.set()
@@ -0,0 +1,233 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, List, Optional, Tuple
+from prometheus_client import Counter, Histogram
+
+GEMINI_FILE_UPLOAD_SECONDS = Histogram(
+    'gemini_file_upload_seconds', 'Wall time to upload all files for one Gemini request (seconds)'
+)
+
+GEMINI_IMAGE_PARTS_TOTAL = Counter(
+    'gemini_image_parts_total', 'Images sent to Gemini by how they were attached',
+    ['strategy', 'mime_type']
+)
+
+GEMINI_FILE_CACHE_TOTAL = Counter(
+    'gemini_file_cache_total', 'Lookups of reusable Gemini file handles by result',
+    ['result']
+)
+
+GEMINI_FILE_DELETES_TOTAL = Counter(
+    'gemini_file_deletes_total', 'Background Gemini Files API deletions by outcome',
+    ['outcome']
+)
+
+
+def plan_inline(sizes: List[int], max_inline_bytes: int, budget_bytes: int) -> List[bool]:
+    """
+    Decide per attachment whether it goes inline in the request (True) or through
+    the Files API (False). Attachments up to `max_inline_bytes` are inlined
+    smallest first while their total stays within `budget_bytes`, so the most
+    attachments save their upload and delete round trips.
+    """
+    inline = [False] * len(sizes)
+    used = 0
+    for i in sorted(range(len(sizes)), key=lambda i: sizes[i]):
+        if sizes[i] > max_inline_bytes or used + sizes[i] > budget_bytes:
+            continue
+        inline[i] = True
+        used += sizes[i]
+    return inline
+
+
+async def upload_files(aclient, files: List[Tuple[Any, Optional[str]]], max_concurrency: int, deleter: "GeminiFileDeleter") -> list:
+    """
+    Upload `(file, mime_type)` pairs to the Gemini Files API concurrently, at most
+    `max_concurrency` at a time, and return the handles in input order.
+
+    Fails fast: on the first error the remaining uploads are cancelled, any that
+    already finished are handed to `deleter`, and the error is raised.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    failed = False
+
+    async def upload(file, mime_type):
+        nonlocal failed
+        async with semaphore:
+            # A failed upload frees its slot before the others are cancelled
+            if failed:
+                raise asyncio.CancelledError()
+            config = {'mime_type': mime_type} if mime_type else None
+            try:
+                return await aclient.files.upload(file=file, config=config)
+            except Exception:
+                failed = True
+                raise
+
+    start_time = time.perf_counter()
+    tasks = [asyncio.create_task(upload(file, mime_type)) for file, mime_type in files]
+    try:
+        uploaded = await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for task in tasks:
+            if not task.cancelled() and task.exception() is None:
+                deleter.schedule(aclient, task.result().name)
+        raise
+    GEMINI_FILE_UPLOAD_SECONDS.observe(time.perf_counter() - start_time)
+    return uploaded
+
+
+class GeminiFileDeleter:
+    """
+    Deletes uploaded Gemini files in the background so responses never wait on
+    cleanup. `schedule` only enqueues; a worker task on the event loop takes
+    up to `batch_size` pending names at a time and deletes them concurrently.
+    Failures are logged and counted, not raised: uploaded files also expire on
+    their own after 48 hours.
+    """
+
+    def __init__(self, batch_size: int = 16):
+        self.batch_size = max(1, batch_size)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop = None
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    def schedule(self, aclient, name: str):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker is None or self._worker.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        self._queue.put_nowait((aclient, name))
+
+    async def drain(self):
+        """Wait until every scheduled deletion has been attempted."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+
+    async def _run(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            results = await asyncio.gather(
+                *(aclient.files.delete(name=name) for aclient, name in batch),
+                return_exceptions=True,
+            )
+            for (_, name), result in zip(batch, results):
+                if isinstance(result, Exception):
+                    GEMINI_FILE_DELETES_TOTAL.labels(outcome='error').inc()
+                    logging.warning(f"Failed to delete Gemini file {name}: {result}")
+                else:
+                    GEMINI_FILE_DELETES_TOTAL.labels(outcome='deleted').inc()
+                queue.task_done()
+
+
+class CachedFile:
+    """An uploaded Gemini file shared between requests, with the number of requests using it."""
+
+    def __init__(self, key: str, file, aclient, expires_at: float):
+        self.key = key
+        self.file = file
+        self.aclient = aclient
+        self.expires_at = expires_at
+        self.refs = 0
+        self.retired = False
+        self.deleted = False
+
+    @property
+    def name(self) -> str:
+        return self.file.name
+
+
+class GeminiFileCache:
+    """
+    Maps the content hash of an attachment to a file already uploaded to the
+    Gemini Files API, so regenerating notes for the same screenshots skips the
+    upload and the delete.
+
+    Handles are reused for `ttl_seconds`, and never past an hour before the
+    provider's own expiration_time (uploads expire after 48 hours). Requests
+    `acquire` a handle and `release` it when their response ends; a file is
+    only deleted once it has been evicted, expired or invalidated and no
+    request holds it any more. Runs on the event loop, so no locking.
+    """
+
+    EXPIRY_MARGIN_SECONDS = 3600
+
+    def __init__(self, max_entries: int, ttl_seconds: int, deleter: GeminiFileDeleter):
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self.deleter = deleter
+        self._entries: "OrderedDict[str, CachedFile]" = OrderedDict()
+
+    def acquire(self, key: str) -> Optional[CachedFile]:
+        entry = self._entries.get(key)
+        if entry is None:
+            GEMINI_FILE_CACHE_TOTAL.labels(result='miss').inc()
+            return None
+        if time.time() >= entry.expires_at:
+            GEMINI_FILE_CACHE_TOTAL.labels(result='expired').inc()
+            self._retire(entry)
+            return None
+        GEMINI_FILE_CACHE_TOTAL.labels(result='hit').inc()
+        self._entries.move_to_end(key)
+        entry.refs += 1
+        return entry
+
+    def put(self, key: str, file, aclient) -> CachedFile:
+        """Cache a freshly uploaded file, held by the calling request."""
+        expires_at = time.time() + self.ttl
+        provider_expiry = getattr(file, "expiration_time", None)
+        if provider_expiry is not None:
+            expires_at = min(expires_at, provider_expiry.timestamp() - self.EXPIRY_MARGIN_SECONDS)
+
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._retire(previous)
+        entry = CachedFile(key, file, aclient, expires_at)
+        entry.refs = 1
+        self._entries[key] = entry
+        self._evict()
+        return entry
+
+    def release(self, entry: CachedFile):
+        entry.refs -= 1
+        if entry.refs <= 0 and (entry.retired or time.time() >= entry.expires_at):
+            self._retire(entry)
+        self._evict()
+
+    def invalidate(self, entry: CachedFile):
+        """Stop handing out a handle the provider rejected; it is deleted once released."""
+        GEMINI_FILE_CACHE_TOTAL.labels(result='invalidated').inc()
+        self._retire(entry)
+
+    def clear(self):
+        """Retire every entry, e.g. at shutdown. Files still in use are deleted when released."""
+        for entry in list(self._entries.values()):
+            self._retire(entry)
+
+    def _evict(self):
+        """Drop least recently used idle entries while over capacity. Entries in use may overflow it briefly."""
+        for entry in [e for e in self._entries.values() if e.refs == 0]:
+            if len(self._entries) <= self.max_entries:
+                break
+            self._retire(entry)
+
+    def _retire(self, entry: CachedFile):
+        if self._entries.get(entry.key) is entry:
+            del self._entries[entry.key]
+        entry.retired = True
+        if entry.refs <= 0 and not entry.deleted:
+            entry.deleted = True
+            self.deleter.schedule(entry.aclient, entry.name)
@@ -1,6 +1,7 @@
-import requests
+import httpx
 from typing import Optional, Dict, Any, List
 import json
+from app.services.http_clients import get_http_client
 
 class GitHubResponse:
     def __init__(self, url: str, html_url: str, number: int, title: str, body: str):
@@ -11,13 +12,14 @@ class GitHubResponse:
         self.body = body
 
 class GitHubService:
-    def __init__(self, owner: str, repo: str):
+    def __init__(self, owner: str, repo: str, http: Optional[httpx.AsyncClient] = None):
+        self.http = http or get_http_client()
         self.owner = owner
         self.repo = repo
         self.api_base_url = "https://api.github.com"
         self.api_url = f"{self.api_base_url}/repos/{owner}/{repo}"
 
-    def _execute_api(self, method: str, path: str, api_key: str, data: Optional[dict] = None) -> Dict[str, Any]:
+    async def _execute_api(self, method: str, path: str, api_key: str, data: Optional[dict] = None) -> Dict[str, Any]:
         headers = {
             "Authorization": f"token {api_key}",
             "Accept": "application/vnd.github.v3+json"
@@ -27,7 +29,7 @@ class GitHubService:
 
         url = f"{self.api_url}{path}"
         
-        response = requests.request(
+        response = await self.http.request(
             method,
             url,
             headers=headers,
@@ -66,7 +68,7 @@ class GitHubService:
             "labels": label_names or []
         }
 
-        data = self._execute_api("POST", "/issues", api_key, data=payload)
+        data = await self._execute_api("POST", "/issues", api_key, data=payload)
         
         if data.get("id"):
             return GitHubResponse(
@@ -0,0 +1,106 @@
+"""
+Shared outbound clients: Gemini, OpenAI and a general-purpose HTTP client.
+
+Each is created once per process with a keep-alive connection pool, so
+requests reuse warm TLS connections instead of building a client (and a
+handshake) per call. Pool limits and timeouts come from `Settings`. The
+clients are built by the startup warm-up and closed at shutdown; getters
+create them on demand if a request gets there first. Under gunicorn they are
+created in each worker, never in the master, so no socket crosses a fork.
+"""
+import logging
+import threading
+from typing import Optional
+import httpx
+from app.config import settings
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.AsyncClient] = None
+_gemini_client = None
+# google-genai leaves a caller-supplied transport open, so it is closed here
+_gemini_http_client: Optional[httpx.AsyncClient] = None
+_openai_client = None
+
+
+def _pooled_httpx_client(timeout_seconds: float) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout_seconds, connect=settings.http_connect_timeout),
+    )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Pooled client for outbound integrations (Linear, GitHub, Jira)."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                _http_client = _pooled_httpx_client(settings.http_timeout)
+    return _http_client
+
+
+def get_gemini_client():
+    """Shared google-genai client on a pooled async transport. None without GEMINI_API_KEY."""
+    global _gemini_client, _gemini_http_client
+    if _gemini_client is None and settings.gemini_api_key:
+        with _lock:
+            if _gemini_client is None:
+                from google.genai import Client, types
+                _gemini_http_client = _pooled_httpx_client(settings.llm_timeout)
+                _gemini_client = Client(
+                    api_key=settings.gemini_api_key,
+                    http_options=types.HttpOptions(
+                        timeout=int(settings.llm_timeout * 1000),
+                        httpx_async_client=_gemini_http_client,
+                    ),
+                )
+    return _gemini_client
+
+
+def get_openai_client():
+    """Shared AsyncOpenAI client on a pooled transport. None without OPENAI_API_KEY."""
+    global _openai_client
+    if _openai_client is None and settings.openai_api_key:
+        with _lock:
+            if _openai_client is None:
+                from openai import AsyncOpenAI
+                _openai_client = AsyncOpenAI(
+                    api_key=settings.openai_api_key,
+                    timeout=settings.llm_timeout,
+                    http_client=_pooled_httpx_client(settings.llm_timeout),
+                )
+    return _openai_client
+
+
+def create_clients():
+    """Build every configured client up front (called from the startup warm-up)."""
+    get_http_client()
+    get_gemini_client()
+    get_openai_client()
+
+
+async def close_clients():
+    """Close the connection pools. Safe to call when some clients were never created."""
+    global _http_client, _gemini_client, _gemini_http_client, _openai_client
+    with _lock:
+        http_client, gemini_client, gemini_http_client, openai_client = (
+            _http_client, _gemini_client, _gemini_http_client, _openai_client
+        )
+        _http_client = _gemini_client = _gemini_http_client = _openai_client = None
+
+    for name, close in (
+        ("gemini", gemini_client.aio.aclose if gemini_client else None),
+        ("gemini transport", gemini_http_client.aclose if gemini_http_client else None),
+        ("openai", openai_client.close if openai_client else None),
+        ("http", http_client.aclose if http_client else None),
+    ):
+        if close is None:
+            continue
+        try:
+            await close()
+        except Exception as e:
+            logging.warning(f"Failed to close the {name} client: {e}")
@@ -0,0 +1,236 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import numpy as np
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+from faster_whisper import BatchedInferencePipeline
+from faster_whisper.transcribe import Segment, TranscriptionInfo
+from app.services.whisper_registry import WhisperModelRegistry
+
+
+class InferenceError(RuntimeError):
+    """A transcription failed inside the inference process."""
+
+
+class InferenceServer:
+    """
+    Owns the Whisper models of a multi-worker deployment. HTTP workers connect
+    over a Unix socket and send 16 kHz float32 samples with the decoding
+    options; the server runs `model.transcribe` and sends the info back
+    followed by one message per segment, as soon as each is decoded. Every
+    connection is served on its own thread, and the models' `num_workers`
+    replicas (which share the weights) run the calls in parallel.
+
+    A client that stops reading closes its connection; the server notices on
+    the next segment it sends and stops decoding.
+    """
+
+    def __init__(self, address: str, authkey: bytes, registry: WhisperModelRegistry):
+        self.address = address
+        self.authkey = authkey
+        self.registry = registry
+        self._pipelines: Dict[str, BatchedInferencePipeline] = {}
+        self._lock = threading.Lock()
+
+    def listen(self) -> Listener:
+        if os.path.exists(self.address):
+            os.unlink(self.address)
+        return Listener(self.address, family="AF_UNIX", backlog=64, authkey=self.authkey)
+
+    def serve_forever(self, listener: Listener):
+        while True:
+            try:
+                conn = listener.accept()
+            except (AuthenticationError, EOFError) as e:
+                # A client that fails the handshake mustn't stop the server
+                logging.warning(f"Rejected inference connection: {e}")
+                continue
+            except OSError:
+                # The listener was closed
+                return
+            threading.Thread(target=self._handle, args=(conn,), name="inference-connection", daemon=True).start()
+
+    def _pipeline(self, name: str) -> BatchedInferencePipeline:
+        model = self.registry.get(name)
+        with self._lock:
+            pipeline = self._pipelines.get(name)
+            if pipeline is None or pipeline.model is not model:
+                pipeline = BatchedInferencePipeline(model=model)
+                self._pipelines[name] = pipeline
+        return pipeline
+
+    def _handle(self, conn: Connection):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    self._serve(conn, request)
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+                except Exception as e:
+                    try:
+                        conn.send(("error", f"{type(e).__name__}: {e}"))
+                    except OSError:
+                        return
+
+    def _serve(self, conn: Connection, request: tuple):
+        op = request[0]
+        if op == "load":
+            for name in request[1]:
+                self.registry.get(name)
+            conn.send(("ok", None))
+        elif op == "transcribe":
+            _, name, audio, options, batched = request
+            model = self._pipeline(name) if batched else self.registry.get(name)
+            segments, info = model.transcribe(audio, **options)
+            conn.send(("info", info))
+            for segment in segments:
+                conn.send(("segment", segment))
+            conn.send(("end", None))
+        else:
+            raise ValueError(f"Unknown inference request '{op}'")
+
+
+class InferenceClient:
+    """
+    Talks to the `InferenceServer` from an HTTP worker. Each call opens its own
+    connection, so worker threads never share one. While the inference process
+    is (re)starting, connecting is retried for up to `connect_timeout` seconds.
+    """
+
+    def __init__(self, address: str, authkey: bytes, connect_timeout: float = 30.0):
+        self.address = address
+        self.authkey = authkey
+        self.connect_timeout = connect_timeout
+
+    def _connect(self) -> Connection:
+        deadline = time.monotonic() + self.connect_timeout
+        while True:
+            try:
+                return Client(self.address, family="AF_UNIX", authkey=self.authkey)
+            except (FileNotFoundError, ConnectionRefusedError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.2)
+
+    def load(self, names: Iterable[str]):
+        """Block until the inference process has loaded every model in `names`."""
+        with self._connect() as conn:
+            conn.send(("load", list(names)))
+            kind, payload = conn.recv()
+        if kind == "error":
+            raise InferenceError(payload)
+
+    def transcribe(self, name: str, audio: np.ndarray, options: dict, batched: bool = False) -> Tuple[Iterator[Segment], TranscriptionInfo]:
+        """Same return shape as `WhisperModel.transcribe`: a lazy segment iterator and the info."""
+        conn = self._connect()
+        try:
+            conn.send(("transcribe", name, np.ascontiguousarray(audio, dtype=np.float32), options, batched))
+            kind, payload = conn.recv()
+        except BaseException:
+            conn.close()
+            raise
+        if kind == "error":
+            conn.close()
+            raise InferenceError(payload)
+        return self._segments(conn), payload
+
+    @staticmethod
+    def _segments(conn: Connection) -> Iterator[Segment]:
+        try:
+            while True:
+                kind, payload = conn.recv()
+                if kind == "end":
+                    return
+                if kind == "error":
+                    raise InferenceError(payload)
+                yield payload
+        finally:
+            conn.close()
+
+
+class RemoteWhisperModel:
+    """Stand-in for a `WhisperModel` that lives in the inference process. Only `transcribe` is proxied."""
+
+    def __init__(self, name: str, client: InferenceClient):
+        self.name = name
+        self.client = client
+
+    def transcribe(self, audio: np.ndarray, **options) -> Tuple[Iterator[Segment], TranscriptionInfo]:
+        return self.client.transcribe(self.name, audio, options)
+
+    def batched_pipeline(self) -> "RemoteBatchedPipeline":
+        return RemoteBatchedPipeline(self)
+
+
+class RemoteBatchedPipeline:
+    """Stand-in for a `BatchedInferencePipeline` over a `RemoteWhisperModel`."""
+
+    def __init__(self, model: RemoteWhisperModel):
+        self.model = model
+
+    def transcribe(self, audio: np.ndarray, **options) -> Tuple[Iterator[Segment], TranscriptionInfo]:
+        return self.model.client.transcribe(self.model.name, audio, options, batched=True)
+
+
+def run_inference_server(address: str, authkey: bytes):
+    """Entry point of the inference process."""
+    logging.basicConfig(level=logging.INFO)
+    # Imported here: the spawned process builds its registry from the same settings as the workers
+    from app.config import settings
+    from app.dependencies import get_model_registry
+
+    registry = get_model_registry()
+    server = InferenceServer(address, authkey, registry)
+    # Listen before autotuning so workers queue on the socket instead of timing out
+    listener = server.listen()
+    if settings.whisper_autotune:
+        registry.autotune()
+    logging.info(f"Inference server listening on {address}")
+    server.serve_forever(listener)
+
+
+class InferenceProcess:
+    """
+    Runs `run_inference_server` in a spawned child of the gunicorn master, so
+    no model is ever loaded in a process that forks, and starts it again if it
+    dies. Workers reconnect on their next request.
+    """
+
+    def __init__(self, address: str, authkey: bytes):
+        self.address = address
+        self.authkey = authkey
+        self.process: Optional[multiprocessing.Process] = None
+        self._stopping = threading.Event()
+
+    def start(self):
+        self._spawn()
+        threading.Thread(target=self._watch, name="inference-watch", daemon=True).start()
+
+    def _spawn(self):
+        context = multiprocessing.get_context("spawn")
+        self.process = context.Process(target=run_inference_server, args=(self.address, self.authkey), name="whisper-inference", daemon=True)
+        self.process.start()
+        logging.info(f"Started inference process {self.process.pid}")
+
+    def _watch(self):
+        while not self._stopping.is_set():
+            self.process.join()
+            if self._stopping.is_set():
+                return
+            logging.warning(f"Inference process exited with code {self.process.exitcode}; restarting it")
+            time.sleep(1)
+            self._spawn()
+
+    def stop(self, timeout: float = 10):
+        self._stopping.set()
+        if self.process is not None and self.process.is_alive():
+            self.process.terminate()
+            self.process.join(timeout)
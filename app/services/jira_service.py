@@ -1,7 +1,7 @@
-import requests
+import httpx
 from typing import Optional, Dict, Any, List
 import json
-import requests.auth
+from app.services.http_clients import get_http_client
 
 class JiraResponse:
     def __init__(self, key: str, id: str, self_url: str):
@@ -10,15 +10,16 @@ class JiraResponse:
         self.self_url = self_url
 
 class JiraService:
-    def __init__(self, base_url: str, project_key: str, issue_type_name: str = "Bug"):
+    def __init__(self, base_url: str, project_key: str, issue_type_name: str = "Bug", http: Optional[httpx.AsyncClient] = None):
+        self.http = http or get_http_client()
         self.base_url = base_url.rstrip('/')
         self.project_key = project_key
         self.issue_type_name = issue_type_name
         self.api_url = f"{self.base_url}/rest/api/3/issue"
 
-    def _execute_api(self, method: str, path: str, api_token: str, user_email: str, data: Optional[dict] = None) -> Dict[str, Any]:
+    async def _execute_api(self, method: str, path: str, api_token: str, user_email: str, data: Optional[dict] = None) -> Dict[str, Any]:
         
-        auth = requests.auth.HTTPBasicAuth(user_email, api_token)
+        auth = httpx.BasicAuth(user_email, api_token)
         headers = {
             "Content-Type": "application/json",
             "Accept": "application/json"
@@ -26,7 +27,7 @@ class JiraService:
         
         url = f"{self.base_url}/rest/api/3/{path.lstrip('/')}"
         
-        response = requests.request(
+        response = await self.http.request(
             method,
             url,
             auth=auth,
@@ -74,7 +75,7 @@ class JiraService:
             }
         }
 
-        data = self._execute_api("POST", "/issue", api_token, user_email, data=payload)
+        data = await self._execute_api("POST", "/issue", api_token, user_email, data=payload)
         
         if data.get("key"):
             return JiraResponse(
@@ -1,9 +1,10 @@
-import requests
+import httpx
 from app.config import settings
 from typing import Optional, Dict, Any, List
 import json
 from app.utils.image_upload import base64_to_proxy_url
 from app.services.clean_up_queue import schedule_deletion
+from app.services.http_clients import get_http_client
 
 class LinearResponse:
     def __init__(self, id, identifier, title, url, state):
@@ -23,12 +24,13 @@ class LinearResponse:
         }
 
 class LinearService:
-    def __init__(self):
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
         self.api_url = settings.linear_api_url
+        self.http = http or get_http_client()
 
-    def _execute_graphql(self, query: str, variables: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    async def _execute_graphql(self, query: str, variables: Dict[str, Any], api_key: str) -> Dict[str, Any]:
         
-        response = requests.post(
+        response = await self.http.post(
             self.api_url,
             headers={
                 "Authorization": f"{api_key}",
@@ -111,7 +113,7 @@ class LinearService:
                 "labelIds": label_ids or [],
             }
 
-            data = self._execute_graphql(mutation, variables, api_key)
+            data = await self._execute_graphql(mutation, variables, api_key)
 
             if data.get("issueCreate", {}).get("success"):
                 issue_data = data["issueCreate"]["issue"]
@@ -0,0 +1,284 @@
+import logging
+import re
+import threading
+import time
+import av
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+from faster_whisper import WhisperModel
+from prometheus_client import Counter, Histogram
+from app.services.transcription_metrics import observe_inference
+from app.services.whisper_registry import with_timestamps
+from app.utils.audio_decode import SAMPLE_RATE
+
+LIVE_SESSIONS_TOTAL = Counter(
+    'transcription_live_sessions_total', 'Live microphone transcription sessions by outcome',
+    ['outcome']
+)
+
+LIVE_FINAL_LATENCY_SECONDS = Histogram(
+    'transcription_live_final_latency_seconds', 'Time from the client stopping to the final live transcript (seconds)'
+)
+
+# (start seconds, end seconds, word) on the session timeline
+Word = Tuple[float, float, str]
+
+INPUT_FORMATS = ('pcm', 'webm')
+
+# Characters of committed text passed to Whisper as context for the next window
+PROMPT_CHARS = 200
+
+# How long the final pass waits for the decoder to catch up with the last frames
+LIVE_DECODER_DRAIN_SECONDS = 2.0
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+class _BlockingStream:
+    """
+    Read-only file object over bytes that are still arriving. `read` blocks
+    until some data is available and returns what is there, or b"" once
+    `end` has been called and everything was read. Bytes are dropped once
+    read, so only the undecoded tail is kept.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._condition = threading.Condition()
+        self._ended = False
+
+    def write(self, data: bytes):
+        with self._condition:
+            if not self._ended:
+                self._data.extend(data)
+                self._condition.notify()
+
+    def end(self, discard: bool = False):
+        """No more input. With `discard`, unread bytes are dropped too."""
+        with self._condition:
+            self._ended = True
+            if discard:
+                del self._data[:]
+            self._condition.notify()
+
+    @property
+    def pending(self) -> int:
+        return len(self._data)
+
+    def read(self, size: int = -1) -> bytes:
+        with self._condition:
+            while not self._data and not self._ended:
+                self._condition.wait()
+            size = len(self._data) if size is None or size < 0 else min(size, len(self._data))
+            chunk = bytes(self._data[:size])
+            del self._data[:size]
+            return chunk
+
+
+class LiveAudioBuffer:
+    """
+    Collects microphone frames and hands out the 16 kHz float32 samples that
+    arrived since the last call. `pcm` frames are raw s16le 16 kHz mono.
+    `webm` frames are consecutive MediaRecorder (Opus/WebM) chunks of one
+    container: a decoder thread keeps a single demuxer and decoder open on the
+    stream, so every byte is decoded once and only the undecoded tail is held,
+    however long the session runs.
+    """
+
+    def __init__(self, input_format: str):
+        if input_format not in INPUT_FORMATS:
+            raise ValueError(f"Unsupported live audio format '{input_format}'. Available: {', '.join(INPUT_FORMATS)}")
+        self.input_format = input_format
+        self.received_bytes = 0
+        self._data = bytearray()
+        self._stream: Optional[_BlockingStream] = None
+        self._decoder: Optional[threading.Thread] = None
+        self._samples: List[np.ndarray] = []
+        self._samples_lock = threading.Lock()
+
+    @property
+    def pending_bytes(self) -> int:
+        """Received bytes not decoded yet."""
+        return self._stream.pending if self._stream else len(self._data)
+
+    def feed(self, frame: bytes):
+        self.received_bytes += len(frame)
+        if self.input_format == 'pcm':
+            self._data.extend(frame)
+            return
+        if self._stream is None:
+            self._stream = _BlockingStream()
+            self._decoder = threading.Thread(target=self._decode, name="live-decoder", daemon=True)
+            self._decoder.start()
+        self._stream.write(frame)
+
+    def _decode(self):
+        """Runs on the decoder thread until the input ends."""
+        resampler = av.AudioResampler(format="flt", layout="mono", rate=SAMPLE_RATE)
+        try:
+            with av.open(self._stream, mode="r") as container:
+                for frame in container.decode(audio=0):
+                    self._push(resampler.resample(frame))
+                self._push(resampler.resample(None))
+        except Exception as e:
+            logging.warning(f"Live audio stream could not be decoded: {e}")
+        finally:
+            # Nothing reads the stream any more, so stop buffering it
+            self._stream.end(discard=True)
+
+    def _push(self, frames):
+        samples = [frame.to_ndarray().reshape(-1) for frame in frames]
+        if samples:
+            with self._samples_lock:
+                self._samples.extend(samples)
+
+    def take_new_samples(self) -> np.ndarray:
+        if self.input_format == 'pcm':
+            usable = len(self._data) - len(self._data) % 2
+            samples = np.frombuffer(bytes(self._data[:usable]), dtype="<i2").astype(np.float32) / 32768.0
+            del self._data[:usable]
+            return samples
+
+        with self._samples_lock:
+            samples, self._samples = self._samples, []
+        return np.concatenate(samples).astype(np.float32, copy=False) if samples else np.zeros(0, dtype=np.float32)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        End the input and wait (up to `timeout`) for the decoder to drain it, so
+        the next `take_new_samples` includes the last frames. Blocks; call it
+        off the event loop.
+        """
+        if self._stream is not None:
+            self._stream.end()
+            self._decoder.join(timeout)
+
+
+class LiveTranscriber:
+    """
+    Rolling-window transcription of a live stream.
+
+    Each pass re-transcribes the uncommitted window with word timestamps. Words
+    on which two consecutive passes agree (the longest common prefix) are
+    committed; the rest of the latest pass is tentative and may still change.
+    The window is trimmed at the end of the last committed word once it grows
+    past `window_seconds`, so every pass stays short and the final pass after
+    the user stops only covers the last few seconds.
+    """
+
+    def __init__(self, get_model: Callable[[], WhisperModel], model_name: str, options: dict, window_seconds: float):
+        self.get_model = get_model
+        self.model_name = model_name
+        self.options = with_timestamps(options)
+        self.window_seconds = window_seconds
+        self.window = np.zeros(0, dtype=np.float32)
+        self.window_start = 0.0
+        self.committed: List[Word] = []
+        self.tentative: List[Word] = []
+        self._previous: List[Word] = []
+
+    @property
+    def duration(self) -> float:
+        return self.window_start + self.window.size / SAMPLE_RATE
+
+    @property
+    def committed_end(self) -> float:
+        return self.committed[-1][1] if self.committed else 0.0
+
+    def append(self, samples: np.ndarray):
+        if samples.size:
+            self.window = np.concatenate([self.window, samples])
+
+    def snapshot(self) -> Tuple[np.ndarray, float, str]:
+        """The audio and context for the next pass, taken on the event loop."""
+        prompt = " ".join(word for _, _, word in self.committed)[-PROMPT_CHARS:]
+        return self.window.copy(), self.window_start, prompt
+
+    def transcribe_window(self, audio: np.ndarray, offset: float, prompt: str) -> List[Word]:
+        """Transcribe one window into words on the session timeline. Runs on a worker thread."""
+        if not audio.size:
+            return []
+        start_time = time.perf_counter()
+        segments, _ = self.get_model().transcribe(
+            audio,
+            word_timestamps=True,
+            condition_on_previous_text=False,
+            initial_prompt=prompt or None,
+            **self.options,
+        )
+        words = [
+            (round(offset + word.start, 2), round(offset + word.end, 2), word.word.strip())
+            for seg in segments
+            for word in (seg.words or [])
+            if word.word.strip()
+        ]
+        observe_inference('faster_whisper_live', self.model_name, time.perf_counter() - start_time, audio.size / SAMPLE_RATE)
+        return words
+
+    def update(self, hypothesis: List[Word]) -> List[Word]:
+        """Apply a pass, commit the words it agrees on with the previous one, and return them."""
+        # Words that end before the committed point were already emitted by an earlier pass
+        hypothesis = [word for word in hypothesis if word[1] > self.committed_end + 0.05]
+
+        agreed = 0
+        while (
+            agreed < min(len(hypothesis), len(self._previous))
+            and _normalize(hypothesis[agreed][2]) == _normalize(self._previous[agreed][2])
+        ):
+            agreed += 1
+
+        newly_committed = hypothesis[:agreed]
+        self.committed.extend(newly_committed)
+        self.tentative = hypothesis[agreed:]
+        self._previous = self.tentative
+        return newly_committed + self._trim()
+
+    def finish(self, hypothesis: List[Word]) -> List[Word]:
+        """Commit everything from the final pass after the stream has ended."""
+        hypothesis = [word for word in hypothesis if word[1] > self.committed_end + 0.05]
+        self.committed.extend(hypothesis)
+        self.tentative = []
+        self._previous = []
+        return hypothesis
+
+    def _trim(self) -> List[Word]:
+        """Keep the window bounded. Returns any words committed to make room."""
+        if self.window.size / SAMPLE_RATE <= self.window_seconds:
+            return []
+
+        forced = []
+        if self.window.size / SAMPLE_RATE > 2 * self.window_seconds:
+            # Passes keep disagreeing: commit what is safely behind the live edge
+            forced = [word for word in self.tentative if word[1] < self.duration - 1.0]
+            self.committed.extend(forced)
+            self.tentative = self._previous = self.tentative[len(forced):]
+
+        # With nothing tentative the window holds silence; keep only the last second
+        cut_at = self.committed_end if self.tentative else max(self.committed_end, self.duration - 1.0)
+        cut = int((cut_at - self.window_start) * SAMPLE_RATE)
+        if cut > 0:
+            self.window = self.window[cut:]
+            self.window_start += cut / SAMPLE_RATE
+        return forced
+
+    @staticmethod
+    def text(words: List[Word]) -> str:
+        return " ".join(word for _, _, word in words).strip()
+
+    def partial_event(self, newly_committed: List[Word]) -> dict:
+        return {
+            "type": "partial",
+            "committed": self.text(self.committed),
+            "new_committed": self.text(newly_committed),
+            "tentative": self.text(self.tentative),
+            "duration": round(self.duration, 2),
+        }
+
+    def final_event(self) -> dict:
+        return {
+            "type": "final",
+            "text": self.text(self.committed) or "No speech detected",
+            "duration": round(self.duration, 2),
+        }
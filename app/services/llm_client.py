@@ -1,31 +1,43 @@
-import os
 import io
 import base64
-from google.genai import Client 
-from openai import OpenAI
-from typing import Optional, List, AsyncGenerator
+import hashlib
+import logging
+from typing import Optional, List, AsyncGenerator, Tuple
 from fastapi import HTTPException
 from app.config import settings
+from app.services.gemini_files import CachedFile, GeminiFileCache, GeminiFileDeleter, GEMINI_IMAGE_PARTS_TOTAL, plan_inline, upload_files
+from app.services.screenshot_preprocess import ScreenshotPreprocessor
+from app.utils.image_type import sniff_image_mime, DEFAULT_IMAGE_MIME
+
+def is_missing_file_error(error: Exception) -> bool:
+    """Whether Gemini rejected a request because a referenced upload expired or was deleted (403/404 on a File)."""
+    from google.genai import errors
+    return isinstance(error, errors.ClientError) and error.code in (403, 404) and "file" in str(error.message).lower()
 
 class LLMClient:
     """Unified client for Gemini and OpenAI multimodal intelligence."""
 
-    def __init__(self):
+    def __init__(
+        self,
+        gemini_client=None,
+        openai_client=None,
+        file_deleter: Optional[GeminiFileDeleter] = None,
+        preprocessor: Optional[ScreenshotPreprocessor] = None,
+        file_cache: Optional[GeminiFileCache] = None,
+    ):
+        """`gemini_client` and `openai_client` are the shared pooled clients (app.services.http_clients)."""
         self.provider = settings.llm_provider.lower()
-        self.openai_key = settings.openai_api_key
-        
-        if settings.gemini_api_key:
-            self.client = Client(api_key=settings.gemini_api_key) 
-            self.aclient = self.client.aio
-            # self.gemini_model = settings.gemini_model or "gemini-2.5-flash"
-            self.gemini_model = "gemini-2.5-flash"
-        else:
-            self.client = None
-            self.aclient = None
-            self.gemini_model = "gemini-2.5-flash"
 
-        self.openai_endpoint = "https://api.openai.com/v1/chat/completions"
-        self.openai_client = OpenAI(api_key=self.openai_key)
+        self.client = gemini_client
+        self.aclient = gemini_client.aio if gemini_client else None
+        # self.gemini_model = settings.gemini_model or "gemini-2.5-flash"
+        self.gemini_model = "gemini-2.5-flash"
+
+        self.file_deleter = file_deleter or GeminiFileDeleter(settings.gemini_delete_batch_size)
+        self.preprocessor = preprocessor
+        self.file_cache = file_cache
+
+        self.openai_client = openai_client
 
     # -------------------------------------------------
     # PROMPT BUILDER
@@ -114,6 +126,87 @@ class LLMClient:
             """
         return prompt.strip()
 
+    # -------------------------------------------------
+    # IMAGE ATTACHMENTS
+    # -------------------------------------------------
+    async def _prepare_image_parts(self, images_base64: Optional[list[str]], image_file: Optional[str]) -> Tuple[list, List[str], List[CachedFile], List[CachedFile]]:
+        """
+        Turn the request's images into Gemini content parts, in order, after the
+        optional preprocessing stage has shrunk and deduplicated them. Small images
+        go inline in the generate request. The rest reuse a cached upload of the
+        same bytes when there is one, and are otherwise uploaded to the Files API
+        concurrently.
+
+        Returns the parts, the names of uncached uploads to delete, the cache
+        entries this request holds (to release), and which of those were reused.
+        """
+        from google.genai import types
+
+        if not images_base64:
+            if not image_file:
+                return [], [], [], []
+            uploaded = await upload_files(self.aclient, [(image_file, None)], settings.gemini_upload_concurrency, self.file_deleter)
+            GEMINI_IMAGE_PARTS_TOTAL.labels(strategy='files_api', mime_type='unknown').inc()
+            return uploaded, [uploaded[0].name], [], []
+
+        raw_images = []
+        for image_base64 in images_base64:
+            if image_base64.startswith('data:image'):
+                image_base64 = image_base64.split(',')[1]
+            raw_images.append(base64.b64decode(image_base64))
+
+        if self.preprocessor:
+            images = await self.preprocessor.process(raw_images)
+        else:
+            images = [(image_bytes, sniff_image_mime(image_bytes[:16]) or DEFAULT_IMAGE_MIME) for image_bytes in raw_images]
+
+        inline = plan_inline(
+            [len(image_bytes) for image_bytes, _ in images],
+            max_inline_bytes=settings.gemini_inline_image_max_bytes,
+            budget_bytes=settings.gemini_inline_max_bytes,
+        )
+
+        parts: list = [None] * len(images)
+        strategies = ['inline' if is_inline else 'files_api' for is_inline in inline]
+        uploaded_names, held, reused = [], [], []
+        pending = []
+        try:
+            for i, ((image_bytes, mime_type), is_inline) in enumerate(zip(images, inline)):
+                if is_inline:
+                    parts[i] = types.Part.from_bytes(data=image_bytes, mime_type=mime_type)
+                    continue
+                key = f"{mime_type}:{hashlib.sha256(image_bytes).hexdigest()}"
+                entry = self.file_cache.acquire(key) if self.file_cache else None
+                if entry is not None:
+                    parts[i] = entry.file
+                    held.append(entry)
+                    reused.append(entry)
+                    strategies[i] = 'cached'
+                else:
+                    pending.append((i, key, image_bytes, mime_type))
+
+            if pending:
+                uploaded = await upload_files(
+                    self.aclient,
+                    [(io.BytesIO(image_bytes), mime_type) for _, _, image_bytes, mime_type in pending],
+                    settings.gemini_upload_concurrency,
+                    self.file_deleter,
+                )
+                for (i, key, _, _), uploaded_file in zip(pending, uploaded):
+                    parts[i] = uploaded_file
+                    if self.file_cache:
+                        held.append(self.file_cache.put(key, uploaded_file, self.aclient))
+                    else:
+                        uploaded_names.append(uploaded_file.name)
+        except BaseException:
+            for entry in held:
+                self.file_cache.release(entry)
+            raise
+
+        for (_, mime_type), strategy in zip(images, strategies):
+            GEMINI_IMAGE_PARTS_TOTAL.labels(strategy=strategy, mime_type=mime_type).inc()
+        return parts, uploaded_names, held, reused
+
     # -------------------------------------------------
     # MULTIMODAL ANALYSIS (STREAMING)
     # -------------------------------------------------
@@ -128,8 +221,8 @@ class LLMClient:
     ) -> AsyncGenerator[str, None]:
         """Analyze multimodal input and stream the response."""
         
-        temp_file_path = None
-        uploaded_files_map = {} 
+        uploaded_names = []
+        held_files = []
 
         try:
             combined_text = transcription or text or "(no input)"
@@ -138,62 +231,48 @@ class LLMClient:
                 if not self.aclient:
                      raise HTTPException(status_code=500, detail="Gemini client not initialized. Check GEMINI_API_KEY in settings.")
 
-                uploaded_file_objects = []
-                screenshot_texts = [] 
-
-                if images_base64:
-                    for i, image_base64 in enumerate(images_base64):
-                        if image_base64.startswith('data:image'):
-                            image_base64 = image_base64.split(',')[1]
-                        
-                        try:
-                            image_bytes = base64.b64decode(image_base64)
-                            image_file_like = io.BytesIO(image_bytes)
-
-                            uploaded_file = await self.aclient.files.upload(
-                                file=image_file_like,
-                                config={
-                                    'mime_type': 'image/jpeg' 
-                                }
-                            )
-                            uploaded_file_objects.append(uploaded_file)
-                            uploaded_files_map[uploaded_file.name] = uploaded_file 
-                            screenshot_texts.append(f"Image {i+1}")
-                            
-                        except Exception as e:
-                            if uploaded_files_map:
-                                for name in uploaded_files_map:
-                                    await self.aclient.files.delete(name=name)
-                            raise HTTPException(status_code=500, detail=f"In-memory image upload failed: {str(e)}")
-                            
-                elif image_file:
-                    uploaded_file = await self.aclient.files.upload(
-                        file=image_file
+                for attempt in range(2):
+                    try:
+                        image_parts, names, entries, reused = await self._prepare_image_parts(images_base64, image_file)
+                    except Exception as e:
+                        raise HTTPException(status_code=500, detail=f"In-memory image upload failed: {str(e)}")
+                    uploaded_names.extend(names)
+                    held_files.extend(entries)
+                    screenshot_texts = [f"Image {i+1}" for i in range(len(image_parts))]
+
+                    prompt_text = self._create_prompt(
+                        transcription_text=combined_text,
+                        screenshot_texts=screenshot_texts, 
+                        qa_type=qa_type,
+                        format=output_format
                     )
-                    uploaded_file_objects.append(uploaded_file)
-                    uploaded_files_map[uploaded_file.name] = uploaded_file 
-                    screenshot_texts = ["Image 1"]
 
-                prompt_text = self._create_prompt(
-                    transcription_text=combined_text,
-                    screenshot_texts=screenshot_texts, 
-                    qa_type=qa_type,
-                    format=output_format
-                )
+                    contents = [prompt_text]
+                    contents.extend(image_parts)
 
-                contents = [prompt_text]
-                contents.extend(uploaded_file_objects) 
-                
-                response_stream = await self.aclient.models.generate_content_stream(
-                    model=self.gemini_model,
-                    contents=contents
-                )
+                    streamed = False
+                    try:
+                        response_stream = await self.aclient.models.generate_content_stream(
+                            model=self.gemini_model,
+                            contents=contents
+                        )
 
-                async for chunk in response_stream:
-                    if chunk.text:
-                        yield chunk.text
+                        async for chunk in response_stream:
+                            if chunk.text:
+                                streamed = True
+                                yield chunk.text
+                        break
+                    except Exception as e:
+                        # A reused handle the provider no longer knows: upload fresh copies and retry once
+                        if streamed or attempt or not reused or not is_missing_file_error(e):
+                            raise
+                        logging.warning(f"Gemini rejected cached file handles, re-uploading: {e}")
+                        for entry in reused:
+                            self.file_cache.invalidate(entry)
         
             elif self.provider == "openai":
+                if not self.openai_client:
+                    raise HTTPException(status_code=500, detail="OpenAI client not initialized. Check OPENAI_API_KEY in settings.")
                 prompt_text = self._create_prompt(
                     transcription_text=combined_text,
                     screenshot_texts=None, 
@@ -218,11 +297,8 @@ class LLMClient:
                 raise HTTPException(status_code=400, detail=f"Unsupported provider: {self.provider}")
 
         finally:
-            if uploaded_files_map and self.aclient:
-                for name in uploaded_files_map:
-                    try:
-                        await self.aclient.files.delete(name=name) 
-                    except Exception as e:
-                        print(f"Failed to delete uploaded file {name}: {e}") 
-            if temp_file_path and os.path.exists(temp_file_path):
-                os.unlink(temp_file_path)
\ No newline at end of file
+            # Deleted in the background so closing the stream doesn't wait on cleanup
+            for name in uploaded_names:
+                self.file_deleter.schedule(self.aclient, name)
+            for entry in held_files:
+                self.file_cache.release(entry)
\ No newline at end of file
@@ -0,0 +1,171 @@
+import multiprocessing
+import os
+import time
+import numpy as np
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from faster_whisper import WhisperModel
+from faster_whisper.vad import VadOptions, get_speech_timestamps
+from prometheus_client import Histogram
+from app.config import settings
+from app.services.inference_server import InferenceClient, RemoteWhisperModel
+from app.services.transcription_metrics import observe_audio_duration, observe_inference
+from app.services.whisper_registry import whisper_options, with_timestamps
+from app.utils.audio_decode import SAMPLE_RATE
+from app.utils.vad import strip_silence, restore_segment_times
+
+LONG_AUDIO_CHUNKS = Histogram(
+    'transcription_long_audio_chunks', 'Number of chunks a long recording was split into',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128)
+)
+
+# (start seconds, end seconds, text) on the original timeline
+SegmentTuple = Tuple[float, float, str]
+
+_worker_model: Optional[WhisperModel] = None
+
+
+def _init_worker(model_name: str, device: str, compute_type: str, cpu_threads: int):
+    """Load one model per worker process."""
+    global _worker_model
+    _worker_model = WhisperModel(model_name, device=device, compute_type=compute_type, cpu_threads=cpu_threads, num_workers=1)
+
+
+def _transcribe_chunk(audio: np.ndarray, offset_seconds: float, options: dict, model: Optional[RemoteWhisperModel] = None) -> List[SegmentTuple]:
+    """Transcribe one chunk (in a worker process unless `model` is given) and shift its segments by `offset_seconds`."""
+    speech, timestamp_map = strip_silence(audio)
+    if not speech.size:
+        return []
+
+    segments, _ = (model or _worker_model).transcribe(speech, **options)
+    results = []
+    for seg in segments:
+        seg = restore_segment_times(seg, timestamp_map)
+        results.append((round(seg.start + offset_seconds, 2), round(seg.end + offset_seconds, 2), seg.text.strip()))
+    return results
+
+
+def plan_chunks(audio: np.ndarray, max_seconds: float, overlap_seconds: float) -> List[Tuple[int, int]]:
+    """
+    Split audio into chunks of at most `max_seconds`, cutting in silence gaps
+    found by VAD. A speech run longer than a chunk is hard-cut with
+    `overlap_seconds` of overlap so no words are lost at the seam.
+    Returns (start, end) sample ranges.
+    """
+    max_len = int(max_seconds * SAMPLE_RATE)
+    overlap = min(int(overlap_seconds * SAMPLE_RATE), max_len // 2)
+
+    speech = get_speech_timestamps(
+        audio,
+        VadOptions(
+            threshold=settings.vad_threshold,
+            min_silence_duration_ms=settings.vad_min_silence_ms,
+            speech_pad_ms=settings.vad_speech_pad_ms,
+        ),
+        sampling_rate=SAMPLE_RATE,
+    )
+
+    regions = []
+    for chunk in speech:
+        start, end = chunk["start"], chunk["end"]
+        while end - start > max_len:
+            regions.append((start, start + max_len))
+            start += max_len - overlap
+        regions.append((start, end))
+
+    if not regions:
+        return []
+
+    chunks = []
+    current_start, current_end = regions[0]
+    for start, end in regions[1:]:
+        if end - current_start <= max_len:
+            current_end = end
+        else:
+            chunks.append((current_start, current_end))
+            current_start, current_end = start, end
+    chunks.append((current_start, current_end))
+    return chunks
+
+
+def stitch_segments(chunk_results: List[List[SegmentTuple]]) -> List[SegmentTuple]:
+    """
+    Join per-chunk segments in time order. Segments from a later chunk whose
+    midpoint falls inside the audio already covered by the earlier chunks are
+    dropped; segments within one chunk are always kept, repeated text included.
+    """
+    stitched: List[SegmentTuple] = []
+    for results in chunk_results:
+        covered_until = stitched[-1][1] if stitched else float("-inf")
+        for start, end, text in results:
+            if (start + end) / 2 < covered_until:
+                continue
+            stitched.append((start, end, text))
+    return stitched
+
+
+class LongAudioTranscriber:
+    """
+    Transcribes long recordings by splitting them at silence and running the
+    chunks in parallel across a pool of worker processes, each with its own
+    model, so wall-clock latency scales with core count instead of length.
+
+    With an `inference_client` the chunks are sent to the inference process
+    from a thread pool instead, and no process loads a model of its own.
+    """
+
+    def __init__(self, processes: int, chunk_seconds: float, overlap_seconds: float, inference_client: Optional[InferenceClient] = None):
+        cores = os.cpu_count() or 1
+        self.processes = processes or max(1, cores // 2)
+        self.cpu_threads = max(1, cores // self.processes)
+        self.chunk_seconds = chunk_seconds
+        self.overlap_seconds = overlap_seconds
+        self.inference_client = inference_client
+        self._pools: Dict[str, Executor] = {}
+
+    def _get_pool(self, model_name: str) -> Executor:
+        pool = self._pools.get(model_name)
+        if pool is None and self.inference_client is not None:
+            pool = ThreadPoolExecutor(max_workers=self.processes, thread_name_prefix="long-audio")
+            self._pools[model_name] = pool
+        elif pool is None:
+            pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(model_name, settings.whisper_device, settings.whisper_compute_type, self.cpu_threads),
+            )
+            self._pools[model_name] = pool
+        return pool
+
+    def transcribe_segments(self, audio: np.ndarray, model_name: str, options: Optional[dict] = None) -> List[SegmentTuple]:
+        """Split, transcribe the chunks in parallel on the process pool and stitch. Blocks until done."""
+        chunks = plan_chunks(audio, self.chunk_seconds, self.overlap_seconds)
+        LONG_AUDIO_CHUNKS.observe(len(chunks))
+        if not chunks:
+            return []
+
+        # Overlap dedupe compares segment midpoints, so it needs real segment times
+        options = with_timestamps(options or whisper_options())
+        pool = self._get_pool(model_name)
+        model = RemoteWhisperModel(model_name, self.inference_client) if self.inference_client is not None else None
+        futures = [pool.submit(_transcribe_chunk, audio[start:end], start / SAMPLE_RATE, options, model) for start, end in chunks]
+        return stitch_segments([future.result() for future in futures])
+
+    def transcribe(self, audio: np.ndarray, model_name: str, options: Optional[dict] = None) -> str:
+        """
+        Transcribe a long recording. Blocks, so run it through the
+        TranscriptionExecutor: that bounds how many long jobs share the pool,
+        with the same queue limit, 503 and ordering as every other job.
+        """
+        observe_audio_duration('faster_whisper', model_name, audio.size / SAMPLE_RATE)
+        start_time = time.perf_counter()
+        segments = self.transcribe_segments(audio, model_name, options)
+        observe_inference('faster_whisper', model_name, time.perf_counter() - start_time, audio.size / SAMPLE_RATE)
+        text = " ".join(text for _, _, text in segments).strip()
+        return text or "No speech detected"
+
+    def shutdown(self):
+        for pool in self._pools.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
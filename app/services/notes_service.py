@@ -1,10 +1,9 @@
 from typing import Optional
-from app.services.llm_client import LLMClient
+from app.dependencies import get_llm_client
 from app.services.supabase_client import supabase
 from app.utils.extract_title_body import extract_title_and_body
 from typing import AsyncGenerator
 
-llm = LLMClient()
 
 async def persist_note_if_allowed(
     user_id: str,
@@ -38,7 +37,7 @@ async def persist_note_if_allowed(
 
 class NotesService:
     def __init__(self):
-        self.llm = llm 
+        self.llm = get_llm_client()
     async def generate_notes_stream( 
         self,
         images_base64: Optional[list[str]] = None,
@@ -0,0 +1,163 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+import numpy as np
+from prometheus_client import Counter
+
+TRANSCRIPTION_ROUTING_DECISIONS = Counter(
+    'transcription_routing_decisions_total', 'Provider chosen by the adaptive transcription router',
+    ['provider', 'reason']
+)
+
+LOCAL = 'faster_whisper'
+REMOTE = 'gemini'
+POLICIES = ('local', 'remote', 'local_first', 'fastest')
+
+
+class ProviderStats:
+    """Rolling window of recent request outcomes for one provider."""
+
+    def __init__(self, window: int, window_seconds: float):
+        self.window_seconds = window_seconds
+        self._samples: Deque[Tuple[float, float, bool]] = deque(maxlen=max(1, window))
+
+    def record(self, latency: float, ok: bool):
+        self._samples.append((time.monotonic(), latency, ok))
+
+    def _recent(self):
+        cutoff = time.monotonic() - self.window_seconds
+        return [(latency, ok) for recorded_at, latency, ok in self._samples if recorded_at >= cutoff]
+
+    def latency_percentile(self, q: float) -> Optional[float]:
+        latencies = [latency for latency, ok in self._recent() if ok]
+        return float(np.percentile(latencies, q)) if latencies else None
+
+    def sample_count(self) -> int:
+        return len(self._recent())
+
+    def error_rate(self) -> float:
+        recent = self._recent()
+        return sum(1 for _, ok in recent if not ok) / len(recent) if recent else 0.0
+
+
+class ProviderRouter:
+    """
+    Picks faster-whisper or Gemini for each request from live signals.
+
+    Policies:
+      local        always faster-whisper
+      remote       always Gemini
+      local_first  faster-whisper unless the estimated queue wait exceeds
+                   `max_queue_wait`, the audio is longer than `max_local_seconds`,
+                   or local errors exceed `max_error_rate`
+      fastest      whichever healthy provider has the lower predicted latency
+                   (local queue wait + p50 vs. remote p50)
+
+    A provider only counts as failing once it has `min_samples` outcomes in the
+    window. While one is failing, a single probe request is sent to it every
+    `probe_interval` seconds so it can recover.
+    """
+
+    def __init__(
+        self,
+        policy: str,
+        max_queue_wait: float,
+        max_local_seconds: float,
+        max_error_rate: float,
+        window: int,
+        window_seconds: float,
+        min_samples: int = 1,
+        probe_interval: float = 0,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown routing policy '{policy}'. Available: {', '.join(POLICIES)}")
+        self.policy = policy
+        self.max_queue_wait = max_queue_wait
+        self.max_local_seconds = max_local_seconds
+        self.max_error_rate = max_error_rate
+        self.min_samples = max(1, min_samples)
+        self.probe_interval = probe_interval
+        self._stats: Dict[str, ProviderStats] = {
+            LOCAL: ProviderStats(window, window_seconds),
+            REMOTE: ProviderStats(window, window_seconds),
+        }
+        # When each failing provider was last probed (or first found failing)
+        self._last_probe: Dict[str, Optional[float]] = {LOCAL: None, REMOTE: None}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, latency: float, ok: bool):
+        with self._lock:
+            self._stats[provider].record(latency, ok)
+
+    def estimated_queue_wait(self, queue_depth: int, workers: int) -> float:
+        """Rough wait for a new local job: jobs ahead of it per worker times the local p50."""
+        with self._lock:
+            p50 = self._stats[LOCAL].latency_percentile(50)
+        return (queue_depth / max(1, workers)) * (p50 or 0.0)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                provider: {
+                    "latency_p50": stats.latency_percentile(50),
+                    "latency_p95": stats.latency_percentile(95),
+                    "error_rate": round(stats.error_rate(), 3),
+                    "samples": stats.sample_count(),
+                }
+                for provider, stats in self._stats.items()
+            }
+
+    def choose(self, audio_seconds: Optional[float], queue_depth: int, workers: int) -> str:
+        provider, reason = self._decide(audio_seconds, queue_depth, workers)
+        TRANSCRIPTION_ROUTING_DECISIONS.labels(provider=provider, reason=reason).inc()
+        return provider
+
+    def _decide(self, audio_seconds: Optional[float], queue_depth: int, workers: int) -> Tuple[str, str]:
+        if self.policy == 'local':
+            return LOCAL, 'policy'
+        if self.policy == 'remote':
+            return REMOTE, 'policy'
+
+        stats = self.snapshot()
+        local_healthy = self._healthy(LOCAL, stats[LOCAL])
+        remote_healthy = self._healthy(REMOTE, stats[REMOTE])
+        if not remote_healthy:
+            return (REMOTE, 'probe') if self._probe_due(REMOTE) else (LOCAL, 'remote_errors')
+        if not local_healthy:
+            return (LOCAL, 'probe') if self._probe_due(LOCAL) else (REMOTE, 'local_errors')
+
+        queue_wait = self.estimated_queue_wait(queue_depth, workers)
+
+        if self.policy == 'local_first':
+            if self.max_local_seconds and audio_seconds and audio_seconds > self.max_local_seconds:
+                return REMOTE, 'duration'
+            if queue_wait > self.max_queue_wait:
+                return REMOTE, 'queue_wait'
+            return LOCAL, 'default'
+
+        local_p50, remote_p50 = stats[LOCAL]["latency_p50"], stats[REMOTE]["latency_p50"]
+        if local_p50 is None or remote_p50 is None:
+            # Without data for both sides, prefer local until the queue backs up
+            return (REMOTE, 'queue_wait') if queue_wait > self.max_queue_wait else (LOCAL, 'no_data')
+        return (LOCAL, 'faster') if queue_wait + local_p50 <= remote_p50 else (REMOTE, 'faster')
+
+    def _healthy(self, provider: str, stats: dict) -> bool:
+        healthy = stats["samples"] < self.min_samples or stats["error_rate"] <= self.max_error_rate
+        if healthy:
+            with self._lock:
+                self._last_probe[provider] = None
+        return healthy
+
+    def _probe_due(self, provider: str) -> bool:
+        """True at most once every `probe_interval` seconds while `provider` is failing."""
+        now = time.monotonic()
+        with self._lock:
+            last = self._last_probe[provider]
+            if last is None:
+                self._last_probe[provider] = now
+                return False
+            if self.probe_interval <= 0 or now - last < self.probe_interval:
+                return False
+            self._last_probe[provider] = now
+            return True
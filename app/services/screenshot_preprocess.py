@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+from PIL import Image, ImageOps, UnidentifiedImageError
+from prometheus_client import Counter, Histogram
+from app.utils.image_type import sniff_image_mime, DEFAULT_IMAGE_MIME
+
+SCREENSHOT_BYTES_SAVED = Histogram(
+    'screenshot_preprocess_bytes_saved', 'Image bytes removed from one notes request by screenshot preprocessing',
+    buckets=(0, 10_000, 100_000, 500_000, 1_000_000, 2_500_000, 5_000_000, 10_000_000, 25_000_000)
+)
+
+SCREENSHOT_DUPLICATES_TOTAL = Counter(
+    'screenshot_preprocess_duplicates_total', 'Screenshots dropped as duplicates of an earlier one in the same request',
+    ['kind']
+)
+
+SCREENSHOT_PREPROCESS_SECONDS = Histogram(
+    'screenshot_preprocess_seconds', 'Time to preprocess all screenshots of one notes request (seconds)'
+)
+
+FORMATS = {"webp": ("WEBP", "image/webp"), "jpeg": ("JPEG", "image/jpeg"), "png": ("PNG", "image/png")}
+
+
+def difference_hash(image: Image.Image) -> int:
+    """64-bit dHash: brightness gradients of a 9x8 grayscale thumbnail. Near-identical images differ in few bits."""
+    pixels = image.convert("L").resize((9, 8), Image.Resampling.LANCZOS).tobytes()
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return bits
+
+
+def preprocess_image(data: bytes, max_edge: int, output_format: str, quality: int) -> Tuple[bytes, str, Optional[int]]:
+    """
+    Downscale so the longest edge is at most `max_edge`, re-encode without
+    metadata, and hash. Returns (bytes, mime type, dHash). Images Pillow can't
+    read, and images that would grow by re-encoding, keep their original bytes.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            # JPEGs can be decoded straight at a reduced scale
+            image.draft("RGB", (max_edge, max_edge))
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_edge, max_edge), Image.Resampling.LANCZOS)
+            pillow_format, mime_type = FORMATS[output_format]
+            if pillow_format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+            elif image.mode not in ("RGB", "RGBA", "L", "LA"):
+                image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+
+            buffer = io.BytesIO()
+            # Nothing from image.info (EXIF, ICC, text chunks) is passed on, so metadata is dropped
+            image.save(buffer, format=pillow_format, quality=quality, optimize=True)
+            phash = difference_hash(image)
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return data, sniff_image_mime(data[:16]) or DEFAULT_IMAGE_MIME, None
+
+    if buffer.tell() >= len(data):
+        return data, sniff_image_mime(data[:16]) or DEFAULT_IMAGE_MIME, phash
+    return buffer.getvalue(), mime_type, phash
+
+
+class ScreenshotPreprocessor:
+    """
+    Shrinks the screenshots of a notes request before they are sent to the LLM
+    and drops repeats: exact duplicates by content hash, near duplicates when
+    their perceptual hashes differ in at most `dedupe_distance` bits (negative
+    disables near-duplicate detection). Images are processed on a small
+    thread pool; Pillow releases the GIL while decoding and resizing.
+    """
+
+    def __init__(self, max_edge: int, output_format: str, quality: int, dedupe_distance: int, workers: int):
+        if output_format not in FORMATS:
+            raise ValueError(f"Unsupported screenshot format '{output_format}'. Available: {', '.join(FORMATS)}")
+        self.max_edge = max_edge
+        self.output_format = output_format
+        self.quality = quality
+        self.dedupe_distance = dedupe_distance
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="screenshot")
+
+    async def process(self, images: List[bytes]) -> List[Tuple[bytes, str]]:
+        """Preprocess a request's images, keeping the order of the first occurrence of each."""
+        start_time = time.perf_counter()
+        seen_digests = set()
+        unique = []
+        for data in images:
+            digest = hashlib.sha256(data).digest()
+            if digest in seen_digests:
+                SCREENSHOT_DUPLICATES_TOTAL.labels(kind='exact').inc()
+                continue
+            seen_digests.add(digest)
+            unique.append(data)
+
+        loop = asyncio.get_running_loop()
+        processed = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, preprocess_image, data, self.max_edge, self.output_format, self.quality)
+            for data in unique
+        ))
+
+        kept, hashes = [], []
+        for data, mime_type, phash in processed:
+            if phash is not None and self.dedupe_distance >= 0 and any(
+                bin(phash ^ other).count("1") <= self.dedupe_distance for other in hashes
+            ):
+                SCREENSHOT_DUPLICATES_TOTAL.labels(kind='near').inc()
+                continue
+            if phash is not None:
+                hashes.append(phash)
+            kept.append((data, mime_type))
+
+        SCREENSHOT_BYTES_SAVED.observe(sum(len(data) for data in images) - sum(len(data) for data, _ in kept))
+        SCREENSHOT_PREPROCESS_SECONDS.observe(time.perf_counter() - start_time)
+        return kept
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
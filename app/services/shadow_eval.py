@@ -0,0 +1,166 @@
+import random
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional
+import numpy as np
+from prometheus_client import Counter, Histogram
+from app.services.transcription_executor import TranscriptionExecutor
+from app.utils.audio_decode import SAMPLE_RATE
+
+SHADOW_RUNS_TOTAL = Counter(
+    'transcription_shadow_runs_total', 'Shadow evaluations by outcome',
+    ['candidate', 'outcome']
+)
+
+SHADOW_WORD_ERROR_RATE = Histogram(
+    'transcription_shadow_word_error_rate', 'Word error rate of the candidate model against the primary transcript',
+    ['primary', 'candidate'],
+    buckets=(0, 0.02, 0.05, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75, 1.0)
+)
+
+SHADOW_LATENCY_RATIO = Histogram(
+    'transcription_shadow_latency_ratio', 'Candidate model latency divided by primary model latency',
+    ['primary', 'candidate'],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+)
+
+# Provider label of the candidate model's transcription metrics, kept apart from real traffic
+SHADOW_PROVIDER = 'faster_whisper_shadow'
+
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance between two transcripts, divided by the reference length."""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+class ShadowEvaluator:
+    """
+    Re-transcribes a sample of requests with a candidate model after the
+    primary response is ready, and records how the two compare.
+
+    Shadow jobs run one at a time on their own thread, never on the primary
+    `executor`, so they never take a worker or a queue slot. They only start
+    while the executor is idle: they are dropped instead of queued when a
+    real job is running or more than `max_queue_depth` are waiting (checked
+    when sampled and again just before starting), or when another shadow job
+    is still running. A real request that arrives while a shadow inference
+    is running does share the CPU cores with it until it finishes. Only word error rate and latency
+    are kept; transcripts are never stored.
+    """
+
+    def __init__(
+        self,
+        executor: TranscriptionExecutor,
+        transcribe: Callable[[np.ndarray, str, dict], str],
+        candidate_model: str,
+        sample_rate: float,
+        max_queue_depth: int,
+        window: int,
+    ):
+        self.executor = executor
+        self.transcribe = transcribe
+        self.candidate_model = candidate_model
+        self.sample_rate = sample_rate
+        self.max_queue_depth = max_queue_depth
+        self._results: Deque[dict] = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+        self._in_flight = False
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="shadow")
+
+    def _primary_busy(self) -> bool:
+        return self.executor.workers_busy > 0 or self.executor.queue_depth > self.max_queue_depth
+
+    def maybe_schedule(self, audio: np.ndarray, primary_text: str, primary_seconds: Optional[float], primary_model: str, options: dict) -> bool:
+        """
+        Sample this request for shadow evaluation. Returns whether a shadow job was queued.
+        `primary_seconds` is the primary's own transcription time on its worker (no
+        queue wait), so it compares like with like; None records no latency ratio.
+        """
+        if primary_model == self.candidate_model or random.random() >= self.sample_rate:
+            return False
+        if self._in_flight or self._primary_busy():
+            SHADOW_RUNS_TOTAL.labels(candidate=self.candidate_model, outcome='dropped_busy').inc()
+            return False
+
+        self._in_flight = True
+        try:
+            job = self._pool.submit(self._evaluate, audio, primary_text, primary_seconds, primary_model, options)
+        except RuntimeError:
+            # Shut down
+            self._in_flight = False
+            return False
+        job.add_done_callback(self._on_done)
+        return True
+
+    def _on_done(self, job):
+        self._in_flight = False
+        if not job.cancelled() and job.exception() is not None:
+            SHADOW_RUNS_TOTAL.labels(candidate=self.candidate_model, outcome='error').inc()
+
+    def _evaluate(self, audio: np.ndarray, primary_text: str, primary_seconds: Optional[float], primary_model: str, options: dict):
+        """Runs on the shadow thread."""
+        if self._primary_busy():
+            SHADOW_RUNS_TOTAL.labels(candidate=self.candidate_model, outcome='dropped_busy').inc()
+            return
+        start_time = time.perf_counter()
+        candidate_text = self.transcribe(audio, self.candidate_model, options)
+        candidate_seconds = time.perf_counter() - start_time
+        if candidate_text.lower().startswith("error transcribing audio"):
+            raise RuntimeError(candidate_text)
+
+        wer = word_error_rate(primary_text, candidate_text)
+        ratio = candidate_seconds / primary_seconds if primary_seconds else None
+
+        SHADOW_WORD_ERROR_RATE.labels(primary=primary_model, candidate=self.candidate_model).observe(wer)
+        if ratio is not None:
+            SHADOW_LATENCY_RATIO.labels(primary=primary_model, candidate=self.candidate_model).observe(ratio)
+        SHADOW_RUNS_TOTAL.labels(candidate=self.candidate_model, outcome='completed').inc()
+
+        result = {
+            "at": time.time(),
+            "primary_model": primary_model,
+            "candidate_model": self.candidate_model,
+            "audio_seconds": round(audio.size / SAMPLE_RATE, 2),
+            "word_error_rate": round(wer, 4),
+            "latency_ratio": round(ratio, 3) if ratio is not None else None,
+        }
+        with self._lock:
+            self._results.append(result)
+
+    def summary(self, recent: int = 10) -> dict:
+        with self._lock:
+            results = list(self._results)
+
+        wers = [r["word_error_rate"] for r in results]
+        ratios = [r["latency_ratio"] for r in results if r["latency_ratio"] is not None]
+        return {
+            "candidate_model": self.candidate_model,
+            "sample_rate": self.sample_rate,
+            "evaluations": len(results),
+            "word_error_rate_mean": round(float(np.mean(wers)), 4) if wers else None,
+            "word_error_rate_p50": round(float(np.percentile(wers, 50)), 4) if wers else None,
+            "word_error_rate_p95": round(float(np.percentile(wers, 95)), 4) if wers else None,
+            "latency_ratio_mean": round(float(np.mean(ratios)), 3) if ratios else None,
+            "latency_ratio_p50": round(float(np.percentile(ratios, 50)), 3) if ratios else None,
+            "recent": results[-recent:] if recent > 0 else [],
+        }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
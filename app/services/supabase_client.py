@@ -1,4 +1,23 @@
-from supabase import create_client
+import threading
 from app.config import settings
 
-supabase = create_client(settings.supabase_url, settings.supabase_service_role_key)
\ No newline at end of file
+_client = None
+_lock = threading.Lock()
+
+def get_supabase_client():
+    """Create the Supabase client on first use; importing `supabase` alone takes about half a second."""
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                from supabase import create_client
+                _client = create_client(settings.supabase_url, settings.supabase_service_role_key)
+    return _client
+
+class _LazySupabase:
+    """Module-level stand-in so `from app.services.supabase_client import supabase` stays cheap at import."""
+
+    def __getattr__(self, name):
+        return getattr(get_supabase_client(), name)
+
+supabase = _LazySupabase()
@@ -0,0 +1,156 @@
+import asyncio
+import bisect
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from prometheus_client import Histogram
+from app.services.inference_server import RemoteWhisperModel
+from app.services.transcription_executor import TranscriptionExecutor
+from app.services.transcription_metrics import stage_timer, observe_audio_duration, observe_inference
+from app.services.whisper_registry import resolve_quality, whisper_options
+from app.utils.audio_decode import SAMPLE_RATE
+from app.utils.vad import strip_silence
+
+TRANSCRIPTION_BATCH_SIZE = Histogram(
+    'transcription_batch_size', 'Number of requests transcribed together in one batched pass',
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16, 24, 32)
+)
+
+CHUNK_SECONDS = 30
+
+
+def supports_batching(options: dict) -> bool:
+    """
+    Whether a tier's decoding options survive batching. BatchedInferencePipeline
+    only decodes at the first temperature, so tiers with temperature fallback
+    ("balanced", "accurate") would silently lose it and must run unbatched.
+    """
+    temperature = options.get("temperature", 0.0)
+    return not isinstance(temperature, (list, tuple)) or len(temperature) <= 1
+
+
+class TranscriptionBatcher:
+    """
+    Groups short transcription requests that arrive within `window_ms` of each
+    other (up to `max_batch_size`) into a single batched Faster-Whisper pass.
+
+    Only tiers without temperature fallback are batched (`supports_batching`).
+    Requests are grouped per model and quality tier. Silence is stripped from every clip, then
+    the speech is laid out back to back and handed to
+    `BatchedInferencePipeline` as explicit clip timestamps, so one encoder and
+    decoder call covers the whole batch. Segments are mapped back to their
+    request by start offset.
+    """
+
+    def __init__(
+        self,
+        executor: TranscriptionExecutor,
+        get_model: Callable[[Optional[str]], WhisperModel],
+        window_ms: int,
+        max_batch_size: int,
+    ):
+        self.executor = executor
+        self.get_model = get_model
+        self.window = max(0, window_ms) / 1000
+        self.max_batch_size = max(1, max_batch_size)
+        # Keyed by (model name, quality tier): only requests decoded the same way share a pass
+        self._pending: Dict[Tuple[str, str], List[Tuple[np.ndarray, asyncio.Future]]] = {}
+        self._flush_handles: Dict[Tuple[str, str], asyncio.TimerHandle] = {}
+        self._pipelines: Dict[str, BatchedInferencePipeline] = {}
+
+    async def submit(self, audio: np.ndarray, model_name: str, quality: Optional[str] = None) -> str:
+        """Queue 16 kHz mono samples for the next batch on `model_name` at `quality` and await the transcript."""
+        if not supports_batching(whisper_options(quality)):
+            raise ValueError(f"Quality tier '{resolve_quality(quality)}' uses temperature fallback and can't be batched")
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        key = (model_name, resolve_quality(quality))
+        pending = self._pending.setdefault(key, [])
+        pending.append((audio, future))
+
+        if len(pending) >= self.max_batch_size:
+            self._flush(key)
+        elif key not in self._flush_handles:
+            self._flush_handles[key] = loop.call_later(self.window, self._flush, key)
+
+        return await future
+
+    def _flush(self, key: Tuple[str, str]):
+        handle = self._flush_handles.pop(key, None)
+        if handle is not None:
+            handle.cancel()
+
+        batch = self._pending.pop(key, [])
+        if batch:
+            asyncio.ensure_future(self._run_batch(batch, *key))
+
+    async def _run_batch(self, batch: List[Tuple[np.ndarray, asyncio.Future]], model_name: str, quality: str):
+        TRANSCRIPTION_BATCH_SIZE.observe(len(batch))
+        audios = [audio for audio, _ in batch]
+
+        try:
+            job_seconds = sum(audio.size for audio in audios) / SAMPLE_RATE
+            texts = await self.executor.run(self.transcribe_batch, audios, model_name, whisper_options(quality), job_seconds=job_seconds)
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result(text)
+
+    def _get_pipeline(self, model_name: str) -> BatchedInferencePipeline:
+        model = self.get_model(model_name)
+        if isinstance(model, RemoteWhisperModel):
+            # The inference process keeps the pipeline next to its model
+            return model.batched_pipeline()
+        pipeline = self._pipelines.get(model_name)
+        if pipeline is None or pipeline.model is not model:
+            pipeline = BatchedInferencePipeline(model=model)
+            self._pipelines[model_name] = pipeline
+        return pipeline
+
+    def transcribe_batch(self, audios: List[np.ndarray], model_name: str, options: dict) -> List[str]:
+        """Run one batched inference pass over several clips. Runs on a worker thread."""
+        try:
+            for audio in audios:
+                observe_audio_duration('faster_whisper', model_name, audio.size / SAMPLE_RATE)
+            with stage_timer('vad', 'faster_whisper', model_name):
+                speech_audios = [strip_silence(audio)[0] for audio in audios]
+            texts = [[] for _ in audios]
+            included = [i for i, speech in enumerate(speech_audios) if speech.size]
+
+            if included:
+                clips = []
+                starts = []
+                offset = 0
+                for i in included:
+                    speech = speech_audios[i]
+                    starts.append(offset / SAMPLE_RATE)
+                    for begin in range(0, speech.size, CHUNK_SECONDS * SAMPLE_RATE):
+                        end = min(begin + CHUNK_SECONDS * SAMPLE_RATE, speech.size)
+                        clips.append({"start": (offset + begin) / SAMPLE_RATE, "end": (offset + end) / SAMPLE_RATE})
+                    offset += speech.size
+
+                start_time = time.perf_counter()
+                segments, info = self._get_pipeline(model_name).transcribe(
+                    np.concatenate([speech_audios[i] for i in included]),
+                    clip_timestamps=clips,
+                    batch_size=len(clips),
+                    **options,
+                )
+
+                for seg in segments:
+                    index = bisect.bisect_right(starts, seg.start + 1e-3) - 1
+                    texts[included[max(index, 0)]].append(seg.text)
+
+                audio_seconds = sum(audio.size for audio in audios) / SAMPLE_RATE
+                observe_inference('faster_whisper', model_name, time.perf_counter() - start_time, audio_seconds)
+
+            return [" ".join(parts).strip() or "No speech detected" for parts in texts]
+
+        except Exception as e:
+            return [f"Error transcribing audio: {str(e)}"] * len(audios)
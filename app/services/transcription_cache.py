@@ -0,0 +1,146 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+from prometheus_client import Counter
+
+TRANSCRIPTION_CACHE_HITS = Counter(
+    'transcription_cache_hits_total', 'Transcription results served from cache',
+    ['provider', 'tier']
+)
+
+TRANSCRIPTION_CACHE_MISSES = Counter(
+    'transcription_cache_misses_total', 'Transcription cache lookups that required inference',
+    ['provider']
+)
+
+
+def hash_audio(audio_bytes: bytes) -> str:
+    """Content hash of an uploaded audio file."""
+    return hashlib.sha256(audio_bytes).hexdigest()
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of transcripts.
+
+    Entries are keyed by the audio content hash plus the parameters that affect
+    the output (provider, model, language, task, beam size). A bounded LRU
+    lives in memory; an optional size-capped directory of JSON files backs it
+    on disk. Both tiers expire entries after `ttl_seconds`.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, disk_dir: Optional[str] = None, disk_max_bytes: int = 0):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl_seconds
+        self.disk_dir = disk_dir if disk_dir and disk_max_bytes > 0 else None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(content_hash: str, **params) -> str:
+        digest = hashlib.sha256(content_hash.encode())
+        digest.update(json.dumps(params, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    async def get(self, key: str, provider: str) -> Optional[str]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, text = entry
+            if time.time() - stored_at < self.ttl:
+                self._memory.move_to_end(key)
+                TRANSCRIPTION_CACHE_HITS.labels(provider=provider, tier='memory').inc()
+                return text
+            del self._memory[key]
+
+        if self.disk_dir:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            if entry is not None:
+                self._remember(key, *entry)
+                TRANSCRIPTION_CACHE_HITS.labels(provider=provider, tier='disk').inc()
+                return entry[1]
+
+        TRANSCRIPTION_CACHE_MISSES.labels(provider=provider).inc()
+        return None
+
+    async def set(self, key: str, text: str):
+        stored_at = time.time()
+        self._remember(key, stored_at, text)
+        if self.disk_dir:
+            await asyncio.to_thread(self._write_disk, key, stored_at, text)
+
+    def _remember(self, key: str, stored_at: float, text: str):
+        if not self.max_entries:
+            return
+        self._memory[key] = (stored_at, text)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, str]]:
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+
+        if time.time() - entry["stored_at"] >= self.ttl:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            return None
+        return entry["stored_at"], entry["text"]
+
+    def _write_disk(self, key: str, stored_at: float, text: str):
+        path = self._path(key)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"stored_at": stored_at, "text": text}, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Failed to write transcription cache entry {key}: {e}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        """Drop expired entries, then the oldest ones until the directory fits the size cap."""
+        now = time.time()
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime >= self.ttl:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
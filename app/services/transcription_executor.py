@@ -0,0 +1,166 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import HTTPException
+from prometheus_client import Counter, Gauge, Histogram
+
+TRANSCRIPTION_QUEUE_DEPTH = Gauge(
+    'transcription_queue_depth', 'Transcription jobs waiting for a free worker'
+)
+
+TRANSCRIPTION_QUEUE_WAIT_SECONDS = Histogram(
+    'transcription_queue_wait_seconds', 'Time a transcription job waited for a worker (seconds)',
+    ['duration_bucket']
+)
+
+TRANSCRIPTION_WORKERS_BUSY = Gauge(
+    'transcription_workers_busy', 'Transcription workers currently running inference'
+)
+
+TRANSCRIPTION_REJECTED_TOTAL = Counter(
+    'transcription_rejected_total', 'Transcription jobs rejected because the queue was full'
+)
+
+# Upper bounds (audio seconds) of the duration buckets queue wait is reported under
+DURATION_BUCKETS = ((10, '0-10s'), (30, '10-30s'), (120, '30-120s'), (600, '120-600s'))
+
+
+def duration_bucket(job_seconds: Optional[float]) -> str:
+    if job_seconds is None:
+        return 'unknown'
+    for upper, label in DURATION_BUCKETS:
+        if job_seconds <= upper:
+            return label
+    return '600s+'
+
+
+def _resolve(future: asyncio.Future, result: Any = None, error: Optional[BaseException] = None):
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
+
+
+class TranscriptionExecutor:
+    """
+    Fixed pool of worker threads with a bounded job queue.
+
+    CPU-bound inference runs on the workers so the event loop stays free for
+    other requests. When the queue is full, `run` fails fast with a 503.
+
+    Jobs are served shortest-first by their estimated audio duration, with
+    aging: every second a job waits counts as `aging` seconds less audio, so
+    long recordings still get a worker under sustained load. `aging=0` is pure
+    shortest-job-first; a very large value degrades to FIFO.
+    """
+
+    def __init__(self, max_workers: int, max_queue_size: int, retry_after: int, aging: float = 1.0, default_job_seconds: float = 30.0):
+        self.max_workers = max(1, max_workers)
+        self.max_queue_size = max(1, max_queue_size)
+        self.retry_after = retry_after
+        self.aging = max(0.0, aging)
+        self.default_job_seconds = default_job_seconds
+        self._jobs: List[Tuple[float, int, tuple]] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._busy = 0
+        self._threads = []
+        for i in range(self.max_workers):
+            thread = threading.Thread(target=self._worker, name=f"transcription-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _priority(self, job_seconds: Optional[float], enqueued_at: float) -> float:
+        # Waiting lowers a job's score by `aging` per second. Subtracting the same
+        # aging * now from every job doesn't change their order, so the score can
+        # be fixed at enqueue time: cost + aging * enqueued_at.
+        cost = self.default_job_seconds if job_seconds is None else job_seconds
+        return cost + self.aging * enqueued_at
+
+    def _next_job(self) -> Optional[tuple]:
+        with self._condition:
+            while not self._jobs and not self._closed:
+                self._condition.wait()
+            if not self._jobs:
+                return None
+            _, _, job = heapq.heappop(self._jobs)
+            return job
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+
+            loop, future, fn, args, kwargs, enqueued_at, job_seconds = job
+            TRANSCRIPTION_QUEUE_DEPTH.dec()
+            TRANSCRIPTION_QUEUE_WAIT_SECONDS.labels(duration_bucket=duration_bucket(job_seconds)).observe(time.monotonic() - enqueued_at)
+
+            if future.cancelled():
+                continue
+
+            with self._condition:
+                self._busy += 1
+            TRANSCRIPTION_WORKERS_BUSY.inc()
+            error = None
+            result = None
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                error = e
+            finally:
+                # Idle before the caller sees the result, so it can tell the worker is free
+                with self._condition:
+                    self._busy -= 1
+                TRANSCRIPTION_WORKERS_BUSY.dec()
+            loop.call_soon_threadsafe(_resolve, future, result, error)
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._jobs)
+
+    @property
+    def workers_busy(self) -> int:
+        return self._busy
+
+    def submit(self, fn: Callable[..., Any], *args, job_seconds: Optional[float] = None, **kwargs) -> asyncio.Future:
+        """
+        Queue `fn(*args, **kwargs)` on a worker and return a future for its result.
+        `job_seconds` is the audio duration used to order the queue; unknown
+        jobs are treated as `default_job_seconds`. Raises a 503 immediately when
+        the queue is full.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        enqueued_at = time.monotonic()
+
+        with self._condition:
+            if len(self._jobs) >= self.max_queue_size:
+                TRANSCRIPTION_REJECTED_TOTAL.inc()
+                raise HTTPException(
+                    status_code=503,
+                    detail="Transcription queue is full. Please retry shortly.",
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            job = (loop, future, fn, args, kwargs, enqueued_at, job_seconds)
+            heapq.heappush(self._jobs, (self._priority(job_seconds, enqueued_at), next(self._sequence), job))
+            TRANSCRIPTION_QUEUE_DEPTH.inc()
+            self._condition.notify()
+
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args, job_seconds: Optional[float] = None, **kwargs) -> Any:
+        """Queue `fn(*args, **kwargs)` on a worker and await its result."""
+        return await self.submit(fn, *args, job_seconds=job_seconds, **kwargs)
+
+    def shutdown(self):
+        """Stop the workers once the jobs already queued have been drained."""
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
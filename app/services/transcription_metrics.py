@@ -0,0 +1,39 @@
+import time
+from contextlib import contextmanager
+from prometheus_client import Histogram
+
+TRANSCRIPTION_STAGE_SECONDS = Histogram(
+    'transcription_stage_seconds', 'Time spent in each transcription stage (seconds)',
+    ['stage', 'provider', 'model'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+)
+
+TRANSCRIPTION_AUDIO_DURATION_SECONDS = Histogram(
+    'transcription_audio_duration_seconds', 'Duration of audio submitted for transcription (seconds)',
+    ['provider', 'model'],
+    buckets=(1, 2, 5, 10, 20, 30, 60, 120, 300, 600, 1200, 3600)
+)
+
+TRANSCRIPTION_REAL_TIME_FACTOR = Histogram(
+    'transcription_real_time_factor', 'Inference seconds per second of uploaded audio',
+    ['provider', 'model'],
+    buckets=(0.02, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0)
+)
+
+@contextmanager
+def stage_timer(stage: str, provider: str, model: str):
+    """Time a block as one transcription stage: upload_read, decode, vad, upload, inference or postprocess."""
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        TRANSCRIPTION_STAGE_SECONDS.labels(stage=stage, provider=provider, model=model).observe(time.perf_counter() - start_time)
+
+def observe_audio_duration(provider: str, model: str, audio_seconds: float):
+    TRANSCRIPTION_AUDIO_DURATION_SECONDS.labels(provider=provider, model=model).observe(audio_seconds)
+
+def observe_inference(provider: str, model: str, inference_seconds: float, audio_seconds: float):
+    """Record the inference stage and the resulting real-time factor."""
+    TRANSCRIPTION_STAGE_SECONDS.labels(stage='inference', provider=provider, model=model).observe(inference_seconds)
+    if audio_seconds > 0:
+        TRANSCRIPTION_REAL_TIME_FACTOR.labels(provider=provider, model=model).observe(inference_seconds / audio_seconds)
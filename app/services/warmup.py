@@ -0,0 +1,73 @@
+import logging
+import time
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+from prometheus_client import Gauge
+from app.utils.audio_decode import SAMPLE_RATE
+
+APP_IMPORT_SECONDS = Gauge(
+    'app_import_seconds', 'Time spent importing the application before it could accept connections (seconds)'
+)
+
+APP_WARMUP_SECONDS = Gauge(
+    'app_warmup_seconds', 'Duration of each background warm-up step (seconds)',
+    ['step']
+)
+
+APP_READY = Gauge(
+    'app_ready', '1 once background warm-up has finished and the app reports ready'
+)
+
+# One second of quiet noise: enough to run the encoder and a decoder pass
+SYNTHETIC_AUDIO_SECONDS = 1.0
+
+
+def synthetic_inference(model) -> None:
+    """Run one tiny transcription so the first real request doesn't pay for lazy kernel setup."""
+    audio = (np.random.default_rng(0).standard_normal(int(SYNTHETIC_AUDIO_SECONDS * SAMPLE_RATE)) * 0.01).astype(np.float32)
+    segments, _ = model.transcribe(audio, beam_size=1, vad_filter=False, without_timestamps=True)
+    list(segments)
+
+
+class Warmup:
+    """
+    Runs the slow startup work (heavy imports, model loading, a synthetic
+    inference) after the server is already accepting connections, and tracks
+    whether it has finished for the readiness probe. Steps run in order on a
+    worker thread; the first failing step leaves the app not ready.
+    """
+
+    def __init__(self, steps: List[Tuple[str, Callable[[], None]]]):
+        self.steps = steps
+        self.ready = False
+        self.error: Optional[str] = None
+        self.durations: Dict[str, float] = {}
+        self.current_step: Optional[str] = None
+
+    def run(self):
+        started = time.perf_counter()
+        for name, step in self.steps:
+            self.current_step = name
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.error = f"{name}: {e}"
+                logging.error(f"Warm-up step '{name}' failed: {e}")
+                return
+            finally:
+                self.durations[name] = round(time.perf_counter() - step_started, 3)
+                APP_WARMUP_SECONDS.labels(step=name).set(self.durations[name])
+        self.current_step = None
+        self.ready = True
+        APP_WARMUP_SECONDS.labels(step='total').set(time.perf_counter() - started)
+        APP_READY.set(1)
+        logging.info(f"Warm-up complete in {time.perf_counter() - started:.1f}s. System ready for transcription requests.")
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "step": self.current_step,
+            "error": self.error,
+            "durations": self.durations,
+        }
@@ -0,0 +1,154 @@
+import logging
+import os
+import threading
+import time
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+from faster_whisper import WhisperModel
+from prometheus_client import Gauge, Histogram
+
+WHISPER_MODEL_LOAD_SECONDS = Histogram(
+    'whisper_model_load_seconds', 'Time spent loading a Faster-Whisper model (seconds)',
+    ['model', 'compute_type']
+)
+
+WHISPER_CPU_THREADS = Gauge(
+    'whisper_cpu_threads', 'CPU threads used per Faster-Whisper inference'
+)
+
+AUTOTUNE_SECONDS = 5
+
+# Decoding options that shape the transcript; also part of the result-cache key.
+WHISPER_OPTIONS = {"language": "en", "task": "translate", "beam_size": 5}
+
+# Per-request quality tiers. "accurate" is faster-whisper's default decoding
+# (beam search with temperature fallback) and what requests get without a tier;
+# "fast" is greedy with no fallback and no timestamp tokens.
+QUALITY_TIERS = {
+    "fast": {"beam_size": 1, "best_of": 1, "temperature": 0.0, "without_timestamps": True},
+    "balanced": {"beam_size": 2, "best_of": 2, "temperature": (0.0, 0.4, 0.8), "without_timestamps": True},
+    "accurate": {"beam_size": 5, "best_of": 5, "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0), "without_timestamps": False},
+}
+
+DEFAULT_QUALITY = "accurate"
+
+
+def resolve_quality(quality: Optional[str] = None) -> str:
+    quality = quality or DEFAULT_QUALITY
+    if quality not in QUALITY_TIERS:
+        raise ValueError(f"Unknown quality '{quality}'. Available: {', '.join(QUALITY_TIERS)}")
+    return quality
+
+
+def whisper_options(quality: Optional[str] = None) -> dict:
+    """Full set of `transcribe` keyword arguments for a quality tier."""
+    return {**WHISPER_OPTIONS, **QUALITY_TIERS[resolve_quality(quality)]}
+
+
+def with_timestamps(options: dict) -> dict:
+    """
+    Tier options for callers that need per-utterance segment times (streaming,
+    long-audio stitching, live). Without timestamp tokens Whisper returns one
+    segment per 30 s window with window-boundary times.
+    """
+    return {key: value for key, value in options.items() if key != "without_timestamps"}
+
+
+class WhisperModelRegistry:
+    """
+    Loads named Faster-Whisper models (tiny, base, small, ...) on first use and
+    keeps one shared instance per name. Loading is guarded by a lock so
+    concurrent first requests never load the same model twice.
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        allowed_models: Iterable[str],
+        device: str = "cpu",
+        compute_type: str = "int8",
+        cpu_threads: int = 0,
+        num_workers: int = 1,
+        tier_models: Optional[Dict[str, str]] = None,
+    ):
+        self.default_model = default_model
+        self.tier_models = {tier: name for tier, name in (tier_models or {}).items() if name}
+        self.allowed_models = set(allowed_models) | {default_model} | set(self.tier_models.values())
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self._models: Dict[str, WhisperModel] = {}
+        self._lock = threading.Lock()
+        WHISPER_CPU_THREADS.set(cpu_threads)
+
+    def resolve(self, name: Optional[str] = None, quality: Optional[str] = None) -> str:
+        """
+        Map a requested model to a configured model name. Without an explicit
+        model, the quality tier's model (if configured) or the default is used.
+        """
+        name = name or self.tier_models.get(quality) or self.default_model
+        if name not in self.allowed_models:
+            raise ValueError(f"Unknown Whisper model '{name}'. Available: {', '.join(sorted(self.allowed_models))}")
+        return name
+
+    def get(self, name: Optional[str] = None) -> WhisperModel:
+        name = self.resolve(name)
+        model = self._models.get(name)
+        if model is not None:
+            return model
+
+        with self._lock:
+            model = self._models.get(name)
+            if model is None:
+                model = self._load(name, self.cpu_threads)
+                self._models[name] = model
+        return model
+
+    def _load(self, name: str, cpu_threads: int) -> WhisperModel:
+        start_time = time.time()
+        model = WhisperModel(
+            name,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=cpu_threads,
+            num_workers=self.num_workers,
+        )
+        WHISPER_MODEL_LOAD_SECONDS.labels(model=name, compute_type=self.compute_type).observe(time.time() - start_time)
+        logging.info(f"Loaded Faster-Whisper model '{name}' ({self.compute_type}, cpu_threads={cpu_threads or 'auto'})")
+        return model
+
+    def autotune(self, name: Optional[str] = None, candidates: Optional[List[int]] = None) -> int:
+        """
+        Benchmark a few `cpu_threads` values on this host with a synthetic clip
+        and keep the fastest. Models already loaded are dropped so they reload
+        with the tuned value.
+        """
+        name = self.resolve(name)
+        cores = os.cpu_count() or 1
+        if candidates is None:
+            candidates = sorted({1, 2, 4, 8, 16, cores} & set(range(1, cores + 1)))
+
+        rng = np.random.default_rng(0)
+        t = np.arange(AUTOTUNE_SECONDS * 16000) / 16000
+        audio = (0.1 * np.sin(2 * np.pi * 220 * t) + 0.01 * rng.standard_normal(t.size)).astype(np.float32)
+
+        timings = {}
+        for threads in candidates:
+            model = self._load(name, threads)
+            warmup, _ = model.transcribe(audio[:16000], beam_size=1, language="en")
+            list(warmup)
+            start_time = time.time()
+            segments, _ = model.transcribe(audio, beam_size=1, language="en")
+            list(segments)
+            timings[threads] = time.time() - start_time
+            del model
+
+        best = min(timings, key=timings.get)
+        logging.info(f"Whisper autotune timings (threads -> seconds): {timings}; using cpu_threads={best}")
+
+        with self._lock:
+            self.cpu_threads = best
+            self._models.clear()
+        WHISPER_CPU_THREADS.set(best)
+        return best
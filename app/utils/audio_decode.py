@@ -0,0 +1,90 @@
+import io
+import wave
+import av
+import numpy as np
+from typing import BinaryIO, Optional, Union
+from faster_whisper.audio import decode_audio
+from prometheus_client import Counter
+
+SAMPLE_RATE = 16000
+
+AUDIO_NORMALIZE_TOTAL = Counter(
+    'audio_normalize_total', 'Audio inputs normalized to 16 kHz mono float32',
+    ['container', 'path']
+)
+
+# Raw bytes, or a seekable file object such as an ingested upload spool
+AudioSource = Union[bytes, BinaryIO]
+
+def as_stream(source: AudioSource) -> BinaryIO:
+    """Wrap bytes in a buffer, or rewind a file object, ready for reading from the start."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    source.seek(0)
+    return source
+
+def sniff_container(head: bytes) -> Optional[str]:
+    """Identify the audio container from its leading magic bytes. None when unrecognised."""
+    if head[:4] == b"RIFF" and head[8:12] == b"WAVE":
+        return "wav"
+    if head[:4] == b"OggS":
+        return "ogg"
+    if head[:4] == b"fLaC":
+        return "flac"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return "webm"
+    if head[4:8] == b"ftyp":
+        return "mp4"
+    if head[:3] == b"ID3":
+        return "mp3"
+    if len(head) >= 2 and head[0] == 0xFF and head[1] & 0xE0 == 0xE0:
+        # MPEG audio frame sync; layer bits 00 mean an ADTS AAC stream
+        return "aac" if head[1] & 0x06 == 0 else "mp3"
+    return None
+
+def _read_native_wav(stream: BinaryIO) -> Optional[np.ndarray]:
+    """Samples of a 16-bit PCM WAV that is already 16 kHz mono, or None if it needs resampling."""
+    try:
+        with wave.open(stream, "rb") as wav:
+            if (wav.getnchannels(), wav.getsampwidth(), wav.getframerate(), wav.getcomptype()) != (1, 2, SAMPLE_RATE, "NONE"):
+                return None
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+
+def decode_audio_bytes(audio_bytes: AudioSource) -> np.ndarray:
+    """
+    Normalize an in-memory (or spooled) audio file (wav, mp3, webm, ogg, m4a, ...)
+    into the 16 kHz mono float32 samples Whisper expects, without touching disk.
+
+    16-bit PCM WAV that is already 16 kHz mono is read as-is; everything else
+    is decoded and resampled in-process by PyAV. Raises whatever PyAV raises
+    when the container can't be read from a buffer, so callers can fall back
+    to the temp-file path.
+    """
+    stream = as_stream(audio_bytes)
+    container = sniff_container(stream.read(12)) or "unknown"
+
+    audio = None
+    if container == "wav":
+        audio = _read_native_wav(as_stream(stream))
+    if audio is not None:
+        AUDIO_NORMALIZE_TOTAL.labels(container=container, path='passthrough').inc()
+    else:
+        audio = decode_audio(as_stream(stream), sampling_rate=SAMPLE_RATE)
+        AUDIO_NORMALIZE_TOTAL.labels(container=container, path='decode').inc()
+
+    if audio.size == 0:
+        raise ValueError("Decoded audio contains no samples")
+    return audio
+
+def probe_duration(audio_bytes: AudioSource) -> Optional[float]:
+    """Read the duration from the container header without decoding. None when unknown."""
+    try:
+        with av.open(as_stream(audio_bytes), mode="r") as container:
+            if container.duration:
+                return container.duration / av.time_base
+    except Exception:
+        pass
+    return None
@@ -1,30 +1,23 @@
-from fastapi import HTTPException, UploadFile
-from pydub import AudioSegment
+from fastapi import HTTPException
+from app.utils.audio_decode import decode_audio_bytes
 import base64
-import io
+import binascii
+import numpy as np
 
-def base64_to_wav_uploadfile(b64_data: str) -> UploadFile:
+def base64_to_audio(b64_data: str) -> np.ndarray:
     """
-    Converts any base64-encoded audio (mp3, m4a, webm, wav, etc.)
-    into a WAV UploadFile for processing.
+    Decode base64-encoded audio (mp3, m4a, webm, wav, etc., optionally as a
+    data: URL) straight into 16 kHz mono float32 samples for Whisper.
     """
+    if b64_data.startswith("data:"):
+        b64_data = b64_data.split(",", 1)[-1]
+
     try:
-        # Decode the base64 string
         audio_bytes = base64.b64decode(b64_data)
+    except (binascii.Error, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid base64 audio: {str(e)}")
 
-        # Try reading the file with pydub (auto-detects format)
-        audio = AudioSegment.from_file(io.BytesIO(audio_bytes))
-
-        # Convert/export to WAV
-        wav_io = io.BytesIO()
-        audio.export(wav_io, format="wav")
-        wav_io.seek(0)
-
-        # Wrap it as an UploadFile (like a real file upload)
-        return UploadFile(filename="converted_audio.wav", file=wav_io)
-
+    try:
+        return decode_audio_bytes(audio_bytes)
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Audio conversion failed: {str(e)}")
-
-
-
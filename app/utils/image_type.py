@@ -0,0 +1,26 @@
+from typing import Optional
+
+# Used when the bytes don't match a known format; what the notes path always sent before
+DEFAULT_IMAGE_MIME = "image/jpeg"
+
+def sniff_image_mime(head: bytes) -> Optional[str]:
+    """Identify an image format from its leading magic bytes. None when unrecognised."""
+    if head[:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    if head[:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "image/gif"
+    if head[4:8] == b"ftyp":
+        brand = head[8:12]
+        if brand in (b"heic", b"heix", b"hevc", b"hevx"):
+            return "image/heic"
+        if brand in (b"mif1", b"msf1", b"heif"):
+            return "image/heif"
+        if brand in (b"avif", b"avis"):
+            return "image/avif"
+    if head[:2] == b"BM":
+        return "image/bmp"
+    return None
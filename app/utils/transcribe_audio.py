@@ -1,37 +1,160 @@
 import base64
+import dataclasses
+import shutil
 import tempfile
-from app.dependencies import get_whisper_model 
+import threading
+import time
+import numpy as np
+from typing import Callable, Optional, Union
+from faster_whisper.audio import decode_audio
+from faster_whisper.transcribe import Segment, TranscriptionInfo
+from app.dependencies import get_whisper_model, get_model_registry
+from app.services.whisper_registry import WHISPER_OPTIONS, whisper_options
+from app.services.transcription_metrics import stage_timer, observe_audio_duration, observe_inference
+from app.utils.audio_decode import decode_audio_bytes, as_stream, AudioSource, SAMPLE_RATE
+from app.utils.vad import strip_silence, restore_segment_times
 
-def transcribe_file_path(audio_path: str) -> str:
+def transcribe_audio(audio: Union[str, np.ndarray], model_name: Optional[str] = None, options: Optional[dict] = None, provider: str = 'faster_whisper') -> str:
+    """
+    Transcribe a file path or a 16 kHz mono float32 array with Faster-Whisper.
+    Silence is stripped with VAD before inference. `options` are the decoding
+    settings of a quality tier (see `whisper_options`); the default tier if omitted.
+    `provider` labels the metrics, e.g. to keep shadow runs apart from real traffic.
+    """
     try:
-        model = get_whisper_model()
-        
-        segments, info = model.transcribe(audio_path, language="en",
-            task="translate")
-            
-        text = " ".join([seg.text for seg in segments]).strip()
+        model_name = get_model_registry().resolve(model_name)
+        model = get_whisper_model(model_name)
+        if isinstance(audio, str):
+            with stage_timer('decode', provider, model_name):
+                audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+        observe_audio_duration(provider, model_name, audio.size / SAMPLE_RATE)
+
+        with stage_timer('vad', provider, model_name):
+            speech, _ = strip_silence(audio)
+        if not speech.size:
+            return "No speech detected"
+
+        start_time = time.perf_counter()
+        segments, info = model.transcribe(speech, **(options or whisper_options()))
+        texts = [seg.text for seg in segments]
+        observe_inference(provider, model_name, time.perf_counter() - start_time, audio.size / SAMPLE_RATE)
+
+        with stage_timer('postprocess', provider, model_name):
+            text = " ".join(texts).strip()
 
         return text or "No speech detected"
 
     except Exception as e:
         return f"Error transcribing audio: {str(e)}"
 
+def transcribe_file_path(audio_path: str, model_name: Optional[str] = None, options: Optional[dict] = None) -> str:
+    return transcribe_audio(audio_path, model_name, options)
+
+def transcribe_audio_bytes(audio_bytes: bytes, file_suffix: str, model_name: Optional[str] = None) -> str:
+    """
+    Decode audio bytes in memory and transcribe them. A temp file is only used
+    as a fallback for containers the in-memory decoder can't handle.
+    """
+    try:
+        audio = decode_audio_bytes(audio_bytes)
+    except Exception:
+        audio = None
+
+    if audio is not None:
+        return transcribe_audio(audio, model_name)
+
+    return transcribe_via_temp_file(audio_bytes, file_suffix, model_name)
+
+def _write_temp_file(tmp, audio_data: AudioSource):
+    shutil.copyfileobj(as_stream(audio_data), tmp)
+    tmp.flush()
+
+def decode_via_temp_file(audio_bytes: AudioSource, file_suffix: str) -> np.ndarray:
+    """Decode through a temp file, for containers the in-memory decoder can't handle. Raises if undecodable."""
+    with tempfile.NamedTemporaryFile(suffix=file_suffix, delete=True) as tmp:
+        _write_temp_file(tmp, audio_bytes)
+        return decode_audio(tmp.name, sampling_rate=SAMPLE_RATE)
+
+def transcribe_via_temp_file(audio_bytes: AudioSource, file_suffix: str, model_name: Optional[str] = None, options: Optional[dict] = None) -> str:
+    """Fallback for containers that can't be decoded from an in-memory buffer."""
+    with tempfile.NamedTemporaryFile(suffix=file_suffix, delete=True) as tmp:
+        _write_temp_file(tmp, audio_bytes)
+        return transcribe_file_path(tmp.name, model_name, options)
+
+def transcribe_segments(
+    audio: Union[str, np.ndarray],
+    on_segment: Callable[[Segment], None],
+    stop: Optional[threading.Event] = None,
+    model_name: Optional[str] = None,
+    options: Optional[dict] = None,
+) -> TranscriptionInfo:
+    """
+    Transcribe and hand each segment to `on_segment` as soon as Faster-Whisper
+    decodes it. Iteration ends early once `stop` is set. Segment times refer
+    to the original audio even though silence is stripped before inference.
+    """
+    model_name = get_model_registry().resolve(model_name)
+    model = get_whisper_model(model_name)
+    if isinstance(audio, str):
+        with stage_timer('decode', 'faster_whisper', model_name):
+            audio = decode_audio(audio, sampling_rate=SAMPLE_RATE)
+    observe_audio_duration('faster_whisper', model_name, audio.size / SAMPLE_RATE)
+
+    with stage_timer('vad', 'faster_whisper', model_name):
+        speech, timestamp_map = strip_silence(audio)
+    if not speech.size:
+        return TranscriptionInfo(
+            language=WHISPER_OPTIONS["language"],
+            language_probability=1,
+            duration=audio.size / SAMPLE_RATE,
+            duration_after_vad=0,
+            all_language_probs=None,
+            transcription_options=None,
+            vad_options=None,
+        )
+
+    start_time = time.perf_counter()
+    segments, info = model.transcribe(speech, **(options or whisper_options()))
+
+    for seg in segments:
+        if stop is not None and stop.is_set():
+            break
+        on_segment(restore_segment_times(seg, timestamp_map))
+
+    observe_inference('faster_whisper', model_name, time.perf_counter() - start_time, audio.size / SAMPLE_RATE)
+    return dataclasses.replace(info, duration=audio.size / SAMPLE_RATE, duration_after_vad=speech.size / SAMPLE_RATE)
+
+def transcribe_bytes_segments(
+    audio_bytes: AudioSource,
+    file_suffix: str,
+    on_segment: Callable[[Segment], None],
+    stop: Optional[threading.Event] = None,
+    model_name: Optional[str] = None,
+    options: Optional[dict] = None,
+) -> TranscriptionInfo:
+    """Streaming counterpart of `transcribe_audio_bytes`."""
+    try:
+        with stage_timer('decode', 'faster_whisper', get_model_registry().resolve(model_name)):
+            audio = decode_audio_bytes(audio_bytes)
+    except Exception:
+        audio = None
+
+    if audio is not None:
+        return transcribe_segments(audio, on_segment, stop, model_name, options)
+
+    with tempfile.NamedTemporaryFile(suffix=file_suffix, delete=True) as tmp:
+        _write_temp_file(tmp, audio_bytes)
+        return transcribe_segments(tmp.name, on_segment, stop, model_name, options)
+
 def transcribe_base64_audio(audio_base64: str, file_suffix: str) -> str:
     """
     Decode base64 audio (MP3, WAV, etc.) and transcribe using local Faster-Whisper.
     """
     try:
+        if audio_base64.startswith("data:"):
+            audio_base64 = audio_base64.split(",", 1)[-1]
         audio_bytes = base64.b64decode(audio_base64)
-        with tempfile.NamedTemporaryFile(suffix=file_suffix, delete=True) as tmp:
-            tmp.write(audio_bytes)
-            tmp.flush()
-
-            model = get_whisper_model()
-            segments, info = model.transcribe(tmp.name, language="en",
-                task="translate")
-            text = " ".join([seg.text for seg in segments]).strip()
-
-            return text or "No speech detected"
+        return transcribe_audio_bytes(audio_bytes, file_suffix)
 
     except Exception as e:
         return f"Error transcribing audio: {str(e)}"
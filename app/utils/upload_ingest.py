@@ -0,0 +1,55 @@
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from fastapi import HTTPException, UploadFile
+
+@dataclass
+class IngestedUpload:
+    """An uploaded file read into a spool (memory, or disk past the threshold) with its content hash."""
+    file: tempfile.SpooledTemporaryFile
+    size: int
+    sha256: str
+    content_type: str
+
+    @property
+    def suffix(self) -> str:
+        return "." + self.content_type.split("/")[-1] if "/" in self.content_type else ".tmp"
+
+    def read(self) -> bytes:
+        self.file.seek(0)
+        return self.file.read()
+
+    def close(self):
+        self.file.close()
+
+async def ingest_upload(upload: UploadFile, max_bytes: int, chunk_size: int, spool_max_memory: int) -> IngestedUpload:
+    """
+    Read an UploadFile in fixed-size chunks, hashing as it goes and failing with
+    413 as soon as `max_bytes` is exceeded. Content is spooled in memory up to
+    `spool_max_memory` bytes and rolls over to an anonymous temp file beyond
+    that, so per-request memory stays bounded whatever the client sends.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit.")
+
+    digest = hashlib.sha256()
+    spool = tempfile.SpooledTemporaryFile(max_size=spool_max_memory)
+    size = 0
+
+    try:
+        await upload.seek(0)
+        while True:
+            chunk = await upload.read(chunk_size)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit.")
+            digest.update(chunk)
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.seek(0)
+    return IngestedUpload(file=spool, size=size, sha256=digest.hexdigest(), content_type=upload.content_type or "")
@@ -0,0 +1,48 @@
+import dataclasses
+import numpy as np
+from typing import Optional, Tuple
+from faster_whisper.transcribe import Segment
+from faster_whisper.vad import SpeechTimestampsMap, VadOptions, get_speech_timestamps
+from prometheus_client import Counter
+from app.config import settings
+from app.utils.audio_decode import SAMPLE_RATE
+
+TRANSCRIPTION_VAD_SKIPPED_SECONDS = Counter(
+    'transcription_vad_skipped_seconds_total', 'Seconds of non-speech audio removed before inference'
+)
+
+def strip_silence(audio: np.ndarray) -> Tuple[np.ndarray, Optional[SpeechTimestampsMap]]:
+    """
+    Drop non-speech regions with Silero VAD before inference.
+
+    Returns the speech-only samples and a map from speech-only times back to
+    the original timeline. The map is None when VAD is disabled; the returned
+    array is empty when no speech was found.
+    """
+    if not settings.vad_enabled:
+        return audio, None
+
+    options = VadOptions(
+        threshold=settings.vad_threshold,
+        min_silence_duration_ms=settings.vad_min_silence_ms,
+        speech_pad_ms=settings.vad_speech_pad_ms,
+    )
+    chunks = get_speech_timestamps(audio, options, sampling_rate=SAMPLE_RATE)
+
+    if not chunks:
+        TRANSCRIPTION_VAD_SKIPPED_SECONDS.inc(audio.size / SAMPLE_RATE)
+        return np.array([], dtype=np.float32), None
+
+    speech = np.concatenate([audio[chunk["start"]:chunk["end"]] for chunk in chunks])
+    TRANSCRIPTION_VAD_SKIPPED_SECONDS.inc((audio.size - speech.size) / SAMPLE_RATE)
+    return speech, SpeechTimestampsMap(chunks, SAMPLE_RATE)
+
+def restore_segment_times(seg: Segment, timestamp_map: Optional[SpeechTimestampsMap]) -> Segment:
+    """Shift a segment decoded from speech-only audio back onto the original timeline."""
+    if timestamp_map is None:
+        return seg
+    return dataclasses.replace(
+        seg,
+        start=timestamp_map.get_original_time(seg.start),
+        end=timestamp_map.get_original_time(seg.end, is_end=True),
+    )
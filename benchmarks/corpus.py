@@ -0,0 +1,125 @@
+"""
+Deterministic audio corpus for transcription benchmarks.
+
+Synthesizes speech-like signals (amplitude-modulated harmonic tones with
+pauses and background noise) at several durations and encodes them as WAV,
+MP3 and WebM/Opus. Any decodable speech samples checked into
+`benchmarks/samples/` or `tests/` are added as-is.
+"""
+import hashlib
+import io
+import os
+from dataclasses import dataclass
+from typing import List, Sequence
+import av
+import numpy as np
+from app.utils.audio_decode import decode_audio_bytes, probe_duration
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_DIRS = [os.path.join(ROOT, "benchmarks", "samples"), os.path.join(ROOT, "tests")]
+SAMPLE_EXTENSIONS = (".wav", ".mp3", ".webm", ".ogg", ".m4a", ".flac")
+
+DEFAULT_DURATIONS = (5, 30, 120)
+DEFAULT_FORMATS = ("wav", "mp3", "webm")
+SYNTH_RATE = 48000
+
+FORMATS = {
+    # format: (container, codec, mime type)
+    "wav": ("wav", "pcm_s16le", "audio/wav"),
+    "mp3": ("mp3", "libmp3lame", "audio/mpeg"),
+    "webm": ("webm", "libopus", "audio/webm"),
+}
+
+
+@dataclass
+class CorpusItem:
+    name: str
+    data: bytes
+    mime_type: str
+    duration: float
+
+
+def synthesize(duration: float, seed: int, rate: int = SYNTH_RATE) -> np.ndarray:
+    """Speech-like test signal: voiced bursts of 0.2-1.5s separated by short pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(duration * rate)
+    signal = 0.005 * rng.standard_normal(total)
+
+    position = 0
+    while position < total:
+        burst = int(rng.uniform(0.2, 1.5) * rate)
+        end = min(position + burst, total)
+        t = np.arange(end - position) / rate
+        pitch = rng.uniform(90, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = np.sin(np.pi * t / max(t[-1], 1e-3)) * (0.6 + 0.4 * np.sin(2 * np.pi * 4 * t))
+        signal[position:end] += 0.2 * voiced * envelope
+        position = end + int(rng.uniform(0.1, 0.8) * rate)
+
+    return np.clip(signal, -1.0, 1.0).astype(np.float32)
+
+
+def encode(samples: np.ndarray, fmt: str, rate: int = SYNTH_RATE) -> bytes:
+    container_format, codec, _ = FORMATS[fmt]
+    buffer = io.BytesIO()
+    # bitexact keeps muxers from embedding random UIDs and timestamps, so output is reproducible
+    with av.open(buffer, mode="w", format=container_format, options={"fflags": "+bitexact"}) as container:
+        stream = container.add_stream(codec, rate=rate)
+        stream.layout = "mono"
+        resampler = av.AudioResampler(format=stream.codec_context.format.name, layout="mono", rate=rate)
+
+        pcm = (samples * 32767).astype(np.int16)
+        block = rate
+        for begin in range(0, pcm.size, block):
+            frame = av.AudioFrame.from_ndarray(pcm[None, begin:begin + block], format="s16", layout="mono")
+            frame.sample_rate = rate
+            frame.pts = begin
+            for resampled in resampler.resample(frame):
+                for packet in stream.encode(resampled):
+                    container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def load_samples() -> List[CorpusItem]:
+    items = []
+    for directory in SAMPLE_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith(SAMPLE_EXTENSIONS):
+                continue
+            with open(os.path.join(directory, name), "rb") as f:
+                data = f.read()
+            try:
+                audio = decode_audio_bytes(data)
+            except Exception:
+                continue
+            ext = name.rsplit(".", 1)[-1].lower()
+            items.append(CorpusItem(name=f"sample-{name}", data=data, mime_type=f"audio/{ext}", duration=audio.size / 16000))
+    return items
+
+
+def build_corpus(durations: Sequence[float] = DEFAULT_DURATIONS, formats: Sequence[str] = DEFAULT_FORMATS) -> List[CorpusItem]:
+    """Generate the synthetic corpus plus any checked-in speech samples. Output is identical across runs."""
+    items = []
+    for duration in durations:
+        seed = int(hashlib.sha256(f"whispa-bench-{duration}".encode()).hexdigest()[:8], 16)
+        samples = synthesize(duration, seed)
+        for fmt in formats:
+            data = encode(samples, fmt)
+            items.append(CorpusItem(
+                name=f"synth-{duration:g}s.{fmt}",
+                data=data,
+                mime_type=FORMATS[fmt][2],
+                duration=probe_duration(data) or float(duration),
+            ))
+    return items + load_samples()
+
+
+def write_corpus(directory: str, items: List[CorpusItem]):
+    os.makedirs(directory, exist_ok=True)
+    for item in items:
+        with open(os.path.join(directory, item.name), "wb") as f:
+            f.write(item.data)
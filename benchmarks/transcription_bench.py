@@ -0,0 +1,193 @@
+"""
+Offline transcription benchmark.
+
+Drives either `AudioService` directly or the `/v1/audio/transcribe` endpoint
+(in-process over ASGI, or a running server with --base-url) at increasing
+concurrency over the generated corpus, and prints a JSON report with
+throughput, latency percentiles, real-time factor and peak RSS.
+
+    python -m benchmarks.transcription_bench --target service --concurrency 1,2,4 --requests 16
+    python -m benchmarks.transcription_bench --target endpoint --model base --output bench.json
+    python -m benchmarks.transcription_bench --quality fast --concurrency 4
+
+Importing the app needs the same environment as the server (SUPABASE_URL,
+GEMINI_API_KEY, ...). The result cache is disabled unless --with-cache is set.
+"""
+import argparse
+import asyncio
+import io
+import json
+import resource
+import sys
+import time
+from typing import List, Optional
+import numpy as np
+from benchmarks.corpus import CorpusItem, build_corpus, DEFAULT_DURATIONS, DEFAULT_FORMATS
+
+
+def peak_rss_mb() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS
+    return usage / (1024 * 1024) if sys.platform == "darwin" else usage / 1024
+
+
+def summarize(concurrency: int, latencies: List[float], audio_seconds: List[float], errors: int, wall: float) -> dict:
+    ok = np.array(latencies) if latencies else np.array([0.0])
+    rtf = [latency / seconds for latency, seconds in zip(latencies, audio_seconds) if seconds > 0]
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall > 0 else 0.0,
+        "audio_seconds_per_second": round(sum(audio_seconds) / wall, 3) if wall > 0 else 0.0,
+        "latency_p50": round(float(np.percentile(ok, 50)), 3),
+        "latency_p95": round(float(np.percentile(ok, 95)), 3),
+        "latency_p99": round(float(np.percentile(ok, 99)), 3),
+        "latency_mean": round(float(ok.mean()), 3),
+        "real_time_factor_mean": round(float(np.mean(rtf)), 3) if rtf else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+class ServiceTarget:
+    """Calls AudioService.transcribe_audio_with_faster_whisper in-process."""
+
+    def __init__(self, model: Optional[str], quality: Optional[str]):
+        from app.services.audio_service import AudioService
+        self.service = AudioService()
+        self.model = model
+        self.quality = quality
+
+    async def transcribe(self, item: CorpusItem):
+        from fastapi import UploadFile
+        from starlette.datastructures import Headers
+        upload = UploadFile(file=io.BytesIO(item.data), filename=item.name, headers=Headers({"content-type": item.mime_type}))
+        text = await self.service.transcribe_audio_with_faster_whisper(upload, model=self.model, quality=self.quality)
+        if text.lower().startswith("error transcribing audio"):
+            raise RuntimeError(text)
+
+    async def close(self):
+        pass
+
+
+class EndpointTarget:
+    """Posts to /v1/audio/transcribe, in-process over ASGI or against a running server."""
+
+    def __init__(self, model: Optional[str], quality: Optional[str], base_url: Optional[str], token: Optional[str]):
+        import httpx
+        self.model = model
+        self.quality = quality
+        if base_url:
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            self.client = httpx.AsyncClient(base_url=base_url, headers=headers, timeout=None)
+        else:
+            from fastapi import FastAPI
+            from app.routers import audio
+            app = FastAPI()
+            app.include_router(audio.router, prefix="/v1/audio")
+            self.client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None)
+
+    async def transcribe(self, item: CorpusItem):
+        data = {key: value for key, value in (("model", self.model), ("quality", self.quality)) if value}
+        response = await self.client.post(
+            "/v1/audio/transcribe",
+            files={"audio_file": (item.name, item.data, item.mime_type)},
+            data=data,
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"{response.status_code}: {response.text}")
+
+    async def close(self):
+        await self.client.aclose()
+
+
+async def run_level(target, corpus: List[CorpusItem], concurrency: int, requests: int) -> dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, audio_seconds = [], []
+    errors = 0
+
+    async def one(item: CorpusItem):
+        nonlocal errors
+        async with semaphore:
+            start_time = time.perf_counter()
+            try:
+                await target.transcribe(item)
+            except Exception as e:
+                errors += 1
+                print(f"{item.name}: {e}", file=sys.stderr)
+                return
+            latencies.append(time.perf_counter() - start_time)
+            audio_seconds.append(item.duration)
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(one(corpus[i % len(corpus)]) for i in range(requests)))
+    return summarize(concurrency, latencies, audio_seconds, errors, time.perf_counter() - start_time)
+
+
+async def run(args) -> dict:
+    from app.config import settings
+    if not args.with_cache:
+        settings.transcription_cache_entries = 0
+        settings.transcription_cache_dir = ""
+
+    durations = [float(d) for d in args.durations.split(",")]
+    formats = args.formats.split(",")
+    corpus = build_corpus(durations, formats)
+    if args.write_corpus:
+        from benchmarks.corpus import write_corpus
+        write_corpus(args.write_corpus, corpus)
+
+    if args.target == "service":
+        target = ServiceTarget(args.model, args.quality)
+    else:
+        target = EndpointTarget(args.model, args.quality, args.base_url, args.token)
+
+    try:
+        if args.warmup:
+            await target.transcribe(corpus[0])
+        levels = [await run_level(target, corpus, c, args.requests or max(len(corpus), c * 2))
+                  for c in (int(c) for c in args.concurrency.split(","))]
+    finally:
+        await target.close()
+
+    return {
+        "target": args.target,
+        "base_url": args.base_url,
+        "model": args.model or settings.whisper_model,
+        "quality": args.quality or "accurate",
+        "compute_type": settings.whisper_compute_type,
+        "corpus": [{"name": item.name, "bytes": len(item.data), "duration": round(item.duration, 2)} for item in corpus],
+        "levels": levels,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Whispa transcription throughput and latency.")
+    parser.add_argument("--target", choices=("service", "endpoint"), default="service")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of an in-process app (endpoint target)")
+    parser.add_argument("--token", help="Bearer token for --base-url")
+    parser.add_argument("--model", help="Whisper model tier to request (defaults to WHISPER_MODEL)")
+    parser.add_argument("--quality", choices=("fast", "balanced", "accurate"), help="Quality tier to request (defaults to accurate)")
+    parser.add_argument("--concurrency", default="1,2,4,8", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=0, help="Requests per level (default: corpus size or 2x concurrency)")
+    parser.add_argument("--durations", default=",".join(str(d) for d in DEFAULT_DURATIONS), help="Synthetic clip durations in seconds")
+    parser.add_argument("--formats", default=",".join(DEFAULT_FORMATS), help="Comma-separated formats: wav, mp3, webm")
+    parser.add_argument("--no-warmup", dest="warmup", action="store_false", help="Skip the untimed warm-up request")
+    parser.add_argument("--with-cache", action="store_true", help="Keep the transcription result cache enabled")
+    parser.add_argument("--write-corpus", metavar="DIR", help="Also write the generated corpus files to DIR")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run(args))
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
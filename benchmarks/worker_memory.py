@@ -0,0 +1,93 @@
+"""
+Per-process memory of a running gunicorn deployment (Linux only).
+
+Reads /proc/<pid>/smaps_rollup for the master and each of its children and
+prints Rss, Pss, shared and private memory in MB. Imported modules from the
+preloading master (gunicorn.conf.py) show up as shared pages. The Whisper
+models are private memory of the one inference process, so a worker's
+private memory is what each extra worker actually costs.
+
+    gunicorn -c gunicorn.conf.py app.main:app &
+    python -m benchmarks.worker_memory --master-pid $!
+    python -m benchmarks.worker_memory --master-pid 1234 --output memory.json
+
+Send some traffic first: pages a worker writes to (and so copies) only show
+up as private once requests have touched them.
+"""
+import argparse
+import json
+import os
+from typing import Dict, List
+
+FIELDS = ("Rss", "Pss", "Shared_Clean", "Shared_Dirty", "Private_Clean", "Private_Dirty")
+
+
+def read_rollup(pid: int) -> Dict[str, float]:
+    """Memory totals of one process in MB."""
+    values = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in FIELDS:
+                values[key] = int(rest.split()[0]) / 1024
+    return {
+        "rss_mb": round(values.get("Rss", 0.0), 1),
+        "pss_mb": round(values.get("Pss", 0.0), 1),
+        "shared_mb": round(values.get("Shared_Clean", 0.0) + values.get("Shared_Dirty", 0.0), 1),
+        "private_mb": round(values.get("Private_Clean", 0.0) + values.get("Private_Dirty", 0.0), 1),
+    }
+
+
+def child_pids(pid: int) -> List[int]:
+    children = []
+    for task in os.listdir(f"/proc/{pid}/task"):
+        try:
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            continue
+    return sorted(set(children))
+
+
+def role(pid: int) -> str:
+    """What a child of the master is: a gunicorn worker, the spawned inference process, or a multiprocessing helper."""
+    with open(f"/proc/{pid}/cmdline", "rb") as f:
+        cmdline = f.read().replace(b"\0", b" ")
+    if b"multiprocessing.spawn" in cmdline:
+        return "inference"
+    if b"multiprocessing." in cmdline:
+        return "helper"
+    return "worker"
+
+
+def report(master_pid: int) -> dict:
+    master = {"pid": master_pid, **read_rollup(master_pid)}
+    children = [{"pid": pid, "role": role(pid), **read_rollup(pid)} for pid in child_pids(master_pid)]
+    workers = [child for child in children if child["role"] == "worker"]
+    private = [worker["private_mb"] for worker in workers]
+    return {
+        "master": master,
+        "workers": workers,
+        "others": [child for child in children if child["role"] != "worker"],
+        # Pss splits shared pages between the processes mapping them, so the sum is the real total
+        "total_pss_mb": round(master["pss_mb"] + sum(child["pss_mb"] for child in children), 1),
+        "worker_private_mean_mb": round(sum(private) / len(private), 1) if private else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report shared and private memory of a gunicorn master, its workers and the inference process.")
+    parser.add_argument("--master-pid", type=int, required=True, help="PID of the gunicorn master process")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    output = json.dumps(report(args.master_pid), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Multi-process serving under gunicorn with uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The master imports the app and the Gemini/OpenAI client libraries before
+forking, so the workers share those code and module pages copy-on-write.
+Whisper models are never loaded in the master or the workers: a CTranslate2
+model loaded before fork() hangs the child on its first inference, and
+copies in each worker don't share memory. Instead the master spawns one
+inference process that owns the models, and the workers send it audio over
+a Unix socket (app/services/inference_server.py). Workers report ready on
+/readyz once the inference process has loaded the models.
+Worker threads, queues and process pools are created after the fork.
+"""
+import os
+import secrets
+import shutil
+import tempfile
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = 30
+
+# The inference process serves every worker, so by default it gets as many
+# model replicas as the workers have transcription threads. Replicas share
+# the weights on CPU.
+os.environ.setdefault("WHISPER_NUM_WORKERS", str(workers * int(os.getenv("TRANSCRIPTION_WORKERS", "1"))))
+
+# Set before the app is imported so the workers' settings pick them up. The
+# socket lives in a private (0700) directory; the key also authenticates it.
+os.environ["INFERENCE_SERVER_SOCKET"] = os.path.join(tempfile.mkdtemp(prefix="whispa-inference-"), "whisper.sock")
+os.environ["INFERENCE_SERVER_AUTHKEY"] = secrets.token_hex(16)
+_inference_process = None
+
+# Each worker keeps its own Prometheus samples; /metrics aggregates them from
+# this directory. It must be set before prometheus_client is imported.
+# Samples left over from a previous run would be aggregated with the new ones.
+_metrics_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+if _metrics_dir:
+    shutil.rmtree(_metrics_dir, ignore_errors=True)
+    os.makedirs(_metrics_dir, exist_ok=True)
+else:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="whispa-metrics-")
+
+
+def when_ready(server):
+    # The app import defers the LLM client libraries to the background warm-up;
+    # import them in the master so the workers share the pages. Models stay
+    # out of the master (see above).
+    import google.genai
+    import openai
+
+    global _inference_process
+    from app.services.inference_server import InferenceProcess
+    _inference_process = InferenceProcess(os.environ["INFERENCE_SERVER_SOCKET"], bytes.fromhex(os.environ["INFERENCE_SERVER_AUTHKEY"]))
+    _inference_process.start()
+
+
+def on_exit(server):
+    if _inference_process is not None:
+        _inference_process.stop()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
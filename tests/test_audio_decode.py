@@ -0,0 +1,69 @@
+import base64
+import io
+import wave
+import numpy as np
+import pytest
+from app.utils.audio_decode import decode_audio_bytes, probe_duration, sniff_container, SAMPLE_RATE
+from app.utils.audio_to_wav import base64_to_audio
+
+
+def make_wav_bytes(seconds: float = 1.0, rate: int = 44100, channels: int = 2) -> bytes:
+    t = np.arange(int(seconds * rate)) / rate
+    tone = (0.3 * np.sin(2 * np.pi * 440 * t) * 32767).astype(np.int16)
+    frames = np.repeat(tone[:, None], channels, axis=1)
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames.tobytes())
+    return buffer.getvalue()
+
+
+def test_decode_wav_bytes_to_16k_mono_float32():
+    audio = decode_audio_bytes(make_wav_bytes(seconds=1.0))
+
+    assert audio.dtype == np.float32
+    assert audio.ndim == 1
+    assert abs(audio.size - SAMPLE_RATE) < SAMPLE_RATE // 20
+
+
+def test_decode_rejects_non_audio_bytes():
+    with pytest.raises(Exception):
+        decode_audio_bytes(b"not audio data")
+
+
+def test_probe_duration_reads_header_without_decoding():
+    assert abs(probe_duration(make_wav_bytes(seconds=2.0)) - 2.0) < 0.05
+    assert probe_duration(b"not audio data") is None
+
+
+def test_native_16k_mono_wav_skips_resampling():
+    data = make_wav_bytes(seconds=0.5, rate=SAMPLE_RATE, channels=1)
+    with wave.open(io.BytesIO(data)) as wav:
+        expected = np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2") / 32768.0
+
+    audio = decode_audio_bytes(data)
+
+    assert audio.dtype == np.float32
+    assert np.array_equal(audio, expected.astype(np.float32))
+
+
+def test_sniff_container_from_magic_bytes():
+    assert sniff_container(make_wav_bytes(seconds=0.1)[:12]) == "wav"
+    assert sniff_container(b"ID3\x04\x00") == "mp3"
+    assert sniff_container(b"\xff\xfb\x90\x00") == "mp3"
+    assert sniff_container(b"\xff\xf1\x50\x80") == "aac"
+    assert sniff_container(b"OggS\x00") == "ogg"
+    assert sniff_container(b"\x1a\x45\xdf\xa3") == "webm"
+    assert sniff_container(b"\x00\x00\x00\x20ftypM4A ") == "mp4"
+    assert sniff_container(b"not audio") is None
+
+
+def test_base64_audio_decodes_data_urls_in_process():
+    encoded = base64.b64encode(make_wav_bytes(seconds=1.0)).decode()
+
+    audio = base64_to_audio(f"data:audio/wav;base64,{encoded}")
+
+    assert abs(audio.size - SAMPLE_RATE) < SAMPLE_RATE // 20
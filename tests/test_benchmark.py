@@ -0,0 +1,38 @@
+import asyncio
+from benchmarks.corpus import build_corpus
+from benchmarks.transcription_bench import run_level
+from app.utils.audio_decode import decode_audio_bytes
+
+
+def test_corpus_is_deterministic_and_decodable():
+    first = build_corpus(durations=(2,), formats=("wav", "mp3", "webm"))
+    second = build_corpus(durations=(2,), formats=("wav", "mp3", "webm"))
+
+    synthetic = [item for item in first if item.name.startswith("synth-")]
+    assert [item.name for item in synthetic] == ["synth-2s.wav", "synth-2s.mp3", "synth-2s.webm"]
+    assert [item.data for item in synthetic] == [item.data for item in second if item.name.startswith("synth-")]
+    for item in synthetic:
+        assert abs(decode_audio_bytes(item.data).size / 16000 - 2) < 0.1
+
+
+class SleepTarget:
+    def __init__(self):
+        self.calls = 0
+
+    async def transcribe(self, item):
+        self.calls += 1
+        if self.calls == 3:
+            raise RuntimeError("503: queue full")
+        await asyncio.sleep(0.01)
+
+
+def test_run_level_reports_latency_percentiles_and_errors():
+    corpus = build_corpus(durations=(1,), formats=("wav",))
+    report = asyncio.run(run_level(SleepTarget(), corpus, concurrency=2, requests=6))
+
+    assert report["requests"] == 6
+    assert report["errors"] == 1
+    assert report["concurrency"] == 2
+    assert 0.01 <= report["latency_p50"] <= report["latency_p95"] <= report["latency_p99"]
+    assert report["throughput_rps"] > 0
+    assert report["real_time_factor_mean"] > 0
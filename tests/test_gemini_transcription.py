@@ -0,0 +1,62 @@
+import asyncio
+import io
+from types import SimpleNamespace
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+from app.config import settings
+from app.dependencies import get_gemini_file_deleter
+from app.services.audio_service import AudioService
+
+
+class FakeGemini:
+    """Local stand-in for the Gemini async client that records every round trip."""
+
+    def __init__(self):
+        self.calls = []
+        self.files = SimpleNamespace(upload=self.upload, delete=self.delete)
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    async def upload(self, file, config):
+        self.calls.append("files.upload")
+        return SimpleNamespace(name="files/audio-1")
+
+    async def delete(self, name):
+        self.calls.append("files.delete")
+
+    async def generate_content(self, model, contents):
+        self.calls.append("generate_content")
+        return SimpleNamespace(text="hello\nworld")
+
+
+def transcribe(data: bytes, inline_max_bytes: int):
+    service = AudioService()
+    service.aclient = FakeGemini()
+    upload = UploadFile(file=io.BytesIO(data), filename="note.wav", headers=Headers({"content-type": "audio/wav"}))
+
+    async def scenario():
+        text = await service.transcribe_audio_with_gemini(upload)
+        calls_at_response = list(service.aclient.calls)
+        await get_gemini_file_deleter().drain()
+        return text, calls_at_response, service.aclient.calls
+
+    original = (settings.gemini_inline_max_bytes, settings.transcription_cache_entries)
+    settings.gemini_inline_max_bytes, settings.transcription_cache_entries = inline_max_bytes, 0
+    try:
+        return asyncio.run(scenario())
+    finally:
+        settings.gemini_inline_max_bytes, settings.transcription_cache_entries = original
+
+
+def test_small_audio_is_sent_inline_in_one_round_trip():
+    text, calls_at_response, calls = transcribe(b"small voice note", inline_max_bytes=1024)
+
+    assert text == "hello world"
+    assert calls_at_response == calls == ["generate_content"]
+
+
+def test_large_audio_uses_files_api_and_deletes_after_responding():
+    text, calls_at_response, calls = transcribe(b"x" * 2048, inline_max_bytes=1024)
+
+    assert text == "hello world"
+    assert calls_at_response == ["files.upload", "generate_content"]
+    assert calls == ["files.upload", "generate_content", "files.delete"]
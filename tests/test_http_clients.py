@@ -0,0 +1,62 @@
+import asyncio
+import json
+import httpx
+from app.config import settings
+from app.services import http_clients
+from app.services.linear_service import LinearService
+
+
+def test_http_client_is_shared_pooled_and_closed(monkeypatch):
+    monkeypatch.setattr(settings, "http_timeout", 7.0)
+
+    async def scenario():
+        client = http_clients.get_http_client()
+        same = http_clients.get_http_client()
+        await http_clients.close_clients()
+        return client, same
+
+    client, same = asyncio.run(scenario())
+
+    assert client is same
+    assert client.timeout.read == 7.0
+    assert client.is_closed
+    assert http_clients._http_client is None
+
+
+def test_llm_client_transports_are_closed(monkeypatch):
+    monkeypatch.setattr(settings, "gemini_api_key", "gemini-key")
+    monkeypatch.setattr(settings, "openai_api_key", "openai-key")
+
+    async def scenario():
+        gemini = http_clients.get_gemini_client()
+        openai = http_clients.get_openai_client()
+        transports = (http_clients._gemini_http_client, openai._client)
+        await http_clients.close_clients()
+        return gemini, transports
+
+    gemini, (gemini_transport, openai_transport) = asyncio.run(scenario())
+
+    assert gemini._api_client._http_options.httpx_async_client is gemini_transport
+    assert gemini_transport.is_closed
+    assert openai_transport.is_closed
+    assert http_clients._gemini_client is None and http_clients._gemini_http_client is None
+
+
+def test_linear_issue_is_created_without_blocking_the_event_loop():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append((request.headers["authorization"], json.loads(request.content)["variables"]["title"]))
+        issue = {"id": "1", "identifier": "WHI-1", "title": "Crash", "url": "https://linear.app/i/WHI-1", "state": {"name": "Todo"}}
+        return httpx.Response(200, json={"data": {"issueCreate": {"success": True, "issue": issue}}})
+
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http:
+            service = LinearService(http)
+            service.api_url = "https://linear.test/graphql"
+            return await service.create_issue(title="Crash", description="", team_id="team", api_key="lin_key")
+
+    issue = asyncio.run(scenario())
+
+    assert issue.identifier == "WHI-1"
+    assert seen == [("lin_key", "Crash")]
@@ -0,0 +1,98 @@
+import os
+import tempfile
+import threading
+import time
+import numpy as np
+import pytest
+from app.services.inference_server import InferenceClient, InferenceError, InferenceServer, RemoteWhisperModel
+
+AUTHKEY = b"test-key"
+
+
+class FakeModel:
+    def __init__(self):
+        self.decoded = 0
+
+    def transcribe(self, audio, **options):
+        if options.get("fail"):
+            raise RuntimeError("model exploded")
+
+        def segments():
+            for i in range(options.get("segments", 3)):
+                self.decoded += 1
+                yield (i, float(audio.sum()), options["language"])
+
+        return segments(), {"duration": audio.size / 16000}
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.model = FakeModel()
+        self.loaded = []
+
+    def get(self, name=None):
+        self.loaded.append(name)
+        return self.model
+
+
+@pytest.fixture
+def server():
+    registry = FakeRegistry()
+    address = os.path.join(tempfile.mkdtemp(), "whisper.sock")
+    inference = InferenceServer(address, AUTHKEY, registry)
+    listener = inference.listen()
+    threading.Thread(target=inference.serve_forever, args=(listener,), daemon=True).start()
+    yield registry, InferenceClient(address, AUTHKEY, connect_timeout=2)
+    listener.close()
+
+
+def test_remote_model_streams_segments_from_the_server(server):
+    registry, client = server
+    audio = np.full(16000, 0.5, dtype=np.float32)
+
+    segments, info = RemoteWhisperModel("small", client).transcribe(audio, language="en")
+
+    assert info == {"duration": 1.0}
+    assert list(segments) == [(0, 8000.0, "en"), (1, 8000.0, "en"), (2, 8000.0, "en")]
+    assert registry.loaded == ["small"]
+
+
+def test_load_and_model_errors_reach_the_client(server):
+    registry, client = server
+    client.load(["base", "small"])
+    assert registry.loaded == ["base", "small"]
+
+    with pytest.raises(InferenceError, match="model exploded"):
+        RemoteWhisperModel("small", client).transcribe(np.zeros(10, dtype=np.float32), fail=True)
+
+
+def test_server_stops_decoding_when_the_client_stops_reading(server):
+    registry, client = server
+    segments, _ = RemoteWhisperModel("small", client).transcribe(np.zeros(10, dtype=np.float32), language="en", segments=100000)
+    next(segments)
+    segments.close()
+
+    deadline = time.monotonic() + 2
+    decoded = -1
+    while time.monotonic() < deadline and decoded != registry.model.decoded:
+        decoded = registry.model.decoded
+        time.sleep(0.1)
+    assert registry.model.decoded < 100000
+
+
+def test_client_gives_up_when_no_server_is_listening():
+    client = InferenceClient(os.path.join(tempfile.mkdtemp(), "missing.sock"), AUTHKEY, connect_timeout=0.3)
+    with pytest.raises(FileNotFoundError):
+        client.load(["small"])
+
+
+def test_workers_use_the_inference_process_when_configured(server, monkeypatch):
+    from app import dependencies
+    registry, client = server
+    monkeypatch.setattr(dependencies, "_inference_client", client)
+
+    model = dependencies.get_whisper_model("small")
+    names = dependencies.preload_whisper_models()
+
+    assert isinstance(model, RemoteWhisperModel) and model.name == "small"
+    assert registry.loaded == names
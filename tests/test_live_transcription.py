@@ -0,0 +1,139 @@
+import io
+import json
+import math
+import time
+import av
+import numpy as np
+from types import SimpleNamespace
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.config import settings
+from app.services.live_transcription import LiveAudioBuffer, LiveTranscriber
+
+
+class OneWordPerSecondModel:
+    """Stand-in model that hears word N during second N of the session."""
+
+    def __init__(self, transcriber_ref):
+        self.transcriber_ref = transcriber_ref
+
+    def transcribe(self, audio, **options):
+        offset = self.transcriber_ref[0].window_start
+        end = offset + audio.size / 16000
+        words = [
+            SimpleNamespace(start=k - offset, end=k + 0.8 - offset, word=f" w{k}")
+            for k in range(math.ceil(offset), math.floor(end - 0.8 + 1e-6) + 1)
+        ]
+        return iter([SimpleNamespace(words=words)]), None
+
+
+def make_transcriber(window_seconds=15):
+    ref = []
+    model = OneWordPerSecondModel(ref)
+    transcriber = LiveTranscriber(get_model=lambda: model, model_name="tiny", options={"beam_size": 1}, window_seconds=window_seconds)
+    ref.append(transcriber)
+    return transcriber
+
+
+def one_pass(transcriber, seconds):
+    transcriber.append(np.zeros(int(seconds * 16000), dtype=np.float32))
+    return transcriber.update(transcriber.transcribe_window(*transcriber.snapshot()))
+
+
+def test_words_commit_once_two_passes_agree():
+    transcriber = make_transcriber()
+
+    assert one_pass(transcriber, 2) == []
+    assert [w for _, _, w in transcriber.tentative] == ["w0", "w1"]
+
+    committed = one_pass(transcriber, 1)
+    assert [w for _, _, w in committed] == ["w0", "w1"]
+    assert [w for _, _, w in transcriber.tentative] == ["w2"]
+
+    transcriber.finish(transcriber.transcribe_window(*transcriber.snapshot()))
+    assert transcriber.final_event()["text"] == "w0 w1 w2"
+
+
+def test_window_is_trimmed_at_committed_words():
+    transcriber = make_transcriber(window_seconds=3)
+    for _ in range(6):
+        one_pass(transcriber, 1)
+
+    assert transcriber.window.size / 16000 <= 3
+    assert [w for _, _, w in transcriber.committed] == ["w0", "w1", "w2", "w3", "w4"]
+
+
+def test_pcm_buffer_returns_only_new_samples():
+    buffer = LiveAudioBuffer("pcm")
+    buffer.feed((np.ones(3, dtype="<i2") * 16384).tobytes() + b"\x00")
+
+    assert np.allclose(buffer.take_new_samples(), [0.5, 0.5, 0.5])
+    buffer.feed(b"\x00")
+    assert buffer.take_new_samples().tolist() == [0.0]
+
+
+def opus_webm(seconds: float) -> bytes:
+    """A MediaRecorder-like Opus/WebM stream of a 440 Hz tone."""
+    buffer = io.BytesIO()
+    samples = (0.3 * np.sin(2 * np.pi * 440 * np.arange(int(48000 * seconds)) / 48000)).astype(np.float32)
+    with av.open(buffer, mode="w", format="webm") as container:
+        stream = container.add_stream("libopus", rate=48000)
+        stream.layout = "mono"
+        for i in range(0, samples.size, 960):
+            frame = av.AudioFrame.from_ndarray(samples[None, i:i + 960], format="flt", layout="mono")
+            frame.rate = 48000
+            for packet in stream.encode(frame):
+                container.mux(packet)
+        for packet in stream.encode(None):
+            container.mux(packet)
+    return buffer.getvalue()
+
+
+def test_webm_buffer_decodes_incrementally_and_keeps_only_the_undecoded_tail():
+    data = opus_webm(3)
+    buffer = LiveAudioBuffer("webm")
+    taken = []
+    for i in range(0, len(data), 1000):
+        buffer.feed(data[i:i + 1000])
+        deadline = time.monotonic() + 2
+        while buffer.pending_bytes and time.monotonic() < deadline:
+            time.sleep(0.005)
+        # The decoder has taken every byte: nothing is kept to be decoded again on the next step
+        assert buffer.pending_bytes == 0
+        taken.append(buffer.take_new_samples().size)
+    buffer.close(timeout=2)
+    taken.append(buffer.take_new_samples().size)
+
+    assert sum(taken) == 3 * 16000
+    # Samples arrive while the stream is still coming in, not only at the end
+    assert sum(taken[:len(taken) // 2]) > 16000
+
+
+def test_websocket_streams_partials_then_final(monkeypatch):
+    from app.routers import audio
+    from app.services.audio_service import AudioService
+
+    async def accept_token(token):
+        return {"id": "user", "email": "user@example.com", "access_token": token}
+
+    monkeypatch.setattr(audio, "authenticate_token", accept_token)
+    monkeypatch.setattr(AudioService, "create_live_transcriber", lambda self, model, quality: make_transcriber())
+    monkeypatch.setattr(settings, "live_step_seconds", 0.05)
+
+    app = FastAPI()
+    app.include_router(audio.live_router, prefix="/v1/audio")
+    pcm = np.zeros(16000, dtype="<i2").tobytes()
+
+    with TestClient(app).websocket_connect("/v1/audio/transcribe/live?token=t&format=pcm") as ws:
+        ws.send_bytes(pcm * 2)
+        first = ws.receive_json()
+        ws.send_bytes(pcm)
+        events = [first]
+        while not events[-1]["tentative"].endswith("w2"):
+            events.append(ws.receive_json())
+        ws.send_text(json.dumps({"type": "stop"}))
+        while events[-1]["type"] != "final":
+            events.append(ws.receive_json())
+
+    assert first["type"] == "partial" and first["tentative"] == "w0 w1"
+    assert events[-1]["text"] == "w0 w1 w2"
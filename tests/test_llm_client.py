@@ -0,0 +1,267 @@
+import asyncio
+import base64
+import time
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from google.genai import errors
+from app.config import settings
+from app.services.gemini_files import GeminiFileCache, GeminiFileDeleter, plan_inline
+from app.services.llm_client import LLMClient
+
+IMAGE = base64.b64encode(b"\xff\xd8\xff\xe0 fake jpeg").decode()
+PNG = base64.b64encode(b"\x89PNG\r\n\x1a\n" + b"\x00" * 200).decode()
+
+
+class FakeFilesAPI:
+    """Local stand-in for the Gemini Files API with a fixed round-trip latency per call."""
+
+    def __init__(self, latency: float = 0.05, fail_on: int = 0, fail_after: float = 0.0):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.fail_after = fail_after
+        self.uploads = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.deleted = []
+
+    async def upload(self, file, config=None):
+        self.uploads += 1
+        number = self.uploads
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if number == self.fail_on:
+                await asyncio.sleep(self.fail_after)
+                raise RuntimeError("upload rejected")
+            await asyncio.sleep(self.latency)
+            return SimpleNamespace(name=f"files/image-{number}")
+        finally:
+            self.in_flight -= 1
+
+    async def delete(self, name):
+        await asyncio.sleep(self.latency)
+        self.deleted.append(name)
+
+
+class FakeGemini:
+    def __init__(self, files: FakeFilesAPI):
+        self.files = files
+        self.contents = None
+        # File names the provider no longer knows about
+        self.unknown_files = set()
+        # Raised by the next generate call, e.g. a transient server error
+        self.next_error = None
+        self.models = SimpleNamespace(generate_content_stream=self.generate_content_stream)
+
+    async def generate_content_stream(self, model, contents):
+        self.contents = contents
+        if self.next_error:
+            error, self.next_error = self.next_error, None
+            raise error
+        missing = [part.name for part in contents[1:] if getattr(part, "name", None) in self.unknown_files]
+        if missing:
+            message = f"You do not have permission to access the File {missing[0]} or it may not exist."
+            raise errors.ClientError(403, {"error": {"code": 403, "message": message, "status": "PERMISSION_DENIED"}})
+
+        async def stream():
+            yield SimpleNamespace(text="# Notes")
+        return stream()
+
+
+def make_client(files: FakeFilesAPI, monkeypatch, inline_budget: int = 0, file_cache_ttl: int = 0) -> LLMClient:
+    monkeypatch.setattr(settings, "gemini_inline_max_bytes", inline_budget)
+    monkeypatch.setattr(settings, "gemini_inline_image_max_bytes", 1024)
+    monkeypatch.setattr(settings, "llm_provider", "gemini")
+    monkeypatch.setattr(settings, "gemini_upload_concurrency", 4)
+    deleter = GeminiFileDeleter(batch_size=16)
+    file_cache = GeminiFileCache(max_entries=8, ttl_seconds=file_cache_ttl, deleter=deleter) if file_cache_ttl else None
+    client = LLMClient(file_deleter=deleter, file_cache=file_cache)
+    client.aclient = FakeGemini(files)
+    return client
+
+
+def generate(client: LLMClient, images, qa_type="general"):
+    async def scenario():
+        chunks = [chunk async for chunk in client.analyze_multimodal(images_base64=images, transcription="it crashed", qa_type=qa_type)]
+        await client.file_deleter.drain()
+        return chunks
+    return scenario()
+
+
+def test_images_upload_concurrently_and_deletes_do_not_delay_the_response(monkeypatch):
+    files = FakeFilesAPI(latency=0.05)
+    client = make_client(files, monkeypatch)
+
+    async def scenario():
+        start_time = time.perf_counter()
+        chunks = [chunk async for chunk in client.analyze_multimodal(images_base64=[IMAGE] * 6, transcription="it crashed")]
+        elapsed = time.perf_counter() - start_time
+        deleted_at_response = list(files.deleted)
+        await client.file_deleter.drain()
+        return chunks, elapsed, deleted_at_response
+
+    chunks, elapsed, deleted_at_response = asyncio.run(scenario())
+
+    assert chunks == ["# Notes"]
+    assert files.max_in_flight == 4
+    # Two waves of uploads instead of six serial round trips; no delete round trip
+    assert elapsed < 6 * files.latency
+    assert deleted_at_response == []
+    assert sorted(files.deleted) == sorted(f"files/image-{i}" for i in range(1, 7))
+    assert [part.name for part in client.aclient.contents[1:]] == [f"files/image-{i}" for i in range(1, 7)]
+
+
+def run_failing(client: LLMClient, images: int) -> HTTPException:
+    async def scenario():
+        with pytest.raises(HTTPException) as error:
+            async for _ in client.analyze_multimodal(images_base64=[IMAGE] * images, transcription="it crashed"):
+                pass
+        await client.file_deleter.drain()
+        return error.value
+
+    return asyncio.run(scenario())
+
+
+def test_failed_upload_cancels_the_rest_without_generating(monkeypatch):
+    files = FakeFilesAPI(latency=0.05, fail_on=2, fail_after=0.01)
+    client = make_client(files, monkeypatch)
+
+    error = run_failing(client, images=6)
+
+    assert error.status_code == 500
+    assert client.aclient.contents is None
+    # Uploads still queued behind the semaphore never started
+    assert files.uploads == 4
+    assert files.in_flight == 0
+    assert files.deleted == []
+
+
+def test_uploads_finished_before_a_failure_are_deleted(monkeypatch):
+    files = FakeFilesAPI(latency=0.01, fail_on=2, fail_after=0.05)
+    client = make_client(files, monkeypatch)
+
+    error = run_failing(client, images=3)
+
+    assert error.status_code == 500
+    assert sorted(files.deleted) == ["files/image-1", "files/image-3"]
+
+
+def test_small_images_go_inline_with_their_real_mime_type(monkeypatch):
+    files = FakeFilesAPI()
+    client = make_client(files, monkeypatch, inline_budget=4096)
+
+    async def scenario():
+        return [chunk async for chunk in client.analyze_multimodal(images_base64=[f"data:image/png;base64,{PNG}", IMAGE], transcription="it crashed")]
+
+    assert asyncio.run(scenario()) == ["# Notes"]
+    assert files.uploads == 0 and files.deleted == []
+    parts = client.aclient.contents[1:]
+    assert [part.inline_data.mime_type for part in parts] == ["image/png", "image/jpeg"]
+
+
+def test_images_over_the_inline_budget_use_the_files_api(monkeypatch):
+    big = base64.b64encode(b"\x89PNG\r\n\x1a\n" + b"\x00" * 2000).decode()
+    files = FakeFilesAPI(latency=0.01)
+    client = make_client(files, monkeypatch, inline_budget=200)
+
+    async def scenario():
+        chunks = [chunk async for chunk in client.analyze_multimodal(images_base64=[big, PNG, IMAGE], transcription="it crashed")]
+        await client.file_deleter.drain()
+        return chunks
+
+    asyncio.run(scenario())
+
+    parts = client.aclient.contents[1:]
+    # Order is preserved: the oversized PNG is uploaded, the second PNG no longer fits the budget
+    assert parts[0].name == "files/image-1"
+    assert parts[1].name == "files/image-2"
+    assert parts[2].inline_data.mime_type == "image/jpeg"
+    assert sorted(files.deleted) == ["files/image-1", "files/image-2"]
+
+
+def test_plan_inline_fits_the_most_images_into_the_budget():
+    assert plan_inline([500, 100, 300, 5000], max_inline_bytes=1000, budget_bytes=450) == [False, True, True, False]
+    assert plan_inline([], max_inline_bytes=1000, budget_bytes=450) == []
+
+
+def test_regenerating_notes_reuses_cached_uploads(monkeypatch):
+    files = FakeFilesAPI(latency=0.01)
+    client = make_client(files, monkeypatch, file_cache_ttl=3600)
+
+    async def scenario():
+        await generate(client, [IMAGE, PNG])
+        await generate(client, [PNG, IMAGE], qa_type="bug")
+
+    asyncio.run(scenario())
+
+    assert files.uploads == 2
+    assert files.deleted == []
+    assert sorted(part.name for part in client.aclient.contents[1:]) == ["files/image-1", "files/image-2"]
+
+
+def test_expired_handles_are_uploaded_again_and_deleted(monkeypatch):
+    files = FakeFilesAPI(latency=0.01)
+    client = make_client(files, monkeypatch, file_cache_ttl=3600)
+
+    async def scenario():
+        await generate(client, [IMAGE])
+        for entry in client.file_cache._entries.values():
+            entry.expires_at = 0
+        await generate(client, [IMAGE])
+
+    asyncio.run(scenario())
+
+    assert files.uploads == 2
+    assert files.deleted == ["files/image-1"]
+    assert client.aclient.contents[1].name == "files/image-2"
+
+
+def test_handles_the_provider_rejects_fall_back_to_a_fresh_upload(monkeypatch):
+    files = FakeFilesAPI(latency=0.01)
+    client = make_client(files, monkeypatch, file_cache_ttl=3600)
+
+    async def scenario():
+        await generate(client, [IMAGE])
+        client.aclient.unknown_files.add("files/image-1")
+        return await generate(client, [IMAGE])
+
+    assert asyncio.run(scenario()) == ["# Notes"]
+    assert files.uploads == 2
+    assert client.aclient.contents[1].name == "files/image-2"
+    assert files.deleted == ["files/image-1"]
+
+
+def test_unrelated_errors_keep_cached_handles(monkeypatch):
+    files = FakeFilesAPI(latency=0.01)
+    client = make_client(files, monkeypatch, file_cache_ttl=3600)
+
+    async def scenario():
+        await generate(client, [IMAGE])
+        client.aclient.next_error = errors.ServerError(503, {"error": {"code": 503, "message": "overloaded", "status": "UNAVAILABLE"}})
+        with pytest.raises(errors.ServerError):
+            await generate(client, [IMAGE])
+        return await generate(client, [IMAGE])
+
+    assert asyncio.run(scenario()) == ["# Notes"]
+    assert files.uploads == 1
+    assert files.deleted == []
+    assert client.aclient.contents[1].name == "files/image-1"
+
+
+def test_files_in_use_are_not_deleted_when_evicted():
+    deleted = []
+
+    class Deleter:
+        def schedule(self, aclient, name):
+            deleted.append(name)
+
+    cache = GeminiFileCache(max_entries=1, ttl_seconds=3600, deleter=Deleter())
+    first = cache.put("a", SimpleNamespace(name="files/a"), aclient=None)
+    cache.put("b", SimpleNamespace(name="files/b"), aclient=None)
+
+    # Both are in use, so the cache runs over capacity rather than deleting one
+    assert deleted == []
+    cache.release(first)
+    assert deleted == ["files/a"]
+    assert cache.acquire("a") is None
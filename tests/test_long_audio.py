@@ -0,0 +1,100 @@
+import numpy as np
+from app.services import long_audio
+from app.services.long_audio import plan_chunks, stitch_segments
+from app.utils.audio_decode import SAMPLE_RATE
+
+
+def fake_speech(*regions):
+    return lambda audio, options, sampling_rate: [
+        {"start": int(start * SAMPLE_RATE), "end": int(end * SAMPLE_RATE)} for start, end in regions
+    ]
+
+
+def test_chunks_are_cut_in_silence_gaps(monkeypatch):
+    monkeypatch.setattr(long_audio, "get_speech_timestamps", fake_speech((0, 20), (25, 50), (55, 70), (80, 100)))
+    audio = np.zeros(100 * SAMPLE_RATE, dtype=np.float32)
+
+    chunks = plan_chunks(audio, max_seconds=60, overlap_seconds=1)
+
+    assert [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in chunks] == [(0, 50), (55, 100)]
+
+
+def test_long_speech_runs_are_hard_cut_with_overlap(monkeypatch):
+    monkeypatch.setattr(long_audio, "get_speech_timestamps", fake_speech((0, 130)))
+    audio = np.zeros(130 * SAMPLE_RATE, dtype=np.float32)
+
+    chunks = plan_chunks(audio, max_seconds=60, overlap_seconds=2)
+
+    assert [(start / SAMPLE_RATE, end / SAMPLE_RATE) for start, end in chunks] == [(0, 60), (58, 118), (116, 130)]
+
+
+def test_stitching_drops_segments_repeated_in_overlap():
+    first = [(0.0, 30.0, "one"), (30.0, 59.5, "two")]
+    second = [(58.2, 59.6, "two"), (59.6, 75.0, "three")]
+
+    assert stitch_segments([first, second]) == [(0.0, 30.0, "one"), (30.0, 59.5, "two"), (59.6, 75.0, "three")]
+
+
+def test_stitching_keeps_repeated_utterances_outside_the_overlap():
+    first = [(0.0, 2.0, "Yes."), (2.0, 4.0, "Yes."), (4.0, 6.0, "Okay.")]
+    second = [(5.5, 6.0, "Okay."), (6.0, 8.0, "Okay.")]
+
+    assert stitch_segments([first]) == first
+    assert stitch_segments([first, second]) == first + [(6.0, 8.0, "Okay.")]
+
+
+def test_long_recordings_are_admitted_through_the_executor(monkeypatch):
+    import asyncio
+    import threading
+    import pytest
+    from fastapi import HTTPException
+    from app.config import settings
+    from app.services import audio_service
+    from app.services.audio_service import AudioService
+    from app.services.transcription_executor import TranscriptionExecutor
+    from app.utils.upload_ingest import IngestedUpload
+
+    class NoCache:
+        def make_key(self, *args, **kwargs):
+            return "key"
+
+        async def get(self, key, provider):
+            return None
+
+        async def set(self, key, text):
+            pass
+
+    class FakeLongAudio:
+        def transcribe(self, audio, model_name, options):
+            ran_on.append(threading.current_thread().name)
+            return "long text"
+
+    ran_on = []
+    executor = TranscriptionExecutor(max_workers=1, max_queue_size=1, retry_after=5)
+    monkeypatch.setattr(settings, "long_audio_enabled", True)
+    monkeypatch.setattr(settings, "long_audio_min_seconds", 120)
+    monkeypatch.setattr(audio_service, "get_transcription_executor", lambda: executor)
+    monkeypatch.setattr(audio_service, "get_transcription_cache", lambda: NoCache())
+    monkeypatch.setattr(audio_service, "get_long_audio_transcriber", lambda: FakeLongAudio())
+    monkeypatch.setattr(audio_service, "get_shadow_evaluator", lambda: None)
+    monkeypatch.setattr(audio_service, "decode_audio_bytes", lambda file: np.zeros(200 * SAMPLE_RATE, dtype=np.float32))
+    upload = IngestedUpload(file=None, size=0, sha256="x", content_type="audio/wav")
+    service = AudioService()
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        waiting = executor.submit(lambda: None)
+        with pytest.raises(HTTPException) as exc:
+            await service._transcribe_upload_with_faster_whisper(upload, "small")
+        release.set()
+        await running
+        await waiting
+        return exc.value.status_code, await service._transcribe_upload_with_faster_whisper(upload, "small")
+
+    try:
+        assert asyncio.run(scenario()) == (503, "long text")
+        assert ran_on == ["transcription-worker-0"]
+    finally:
+        executor.shutdown()
@@ -0,0 +1,97 @@
+import pytest
+from app.services.provider_router import ProviderRouter, LOCAL, REMOTE
+
+
+def make_router(policy, **overrides):
+    options = dict(max_queue_wait=10, max_local_seconds=0, max_error_rate=0.2, window=50, window_seconds=60)
+    options.update(overrides)
+    return ProviderRouter(policy, **options)
+
+
+def test_local_first_spills_to_remote_when_queue_wait_is_high():
+    router = make_router("local_first")
+    for _ in range(5):
+        router.record(LOCAL, 4.0, ok=True)
+
+    assert router.choose(audio_seconds=5, queue_depth=2, workers=1) == LOCAL
+    assert router.choose(audio_seconds=5, queue_depth=3, workers=1) == REMOTE
+    assert router.choose(audio_seconds=5, queue_depth=3, workers=2) == LOCAL
+
+
+def test_local_first_routes_long_audio_and_failing_providers():
+    router = make_router("local_first", max_local_seconds=60)
+    assert router.choose(audio_seconds=90, queue_depth=0, workers=1) == REMOTE
+
+    router.record(LOCAL, 1.0, ok=False)
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == REMOTE
+
+    router.record(REMOTE, 1.0, ok=False)
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == LOCAL
+
+
+def test_fastest_compares_predicted_latency():
+    router = make_router("fastest")
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == LOCAL
+
+    router.record(LOCAL, 2.0, ok=True)
+    router.record(REMOTE, 3.0, ok=True)
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == LOCAL
+    assert router.choose(audio_seconds=5, queue_depth=1, workers=1) == REMOTE
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        make_router("random")
+
+
+def test_a_single_failure_needs_min_samples_before_rerouting():
+    router = make_router("local_first", min_samples=5)
+    router.record(LOCAL, 1.0, ok=False)
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == LOCAL
+
+    for _ in range(4):
+        router.record(LOCAL, 1.0, ok=False)
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == REMOTE
+
+
+def test_failing_provider_gets_an_occasional_probe(monkeypatch):
+    from app.services import provider_router
+    now = [1000.0]
+    monkeypatch.setattr(provider_router.time, "monotonic", lambda: now[0])
+    router = make_router("local_first", probe_interval=30)
+    router.record(LOCAL, 1.0, ok=False)
+
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == REMOTE
+    now[0] += 10
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == REMOTE
+    now[0] += 25
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == LOCAL
+    assert router.choose(audio_seconds=5, queue_depth=0, workers=1) == REMOTE
+
+
+def test_undecodable_uploads_are_not_provider_failures(monkeypatch):
+    import asyncio
+    import io
+    from fastapi import HTTPException
+    from app.services import audio_service
+    from app.services.audio_service import AudioService
+    from app.utils.upload_ingest import IngestedUpload
+
+    class NoCache:
+        def make_key(self, *args, **kwargs):
+            return "key"
+
+        async def get(self, key, provider):
+            return None
+
+    router = make_router("local_first")
+    monkeypatch.setattr(audio_service, "get_provider_router", lambda: router)
+    monkeypatch.setattr(audio_service, "get_transcription_cache", lambda: NoCache())
+    upload = IngestedUpload(file=io.BytesIO(b"not audio data"), size=14, sha256="x", content_type="audio/wav")
+    service = AudioService()
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(service._observe_provider(LOCAL, service._transcribe_upload_with_faster_whisper(upload, "small")))
+
+    assert exc.value.status_code == 400
+    assert router.snapshot()[LOCAL]["samples"] == 0
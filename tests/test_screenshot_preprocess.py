@@ -0,0 +1,77 @@
+import asyncio
+import io
+from PIL import Image, ImageDraw
+from PIL.PngImagePlugin import PngInfo
+from app.services.screenshot_preprocess import ScreenshotPreprocessor, preprocess_image
+
+
+def screenshot(width=2880, height=1800, seed=0, note=None) -> bytes:
+    """A retina-sized PNG with window-like blocks and optional metadata."""
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    for i in range(12):
+        x = (i * 37 + seed * 211) % (width - 400)
+        y = (i * 131 + seed * 97) % (height - 200)
+        draw.rectangle([x, y, x + 400, y + 200], fill=((i * 40 + seed * 70) % 255, 90, 160))
+    info = PngInfo()
+    if note:
+        info.add_text("Comment", note)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", pnginfo=info)
+    return buffer.getvalue()
+
+
+def process(images, dedupe_distance=-1):
+    preprocessor = ScreenshotPreprocessor(max_edge=1600, output_format="webp", quality=80, dedupe_distance=dedupe_distance, workers=2)
+    try:
+        return asyncio.run(preprocessor.process(images))
+    finally:
+        preprocessor.shutdown()
+
+
+def test_screenshot_is_downscaled_recompressed_and_stripped():
+    original = screenshot(note="user@example.com")
+
+    data, mime_type, phash = preprocess_image(original, max_edge=1600, output_format="webp", quality=80)
+
+    assert mime_type == "image/webp"
+    assert len(data) < len(original)
+    with Image.open(io.BytesIO(data)) as image:
+        assert max(image.size) == 1600
+        assert "Comment" not in image.info
+    assert phash is not None
+
+
+def test_exact_and_near_duplicates_are_dropped_in_order():
+    first = screenshot(seed=0)
+    # Same screen, one pixel changed: a different file, perceptually identical
+    image = Image.open(io.BytesIO(first))
+    image.putpixel((5, 5), (0, 0, 0))
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    near_copy = buffer.getvalue()
+    other = screenshot(seed=3)
+
+    kept = process([first, first, near_copy, other], dedupe_distance=4)
+
+    assert len(kept) == 2
+    assert all(mime_type == "image/webp" for _, mime_type in kept)
+
+
+def test_near_identical_screenshots_are_both_kept_by_default():
+    before = screenshot(width=1440, height=900, seed=0)
+    # The same screen after a failed action: only an error banner differs
+    image = Image.open(io.BytesIO(before))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([0, 0, 1440, 48], fill=(220, 38, 38))
+    draw.text((16, 16), "Error: payment failed", fill="white")
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+
+    assert len(process([before, before, buffer.getvalue()])) == 2
+
+
+def test_unreadable_images_pass_through():
+    data = b"\x89PNG\r\n\x1a\n not really a png"
+
+    assert process([data]) == [(data, "image/png")]
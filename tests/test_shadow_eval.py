@@ -0,0 +1,133 @@
+import asyncio
+import threading
+import numpy as np
+from app.services.shadow_eval import ShadowEvaluator, word_error_rate
+from app.services.transcription_executor import TranscriptionExecutor
+
+
+def test_word_error_rate_ignores_case_and_punctuation():
+    assert word_error_rate("Hello, world.", "hello world") == 0.0
+    assert word_error_rate("the cat sat down", "the cat sat") == 0.25
+    assert word_error_rate("one two", "one three four") == 1.0
+    assert word_error_rate("", "") == 0.0
+
+
+def make_evaluator(sample_rate=1.0, transcribe=lambda audio, model, options: "the cat sat"):
+    executor = TranscriptionExecutor(max_workers=1, max_queue_size=4, retry_after=1)
+    evaluator = ShadowEvaluator(
+        executor=executor,
+        transcribe=transcribe,
+        candidate_model="tiny",
+        sample_rate=sample_rate,
+        max_queue_depth=0,
+        window=10,
+    )
+    return executor, evaluator
+
+
+def test_records_wer_and_latency_ratio_without_transcripts():
+    executor, evaluator = make_evaluator()
+
+    async def scenario():
+        assert evaluator.maybe_schedule(np.zeros(16000, dtype=np.float32), "the cat sat down", 2.0, "small", {})
+        while evaluator._in_flight:
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(scenario())
+        summary = evaluator.summary()
+        assert summary["evaluations"] == 1
+        assert summary["word_error_rate_mean"] == 0.25
+        assert summary["latency_ratio_mean"] < 1
+        assert summary["recent"][0]["word_error_rate"] == 0.25
+        assert not any("text" in key for key in summary["recent"][0])
+    finally:
+        executor.shutdown()
+        evaluator.shutdown()
+
+
+def test_running_shadow_job_does_not_block_real_requests():
+    release = threading.Event()
+    executor, evaluator = make_evaluator(transcribe=lambda audio, model, options: release.wait(5) and "the cat sat")
+
+    async def scenario():
+        assert evaluator.maybe_schedule(np.zeros(10, dtype=np.float32), "the cat sat", 1.0, "small", {})
+        return await asyncio.wait_for(executor.run(lambda: "primary"), timeout=2)
+
+    try:
+        assert asyncio.run(scenario()) == "primary"
+        assert evaluator._in_flight
+    finally:
+        release.set()
+        executor.shutdown()
+        evaluator.shutdown()
+
+
+def test_shadow_work_is_dropped_when_the_queue_is_busy():
+    executor, evaluator = make_evaluator()
+    release = threading.Event()
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        waiting = executor.submit(lambda: None)
+        scheduled = evaluator.maybe_schedule(np.zeros(10, dtype=np.float32), "text", 1.0, "small", {})
+        release.set()
+        await blocker
+        await waiting
+        return scheduled
+
+    try:
+        assert asyncio.run(scenario()) is False
+        assert evaluator.summary()["evaluations"] == 0
+    finally:
+        executor.shutdown()
+        evaluator.shutdown()
+
+
+def test_candidate_matching_primary_is_not_shadowed():
+    executor, evaluator = make_evaluator()
+    try:
+        assert evaluator.maybe_schedule(np.zeros(10, dtype=np.float32), "text", 1.0, "tiny", {}) is False
+    finally:
+        executor.shutdown()
+        evaluator.shutdown()
+
+
+def test_no_latency_ratio_without_a_comparable_primary_time():
+    executor, evaluator = make_evaluator()
+
+    async def scenario():
+        assert evaluator.maybe_schedule(np.zeros(16000, dtype=np.float32), "the cat sat", None, "small", {})
+        while evaluator._in_flight:
+            await asyncio.sleep(0.01)
+
+    try:
+        asyncio.run(scenario())
+        summary = evaluator.summary()
+        assert summary["evaluations"] == 1
+        assert summary["latency_ratio_mean"] is None
+    finally:
+        executor.shutdown()
+        evaluator.shutdown()
+
+
+def test_shadow_work_is_dropped_while_a_real_job_is_running():
+    executor, evaluator = make_evaluator()
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        busy = evaluator.maybe_schedule(np.zeros(10, dtype=np.float32), "text", 1.0, "small", {})
+        release.set()
+        await running
+        # The worker counts as idle by the time its caller has the result
+        idle = executor.workers_busy == 0
+        return busy, idle
+
+    try:
+        assert asyncio.run(scenario()) == (False, True)
+    finally:
+        executor.shutdown()
+        evaluator.shutdown()
@@ -0,0 +1,81 @@
+import asyncio
+import numpy as np
+import pytest
+from app.services.transcription_batcher import TranscriptionBatcher, supports_batching
+from app.services.whisper_registry import whisper_options
+from app.services.transcription_executor import TranscriptionExecutor
+
+
+class RecordingBatcher(TranscriptionBatcher):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def transcribe_batch(self, audios, model_name, options):
+        self.batches.append((model_name, len(audios)))
+        return [f"clip of {audio.size} samples" for audio in audios]
+
+
+def make_batcher(window_ms, max_batch_size):
+    executor = TranscriptionExecutor(max_workers=1, max_queue_size=4, retry_after=1)
+    return executor, RecordingBatcher(executor, get_model=None, window_ms=window_ms, max_batch_size=max_batch_size)
+
+
+def test_requests_within_window_share_one_batch():
+    executor, batcher = make_batcher(window_ms=50, max_batch_size=8)
+
+    async def scenario():
+        return await asyncio.gather(*(batcher.submit(np.zeros(n, dtype=np.float32), "small", quality="fast") for n in (10, 20, 30)))
+
+    try:
+        assert asyncio.run(scenario()) == ["clip of 10 samples", "clip of 20 samples", "clip of 30 samples"]
+        assert batcher.batches == [("small", 3)]
+    finally:
+        executor.shutdown()
+
+
+def test_full_batch_flushes_without_waiting_for_window():
+    executor, batcher = make_batcher(window_ms=10_000, max_batch_size=2)
+
+    async def scenario():
+        return await asyncio.wait_for(
+            asyncio.gather(*(batcher.submit(np.zeros(5, dtype=np.float32), "small", quality="fast") for _ in range(4))),
+            timeout=2,
+        )
+
+    try:
+        assert len(asyncio.run(scenario())) == 4
+        assert batcher.batches == [("small", 2), ("small", 2)]
+    finally:
+        executor.shutdown()
+
+
+def test_batches_are_grouped_per_model():
+    executor, batcher = make_batcher(window_ms=30, max_batch_size=8)
+
+    async def scenario():
+        return await asyncio.gather(
+            batcher.submit(np.zeros(1, dtype=np.float32), "tiny", quality="fast"),
+            batcher.submit(np.zeros(2, dtype=np.float32), "small", quality="fast"),
+            batcher.submit(np.zeros(3, dtype=np.float32), "tiny", quality="fast"),
+        )
+
+    try:
+        assert asyncio.run(scenario()) == ["clip of 1 samples", "clip of 2 samples", "clip of 3 samples"]
+        assert sorted(batcher.batches) == [("small", 1), ("tiny", 2)]
+    finally:
+        executor.shutdown()
+
+
+def test_only_tiers_without_temperature_fallback_are_batched():
+    assert supports_batching(whisper_options("fast"))
+    assert not supports_batching(whisper_options("balanced"))
+    assert not supports_batching(whisper_options("accurate"))
+
+    executor, batcher = make_batcher(window_ms=30, max_batch_size=8)
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(batcher.submit(np.zeros(1, dtype=np.float32), "small"))
+        assert batcher.batches == []
+    finally:
+        executor.shutdown()
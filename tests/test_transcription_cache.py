@@ -0,0 +1,49 @@
+import asyncio
+import os
+from app.services.transcription_cache import TranscriptionCache, hash_audio
+
+
+def test_key_depends_on_content_and_parameters():
+    content = hash_audio(b"audio")
+    key = TranscriptionCache.make_key(content, provider="faster_whisper", model="small", beam_size=5)
+
+    assert key == TranscriptionCache.make_key(content, beam_size=5, model="small", provider="faster_whisper")
+    assert key != TranscriptionCache.make_key(content, provider="faster_whisper", model="base", beam_size=5)
+    assert key != TranscriptionCache.make_key(hash_audio(b"other"), provider="faster_whisper", model="small", beam_size=5)
+
+
+def test_memory_tier_is_bounded_lru():
+    cache = TranscriptionCache(max_entries=2, ttl_seconds=60)
+
+    async def scenario():
+        await cache.set("a", "first")
+        await cache.set("b", "second")
+        assert await cache.get("a", provider="test") == "first"
+        await cache.set("c", "third")
+        return [await cache.get(key, provider="test") for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == ["first", None, "third"]
+
+
+def test_disk_tier_survives_memory_eviction_and_respects_ttl(tmp_path):
+    cache = TranscriptionCache(max_entries=1, ttl_seconds=60, disk_dir=str(tmp_path), disk_max_bytes=1_000_000)
+    expired = TranscriptionCache(max_entries=0, ttl_seconds=0, disk_dir=str(tmp_path), disk_max_bytes=1_000_000)
+
+    async def scenario():
+        await cache.set("a", "first")
+        await cache.set("b", "second")
+        return await cache.get("a", provider="test"), await expired.get("b", provider="test")
+
+    assert asyncio.run(scenario()) == ("first", None)
+    assert not os.path.exists(tmp_path / "b.json")
+
+
+def test_disk_tier_is_size_capped(tmp_path):
+    cache = TranscriptionCache(max_entries=0, ttl_seconds=60, disk_dir=str(tmp_path), disk_max_bytes=200)
+
+    async def scenario():
+        for i in range(10):
+            await cache.set(f"key{i}", "x" * 50)
+
+    asyncio.run(scenario())
+    assert sum(f.stat().st_size for f in tmp_path.iterdir()) <= 200
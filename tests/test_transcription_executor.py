@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from app.services.transcription_executor import TranscriptionExecutor
+
+
+def test_run_returns_worker_result():
+    executor = TranscriptionExecutor(max_workers=2, max_queue_size=4, retry_after=3)
+    try:
+        result = asyncio.run(executor.run(lambda a, b: a + b, 2, 3))
+        assert result == 5
+    finally:
+        executor.shutdown()
+
+
+def test_run_propagates_worker_exception():
+    executor = TranscriptionExecutor(max_workers=1, max_queue_size=1, retry_after=3)
+
+    def boom():
+        raise ValueError("bad audio")
+
+    try:
+        with pytest.raises(ValueError):
+            asyncio.run(executor.run(boom))
+    finally:
+        executor.shutdown()
+
+
+def test_full_queue_is_rejected_with_retry_after():
+    executor = TranscriptionExecutor(max_workers=1, max_queue_size=1, retry_after=7)
+    release = threading.Event()
+
+    async def scenario():
+        running = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = asyncio.ensure_future(executor.run(lambda: "queued"))
+        await asyncio.sleep(0)
+
+        with pytest.raises(HTTPException) as exc:
+            await executor.run(lambda: "rejected")
+
+        release.set()
+        assert await running is True
+        assert await queued == "queued"
+        return exc.value
+
+    try:
+        error = asyncio.run(scenario())
+        assert error.status_code == 503
+        assert error.headers["Retry-After"] == "7"
+    finally:
+        executor.shutdown()
+
+
+def run_in_order(aging, jobs):
+    """Block the single worker, queue `jobs` as (name, job_seconds, enqueue delay), then record the run order."""
+    executor = TranscriptionExecutor(max_workers=1, max_queue_size=8, retry_after=1, aging=aging)
+    release = threading.Event()
+    order = []
+
+    async def scenario():
+        blocker = asyncio.ensure_future(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+        queued = []
+        for name, job_seconds, delay in jobs:
+            await asyncio.sleep(delay)
+            queued.append(executor.submit(order.append, name, job_seconds=job_seconds))
+        release.set()
+        await blocker
+        await asyncio.gather(*queued)
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        executor.shutdown()
+    return order
+
+
+def test_shortest_job_runs_first():
+    order = run_in_order(aging=0, jobs=[("long", 1200, 0), ("unknown", None, 0), ("short", 5, 0)])
+    assert order == ["short", "unknown", "long"]
+
+
+def test_aging_lets_long_waiting_jobs_overtake():
+    order = run_in_order(aging=1000, jobs=[("long", 60, 0), ("short", 5, 0.1)])
+    assert order == ["long", "short"]
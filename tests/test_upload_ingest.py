@@ -0,0 +1,74 @@
+import asyncio
+import hashlib
+import io
+import pytest
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+from app.utils.upload_ingest import ingest_upload
+
+
+def make_upload(data: bytes) -> UploadFile:
+    return UploadFile(file=io.BytesIO(data), filename="clip.wav", headers=Headers({"content-type": "audio/wav"}))
+
+
+def test_hashes_incrementally_and_spools_large_uploads_to_disk():
+    data = bytes(range(256)) * 64
+    upload = asyncio.run(ingest_upload(make_upload(data), max_bytes=len(data), chunk_size=1000, spool_max_memory=4096))
+
+    assert upload.size == len(data)
+    assert upload.sha256 == hashlib.sha256(data).hexdigest()
+    assert upload.suffix == ".wav"
+    assert upload.file._rolled
+    assert upload.read() == data
+    upload.close()
+
+
+def test_small_uploads_stay_in_memory():
+    upload = asyncio.run(ingest_upload(make_upload(b"tiny"), max_bytes=100, chunk_size=2, spool_max_memory=4096))
+
+    assert not upload.file._rolled
+    assert upload.read() == b"tiny"
+    upload.close()
+
+
+def test_rejects_uploads_over_the_limit_with_413():
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(ingest_upload(make_upload(b"x" * 101), max_bytes=100, chunk_size=10, spool_max_memory=4096))
+    assert exc.value.status_code == 413
+
+
+def test_chunked_upload_without_content_length_is_cut_off_early():
+    from fastapi import FastAPI, File
+    from app.middleware.upload_limit import UploadLimitMiddleware
+
+    app = FastAPI()
+    app.add_middleware(UploadLimitMiddleware, max_bytes=1000)
+
+    @app.post("/v1/audio/transcribe")
+    async def transcribe(audio_file: UploadFile = File(...)):
+        return {"size": audio_file.size}
+
+    chunk = b"x" * 16384
+    head = b'--b\r\nContent-Disposition: form-data; name="audio_file"; filename="a.wav"\r\nContent-Type: audio/wav\r\n\r\n'
+    chunks = [head] + [chunk] * 100
+    pulled, sent = 0, []
+
+    async def receive():
+        nonlocal pulled
+        pulled += 1
+        return {"type": "http.request", "body": chunks[pulled - 1], "more_body": pulled < len(chunks)}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/v1/audio/transcribe", "raw_path": b"/v1/audio/transcribe", "root_path": "", "query_string": b"",
+        "headers": [(b"content-type", b"multipart/form-data; boundary=b"), (b"transfer-encoding", b"chunked")],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    asyncio.run(app(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    # The limit plus multipart allowance is about 65 KB: a handful of 16 KB chunks, not all 1.6 MB
+    assert pulled <= 6
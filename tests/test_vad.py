@@ -0,0 +1,42 @@
+import numpy as np
+from faster_whisper.transcribe import Segment
+from faster_whisper.vad import SpeechTimestampsMap
+from app.config import settings
+from app.utils.audio_decode import SAMPLE_RATE
+from app.utils.vad import strip_silence, restore_segment_times
+
+
+def make_segment(start, end):
+    return Segment(
+        id=1, seek=0, start=start, end=end, text="hello", tokens=[], avg_logprob=0.0,
+        compression_ratio=1.0, no_speech_prob=0.0, words=None, temperature=0.0,
+    )
+
+
+def test_silence_is_removed_entirely():
+    speech, timestamp_map = strip_silence(np.zeros(3 * SAMPLE_RATE, dtype=np.float32))
+
+    assert speech.size == 0
+    assert timestamp_map is None
+
+
+def test_disabled_vad_passes_audio_through(monkeypatch):
+    monkeypatch.setattr(settings, "vad_enabled", False)
+    audio = np.ones(SAMPLE_RATE, dtype=np.float32)
+
+    speech, timestamp_map = strip_silence(audio)
+
+    assert speech is audio
+    assert timestamp_map is None
+
+
+def test_segment_times_map_back_to_original_timeline():
+    # Speech at 2-3s and 10-12s of the original recording.
+    chunks = [{"start": 2 * SAMPLE_RATE, "end": 3 * SAMPLE_RATE}, {"start": 10 * SAMPLE_RATE, "end": 12 * SAMPLE_RATE}]
+    timestamp_map = SpeechTimestampsMap(chunks, SAMPLE_RATE)
+
+    first = restore_segment_times(make_segment(0.0, 1.0), timestamp_map)
+    second = restore_segment_times(make_segment(1.5, 3.0), timestamp_map)
+
+    assert (first.start, first.end) == (2.0, 3.0)
+    assert (second.start, second.end) == (10.5, 12.0)
@@ -0,0 +1,46 @@
+from fastapi.testclient import TestClient
+from app.services.warmup import Warmup
+
+
+def test_warmup_runs_steps_in_order_and_becomes_ready():
+    ran = []
+    warmup = Warmup([("imports", lambda: ran.append("imports")), ("models", lambda: ran.append("models"))])
+
+    assert warmup.status()["ready"] is False
+    warmup.run()
+
+    status = warmup.status()
+    assert ran == ["imports", "models"]
+    assert status["ready"] is True and status["error"] is None
+    assert set(status["durations"]) == {"imports", "models"}
+
+
+def test_failed_step_leaves_app_not_ready():
+    def fail():
+        raise RuntimeError("model not found")
+
+    ran = []
+    warmup = Warmup([("models", fail), ("inference", lambda: ran.append("inference"))])
+    warmup.run()
+
+    status = warmup.status()
+    assert status["ready"] is False
+    assert status["error"] == "models: model not found"
+    assert ran == []
+
+
+def test_healthz_is_live_before_readyz_is_ready(monkeypatch):
+    from app import main
+
+    warmup = Warmup([("models", lambda: None)])
+    monkeypatch.setattr(main, "get_warmup", lambda: warmup)
+    # Not entered as a context manager, so the startup warm-up doesn't run
+    client = TestClient(main.app)
+
+    assert client.get("/healthz").status_code == 200
+    assert client.get("/readyz").status_code == 503
+
+    warmup.run()
+    response = client.get("/readyz")
+    assert response.status_code == 200
+    assert response.json()["ready"] is True
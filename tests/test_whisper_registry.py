@@ -0,0 +1,87 @@
+import threading
+import time
+import pytest
+from app.services.whisper_registry import WhisperModelRegistry, whisper_options, with_timestamps
+
+
+class CountingRegistry(WhisperModelRegistry):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.loads = []
+
+    def _load(self, name, cpu_threads):
+        time.sleep(0.05)
+        self.loads.append(name)
+        return object()
+
+
+def test_resolve_defaults_and_rejects_unknown_models():
+    registry = CountingRegistry("small", ["tiny", "base"])
+
+    assert registry.resolve(None) == "small"
+    assert registry.resolve("tiny") == "tiny"
+    with pytest.raises(ValueError):
+        registry.resolve("large-v3")
+
+
+def test_quality_tiers_pick_model_and_decoding_options():
+    registry = CountingRegistry("small", ["tiny"], tier_models={"fast": "base", "balanced": ""})
+
+    assert registry.resolve(None, "fast") == "base"
+    assert registry.resolve(None, "balanced") == "small"
+    assert registry.resolve("tiny", "fast") == "tiny"
+
+    fast, accurate = whisper_options("fast"), whisper_options()
+    assert (fast["beam_size"], fast["best_of"], fast["temperature"], fast["without_timestamps"]) == (1, 1, 0.0, True)
+    assert accurate["beam_size"] == 5 and not accurate["without_timestamps"]
+    assert fast["language"] == accurate["language"] == "en"
+    with pytest.raises(ValueError):
+        whisper_options("ultra")
+
+
+def test_concurrent_first_calls_load_model_once():
+    registry = CountingRegistry("small", ["tiny"])
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(registry.get())) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert registry.loads == ["small"]
+    assert len({id(model) for model in results}) == 1
+
+
+def test_segment_paths_keep_timestamps_for_every_tier(monkeypatch):
+    import asyncio
+    from app.services import audio_service
+    from app.services.audio_service import AudioService
+
+    options = with_timestamps(whisper_options("fast"))
+    assert "without_timestamps" not in options
+    assert options["beam_size"] == 1 and options["temperature"] == 0.0
+
+    submitted = []
+
+    class RecordingExecutor:
+        def submit(self, fn, *args, job_seconds=None):
+            submitted.append(args[-1])
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(None)
+            return future
+
+    class Upload:
+        file, suffix = None, ".wav"
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(audio_service, "get_transcription_executor", lambda: RecordingExecutor())
+    monkeypatch.setattr(audio_service, "probe_duration", lambda file: 1.0)
+
+    async def scenario():
+        AudioService().stream_transcription_with_faster_whisper(Upload(), "small", "fast")
+
+    asyncio.run(scenario())
+    assert "without_timestamps" not in submitted[0]